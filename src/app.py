@@ -1,11 +1,28 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, Depends
 from fastapi.responses import JSONResponse
 from impl import ResourceA, ResourceB
-from auth import inject_user_data
+from auth import get_auth_manager_instance, inject_user_data
 from orchestator import Orchestrator
 from security.security_manager import _get_security_manager
+from logging_config import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initializes the `AuthManager` selected by the `AUTH_MANAGER` env variable before serving the first request.
+    """
+    logger.info("AuthManager is %s", get_auth_manager_instance())
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 @app.exception_handler(PermissionError)
@@ -14,7 +31,7 @@ async def permission_error_handler(request: Request, exc: PermissionError):
     Exception handler to transform PermissionError exceptions into HTTP 403 Forbidden responses,
     including the original error message in the response.
     """
-    print(f"permission_error_handler {exc}")
+    logger.info("permission_error_handler %s", exc)
     return JSONResponse(
         status_code=403,
         content={"message": f"{exc}"},
@@ -0,0 +1,295 @@
+import functools
+import re
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from security.authzed_resource import (
+    AuthzedResource,
+    AuthzedResourceType,
+    _combinable,
+)
+from security.permissions import AuthzedAction, DecisionStrategy
+from security.principal import Principal
+from security.security_manager import SecurityManager
+
+RESOURCE_SCHEMA = pa.schema(
+    [
+        ("name", pa.string()),
+        ("type", pa.string()),
+        ("tags", pa.map_(pa.string(), pa.string())),
+    ]
+)
+
+# The schema of the bulk permission checks: each row requests the decision for the given `user` and `action` on a
+# resource, where `roles` replaces the roles of the user in the `RoleManager`, unless it is null
+CHECK_SCHEMA = pa.schema(
+    [
+        ("user", pa.string()),
+        ("roles", pa.list_(pa.string())),
+        ("type", pa.string()),
+        ("name", pa.string()),
+        ("tags", pa.map_(pa.string(), pa.string())),
+        ("action", pa.string()),
+    ]
+)
+DECISION_SCHEMA = pa.schema([("allowed", pa.bool_())])
+
+_CONCRETE_TYPES = [t for t in AuthzedResourceType if t != AuthzedResourceType.ALL]
+
+
+class ArrowAuthorizer:
+    """
+    Authorizes tables of resource descriptors, with one resource per row, using Arrow compute kernels instead of
+    evaluating each row in Python.
+
+    The rows must follow the `RESOURCE_SCHEMA`, where `type` is the value of an `AuthzedResourceType`.
+    The candidate permissions are evaluated once for the current user, then each of them is translated into a boolean
+    mask over the rows, combining the type, the `name_patterns` as a regular expression and the `required_tags` as
+    equality checks on the `tags` map. Finally, the masks are combined with the decision strategy of the
+    `PolicyEnforcer`.
+
+    The name patterns are evaluated by the RE2 engine of the Arrow kernels, in dot-all mode as by `AuthzedResource`.
+    Patterns that RE2 does not support, like lookarounds and backreferences, are matched row by row with the Python
+    `re` module instead.
+    """
+
+    def __init__(self, sm: Optional[SecurityManager]):
+        self._sm = sm
+
+    def mask(
+        self,
+        data: Union[pa.Table, pa.RecordBatch],
+        actions: Union[AuthzedAction, list[AuthzedAction]],
+        principal: Optional[Principal] = None,
+    ) -> pa.Array:
+        """
+        Returns the boolean mask of the rows that the current user, or the given principal, is allowed to access with
+        the given actions.
+        """
+        return self._apply(self._plan(actions, principal), data)
+
+    def filter(
+        self,
+        data: Union[pa.Table, pa.RecordBatch],
+        actions: Union[AuthzedAction, list[AuthzedAction]],
+    ) -> Union[pa.Table, pa.RecordBatch]:
+        """
+        Returns only the rows that the current user is allowed to access with the given actions.
+        """
+        return pc.filter(data, self.mask(data, actions))
+
+    def filter_batches(
+        self,
+        batches: Iterable[pa.RecordBatch],
+        actions: Union[AuthzedAction, list[AuthzedAction]],
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Lazily filters the given record batches, skipping the batches with no authorized rows.
+        The permissions are evaluated immediately for the current user, so the returned iterator can be consumed
+        later and from a different context.
+        """
+        plan = self._plan(actions)
+
+        def authorized_batches():
+            for batch in batches:
+                batch = pc.filter(batch, self._apply(plan, batch))
+                if batch.num_rows > 0:
+                    yield batch
+
+        return authorized_batches()
+
+    def check(self, requests: pa.RecordBatch) -> pa.RecordBatch:
+        """
+        Decides the bulk permission checks of the given batch, following the `CHECK_SCHEMA`, and returns a batch of
+        `DECISION_SCHEMA` with one decision per request.
+
+        The requests are grouped by user, roles and action, then each group is authorized at once with `mask`.
+        Requests with a null or unknown action are denied.
+        """
+        rows = requests.num_rows
+        allowed = np.zeros(rows, dtype=bool)
+        users = requests.column("user")
+        roles = requests.column("roles")
+        actions = requests.column("action")
+        keys = pc.binary_join_element_wise(
+            pc.fill_null(users, ""),
+            pc.fill_null(pc.binary_join(roles, "\x1f"), "\x00"),
+            actions,
+            "\x1e",
+        )
+        codes = pc.fill_null(pc.dictionary_encode(keys).indices, -1)
+        codes = codes.to_numpy(zero_copy_only=False)
+        order = np.argsort(codes, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+
+        role_manager = self._sm.role_manager
+        for positions in groups:
+            if len(positions) == 0 or codes[positions[0]] < 0:
+                continue
+            first = int(positions[0])
+            try:
+                action = AuthzedAction(actions[first].as_py())
+            except ValueError:
+                continue
+            user = users[first].as_py()
+            user_roles = roles[first].as_py()
+            if user_roles is None:
+                user_roles = role_manager.get_roles_for_user(user) or []
+            principal = Principal(user, frozenset(user_roles))
+
+            indices = pa.array(positions)
+            mask = self.mask(requests.take(indices), action, principal)
+            allowed[positions] = mask.to_numpy(zero_copy_only=False)
+
+        return pa.RecordBatch.from_arrays([pa.array(allowed)], schema=DECISION_SCHEMA)
+
+    def _plan(
+        self,
+        actions: Union[AuthzedAction, list[AuthzedAction]],
+        principal: Optional[Principal] = None,
+    ) -> Optional[tuple]:
+        """
+        Evaluates the candidate permissions of each resource type for the given principal, or for the current user.
+        Returns None when all the rows are authorized, as when there is no `SecurityManager`.
+        """
+        if isinstance(actions, AuthzedAction):
+            actions = [actions]
+        if self._sm is None or self._sm.policy_enforcer is None:
+            return None
+        enforcer = self._sm.policy_enforcer
+        snapshot = self._sm.snapshot
+        if not snapshot.permissions:
+            return None
+
+        index = snapshot.index
+        if principal is None:
+            user, principal = self._sm.current_user, self._sm.current_principal
+        else:
+            user = principal.user
+        evaluate_permission = enforcer.permission_evaluator(
+            index, user, self._sm.role_manager, principal
+        )
+        plan = []
+        for resource_type in _CONCRETE_TYPES:
+            candidates = index.candidate_entries(resource_type, actions)
+            if candidates:
+                plan.append(
+                    (
+                        resource_type.value,
+                        [
+                            (entries, evaluate_permission(p)[0])
+                            for p, entries in candidates
+                        ],
+                    )
+                )
+        return enforcer.decision_strategy, plan
+
+    def _apply(self, plan, data: Union[pa.Table, pa.RecordBatch]) -> pa.Array:
+        rows = data.num_rows
+        if plan is None:
+            return pa.repeat(True, rows)
+
+        strategy, types_plan = plan
+        names = data.column("name")
+        types = data.column("type")
+        tags = data.column("tags")
+
+        entry_masks: dict[int, pa.Array] = {}
+        granted = pa.repeat(False, rows)
+        denied = pa.repeat(False, rows)
+        grants = pa.repeat(pa.scalar(0, pa.int32()), rows)
+        denials = pa.repeat(pa.scalar(0, pa.int32()), rows)
+        for resource_type, candidates in types_plan:
+            type_mask = pc.equal(types, resource_type)
+            for entries, allowed in candidates:
+                match = None
+                for entry in entries:
+                    entry_mask = entry_masks.get(id(entry))
+                    if entry_mask is None:
+                        entry_mask = self._entry_mask(entry, names, tags, rows)
+                        entry_masks[id(entry)] = entry_mask
+                    match = entry_mask if match is None else pc.or_(match, entry_mask)
+                match = pc.and_(type_mask, match)
+
+                if strategy == DecisionStrategy.CONSENSUS:
+                    if allowed:
+                        grants = pc.add(grants, pc.cast(match, pa.int32()))
+                    else:
+                        denials = pc.add(denials, pc.cast(match, pa.int32()))
+                elif allowed:
+                    granted = pc.or_(granted, match)
+                else:
+                    denied = pc.or_(denied, match)
+
+        if strategy == DecisionStrategy.CONSENSUS:
+            return _as_array(pc.greater(grants, denials))
+        if strategy == DecisionStrategy.AFFIRMATIVE:
+            return _as_array(granted)
+        return _as_array(pc.and_(granted, pc.invert(denied)))
+
+    @staticmethod
+    def _entry_mask(
+        entry: AuthzedResource,
+        names: pa.ChunkedArray,
+        tags: pa.ChunkedArray,
+        rows: int,
+    ) -> pa.ChunkedArray:
+        mask = pa.repeat(True, rows)
+        if entry.name_patterns:
+            # As in `AuthzedResource`, the patterns that cannot be combined are matched one by one
+            combined = tuple(p for p in entry.name_patterns if _combinable(p))
+            groups = [(p,) for p in entry.name_patterns if not _combinable(p)]
+            if combined:
+                groups.insert(0, combined)
+            mask = functools.reduce(
+                pc.or_kleene, [_names_mask(group, names) for group in groups]
+            )
+        for key, value in (entry.required_tags or {}).items():
+            mask = pc.and_kleene(
+                mask, pc.equal(pc.map_lookup(tags, key, "first"), value)
+            )
+        return pc.fill_null(mask, False)
+
+
+def _names_mask(
+    name_patterns: tuple[str, ...], names: pa.ChunkedArray
+) -> Union[pa.Array, pa.ChunkedArray]:
+    """
+    The mask of the names fully matching any of the given patterns, combined into a single expression: with RE2
+    when it supports them, otherwise with Python, one name at a time.
+    """
+    pattern = _re2_pattern(name_patterns)
+    if pattern is not None:
+        return pc.match_substring_regex(names, pattern)
+    regex = re.compile("|".join(f"(?:{p})" for p in name_patterns), re.DOTALL)
+    return pa.array(
+        [
+            None if n is None else regex.fullmatch(n) is not None
+            for n in names.to_pylist()
+        ],
+        pa.bool_(),
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _re2_pattern(name_patterns: tuple[str, ...]) -> Optional[str]:
+    """
+    The RE2 expression fully matching any of the given patterns, with `.` matching newlines as in
+    `AuthzedResource`, or None if RE2 does not support them.
+    """
+    alternatives = "|".join(f"(?:{p})" for p in name_patterns)
+    pattern = f"(?s)\\A(?:{alternatives})\\z"
+    try:
+        pc.match_substring_regex(pa.array([""], pa.string()), pattern)
+    except pa.ArrowInvalid:
+        return None
+    return pattern
+
+
+def _as_array(mask: Union[pa.Array, pa.ChunkedArray]) -> pa.Array:
+    if isinstance(mask, pa.ChunkedArray):
+        return mask.combine_chunks()
+    return mask
@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 
 import json
 import os
+from arrow_flight.session import SessionClientMiddlewareFactory
 from security.authzed_resource import AuthzedResourceType
 
 
@@ -68,7 +69,10 @@ if auth_manager == "oidc":
     opts = fl.FlightCallOptions(headers=[auth_header])
 
 port = 8815
-client = fl.FlightClient(f"grpc://localhost:{port}")
+# The bearer token is validated only on the first call, then the session token returned by the server is sent instead
+client = fl.FlightClient(
+    f"grpc://localhost:{port}", middleware=[SessionClientMiddlewareFactory()]
+)
 # actions = list(client.list_actions(options=opts))
 # print(f"*** actions is {actions}")
 # flights = list(client.list_flights(options=opts))
@@ -0,0 +1,123 @@
+import pyarrow.flight as fl
+import pytest
+
+import auth
+from arrow_flight.server import PocFlightServer
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import RoleBasedPolicy
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager, _set_security_manager
+
+
+class FakeAuthManager:
+    """
+    An `AuthManager` whose access tokens are the user names, mapped to the roles of the given `RoleManager`.
+    """
+
+    def __init__(self, role_manager: RoleManager):
+        self.role_manager = role_manager
+        self.calls = 0
+
+    def user_details_from_access_token(
+        self, access_token: str
+    ) -> tuple[str, list[str]]:
+        self.calls += 1
+        return access_token, self.role_manager.get_roles_for_user(access_token) or []
+
+
+@pytest.fixture
+def role_manager():
+    rm = RoleManager()
+    rm.add_roles_for_user("a-reader", ["a-reader"])
+    rm.add_roles_for_user("a-team", ["a-team"])
+    rm.add_roles_for_user("auditor", ["auditor"])
+    rm.add_roles_for_user("b-manager", ["b-reader", "b-editor"])
+    return rm
+
+
+@pytest.fixture
+def permissions():
+    return [
+        Permission(
+            name="read-any-A",
+            resources=[AuthzedResource(type=AuthzedResourceType.A)],
+            policies=[RoleBasedPolicy(roles=["a-reader"])],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="read-a-team-resources",
+            resources=[
+                AuthzedResource(
+                    type=AuthzedResourceType.ALL, required_tags={"team": "a-team"}
+                )
+            ],
+            policies=[RoleBasedPolicy(roles=["a-team"])],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="read-2024-resources",
+            resources=[
+                AuthzedResource(type=AuthzedResourceType.A, name_patterns=[".*-2024"]),
+                AuthzedResource(type=AuthzedResourceType.B, name_patterns=[".*-2024"]),
+            ],
+            policies=[RoleBasedPolicy(roles=["auditor"])],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="all-to-any-B",
+            resources=[AuthzedResource(type=AuthzedResourceType.B)],
+            policies=[RoleBasedPolicy(roles=["b-reader", "b-editor"])],
+            actions=[AuthzedAction.ALL],
+        ),
+    ]
+
+
+@pytest.fixture
+def security_manager(role_manager, permissions):
+    sm = SecurityManager(
+        role_manager=role_manager,
+        policy_enforcer=PolicyEnforcer(decision_strategy=DecisionStrategy.AFFIRMATIVE),
+        permissions=permissions,
+    )
+    _set_security_manager(sm)
+    return sm
+
+
+@pytest.fixture
+def auth_manager(monkeypatch, role_manager):
+    monkeypatch.setenv("AUTH_MANAGER", "oidc")
+    auth_manager = FakeAuthManager(role_manager)
+    monkeypatch.setattr(auth, "_auth_manager", auth_manager)
+    return auth_manager
+
+
+@pytest.fixture
+def start_flight_server(auth_manager, security_manager):
+    """
+    Starts a local `PocFlightServer` with the given arguments, authenticating users by the `FakeAuthManager`, and
+    returns a client connected to it.
+    """
+    started = []
+
+    def start(client_middleware=None, **kwargs) -> fl.FlightClient:
+        server = PocFlightServer(location="grpc://127.0.0.1:0", **kwargs)
+        client = fl.FlightClient(
+            f"grpc://127.0.0.1:{server.port}", middleware=client_middleware
+        )
+        started.append((server, client))
+        return client
+
+    yield start
+    for server, client in started:
+        client.close()
+        server.shutdown()
+
+
+@pytest.fixture
+def flight_client(start_flight_server):
+    """
+    A client of a local `PocFlightServer` serving the sample catalog.
+    """
+    return start_flight_server()
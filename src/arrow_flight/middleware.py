@@ -1,34 +1,90 @@
+import logging
+import jwt
 import pyarrow.flight as fl
 import os
+from typing import Optional
+from arrow_flight.session import SESSION_HEADER, SessionManager
 from auth import get_auth_manager_instance
+from security.principal import Principal
+
+logger = logging.getLogger(__name__)
+
+
+def _token_expiration(access_token: str) -> Optional[float]:
+    """
+    The `exp` claim of the given access token, already verified by the `AuthManager`, or None if the token is not a
+    JWT or does not expire.
+    """
+    try:
+        claims = jwt.decode(access_token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return None
+    exp = claims.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
 
 
 class AuthorizationMiddlewareFactory(fl.ServerMiddlewareFactory):
-    def __init__(self):
-        pass
+    """
+    Authenticates the calls when the `AUTH_MANAGER` env variable is set, at the time the factory is created.
+
+    The bearer token of the `authorization` header is validated by the configured `AuthManager` only when the call does
+    not carry a valid session token: in that case a new session is opened and its token is returned to the client in
+    the `x-flight-session` header, to be sent on the following calls. The session expires no later than the `exp`
+    claim of the bearer token.
+    """
+
+    def __init__(self, session_manager: Optional[SessionManager] = None):
+        self._enabled = os.getenv("AUTH_MANAGER", "").lower() != ""
+        if self._enabled:
+            # Initialize the AuthManager now rather than while serving the first call
+            get_auth_manager_instance()
+        self._session_manager = session_manager or SessionManager()
+
+    @property
+    def session_manager(self) -> SessionManager:
+        return self._session_manager
 
     def start_call(self, info, headers):
-        auth_manager = os.getenv("AUTH_MANAGER", "").lower()
-        if auth_manager != "":
-            access_token = None
-            for header in headers:
-                if header.lower() == "authorization":
-                    auth_header = headers[header][0]
-                    _, _, access_token = auth_header.partition(" ")
-                    break
-            # TODO token validation
-
-            current_user, roles = (
-                get_auth_manager_instance().user_details_from_access_token(access_token)
-            )
-            return AuthorizationMiddleware(current_user=current_user, roles=roles)
+        if not self._enabled:
+            return None
+
+        session_tokens = headers.get(SESSION_HEADER)
+        if session_tokens:
+            principal = self._session_manager.resolve(session_tokens[0])
+            if principal is not None:
+                return AuthorizationMiddleware(principal)
+
+        access_token = None
+        for header in headers:
+            if header.lower() == "authorization":
+                auth_header = headers[header][0]
+                _, _, access_token = auth_header.partition(" ")
+                break
+        if access_token is None:
+            raise fl.FlightUnauthenticatedError("Missing authorization header")
+
+        current_user, roles = (
+            get_auth_manager_instance().user_details_from_access_token(access_token)
+        )
+        principal = Principal(current_user, roles)
+        session_token = self._session_manager.issue(
+            principal, expires_at=_token_expiration(access_token)
+        )
+        return AuthorizationMiddleware(principal, session_token=session_token)
 
 
 class AuthorizationMiddleware(fl.ServerMiddleware):
-    def __init__(self, current_user: str, roles: list[str]):
-        self.current_user = current_user
-        self.roles = roles
+    def __init__(self, principal: Principal, session_token: Optional[str] = None):
+        self.principal = principal
+        self.current_user = principal.user
+        self.roles = list(principal.roles)
+        self._session_token = session_token
+
+    def sending_headers(self):
+        if self._session_token is None:
+            return {}
+        return {SESSION_HEADER: self._session_token}
 
     def call_completed(self, exception):
         if exception:
-            print(f"Middleware received {exception}")
+            logger.info("Middleware received %s", exception)
@@ -0,0 +1,81 @@
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+
+from arrow_flight.server import PocFlightServer
+from security.security_manager import _get_security_manager
+
+logger = logging.getLogger(__name__)
+
+
+def worker_locations(host: str, port: int, workers: int) -> list[str]:
+    """
+    The locations of the given number of workers, listening on consecutive ports starting from the given one.
+    """
+    return [f"grpc://{host}:{port + i}" for i in range(workers)]
+
+
+def _serve_worker(location: str, locations: list[str], kwargs):
+    logger.info("Worker %d serving at %s", os.getpid(), location)
+    server = PocFlightServer(location, locations=locations, **kwargs)
+    server.serve()
+
+
+def serve_workers(
+    workers: int,
+    host: str = "0.0.0.0",
+    port: int = 8815,
+    **kwargs,
+):
+    """
+    Runs the Flight server in pre-fork mode, with the given number of worker processes each serving a
+    `PocFlightServer` on its own port, from `port` to `port + workers - 1`: the endpoints returned by any worker list
+    all the worker locations.
+    `kwargs` are passed to each `PocFlightServer`.
+    The `AuthManager` and the `SecurityManager` must be initialized before, as in the `__main__` of the server module,
+    to be inherited by the workers.
+
+    The current `PermissionSnapshot` of the `SecurityManager`, with its `PermissionIndex` and all its compiled name
+    patterns, is built once in the parent process and inherited by every worker, which uses it as is.
+    The workers are forked before starting any gRPC server, after moving the objects of the parent process to the
+    permanent generation of the garbage collector, so that collections in the workers do not touch, and copy,
+    the inherited memory pages.
+    """
+    sm = _get_security_manager()
+    if sm is not None:
+        snapshot = sm.snapshot
+        if snapshot.index is not None:
+            snapshot.index.compile_patterns()
+
+    locations = worker_locations(
+        "localhost" if host == "0.0.0.0" else host, port, workers
+    )
+    ctx = multiprocessing.get_context("fork")
+    gc.freeze()
+    processes = [
+        ctx.Process(
+            target=_serve_worker,
+            args=(f"grpc://{host}:{port + i}", locations, kwargs),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+
+    def terminate(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            p.join()
@@ -1,9 +1,14 @@
-import ast
-
 import pyarrow as pa
+import pyarrow.compute as pc
+import contextlib
+import contextvars
+import itertools
 import json
-import pyarrow.flight as fl
+import logging
 import os
+import pyarrow.flight as fl
+import threading
+from typing import Iterator, Optional
 
 from impl import ResourceA, ResourceB
 from resources import Resource
@@ -11,6 +16,22 @@ from security.authzed_resource import AuthzedResourceType
 from security.security_manager import _get_security_manager
 from auth import get_auth_manager_instance
 from arrow_flight.middleware import AuthorizationMiddlewareFactory
+from arrow_flight.authorizer import (
+    CHECK_SCHEMA,
+    DECISION_SCHEMA,
+    RESOURCE_SCHEMA,
+    ArrowAuthorizer,
+)
+from arrow_flight.ticket import (
+    FlightTicket,
+    decode_ticket,
+    encode_ticket,
+    parse_command,
+)
+from security.permissions import AuthzedAction
+from logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
 
 # class NoOpAuthHandler(pa.flight.ServerAuthHandler):
 #     def authenticate(self, outgoing, incoming):
@@ -20,10 +41,99 @@ from arrow_flight.middleware import AuthorizationMiddlewareFactory
 #         return ""
 
 
+RESULT_SCHEMA = pa.schema([("name", pa.string()), ("message", pa.string())])
+
+# The command of the `do_exchange` descriptor for bulk permission checks
+CHECK_COMMAND = b"check"
+
+_RESOURCE_CLASSES = {
+    AuthzedResourceType.A: ResourceA,
+    AuthzedResourceType.B: ResourceB,
+}
+
+
+@contextlib.contextmanager
+def _authorization_errors():
+    """
+    Reports the failures of the authorization of a call as Flight errors, so that clients receive a denial or a server
+    error with a message rather than an internal error.
+    """
+    try:
+        yield
+    except fl.FlightError:
+        raise
+    except PermissionError as e:
+        raise fl.FlightUnauthorizedError(message=str(e)) from e
+    except Exception as e:
+        logger.exception("Failed to authorize the call")
+        raise fl.FlightServerError(message=f"Cannot authorize the call: {e}") from e
+
+
+def _reporting_authorization_errors(batches: Iterator[pa.RecordBatch]):
+    with _authorization_errors():
+        yield from batches
+
+
+def sample_catalog() -> pa.Table:
+    """
+    The catalog of resources served by the `list` API, one resource per row.
+    """
+    return pa.Table.from_pylist(
+        [
+            {"name": "a", "type": "A", "tags": {"team": "a-team"}},
+            {"name": "a-2024", "type": "A", "tags": {"team": "a-team", "year": "2024"}},
+            {"name": "b", "type": "B", "tags": {"team": "b-team"}},
+            {"name": "b-2024", "type": "B", "tags": {"team": "b-team", "year": "2024"}},
+        ],
+        schema=RESOURCE_SCHEMA,
+    )
+
+
 class PocFlightServer(fl.FlightServerBase):
+    """
+    An Arrow Flight server invoking the `api` requested in the ticket on an instance of the given `resource` type.
+    The `list` API returns instead the rows of the resource catalog of the given type, dropping the rows that the
+    current user is not allowed to `READ`.
+
+    The `do_exchange` endpoint, invoked with the `CHECK_COMMAND` descriptor, receives batches of permission checks
+    following the `CHECK_SCHEMA` and returns, on the same stream, one batch of `DECISION_SCHEMA` for each of them.
+
+    Results are streamed lazily with a `GeneratorStream` of record batches of at most `batch_size` rows, so that each
+    batch is authorized and sent as soon as it is produced.
+
+    Each call is authorized against its own state: the `Principal` authenticated by the `AuthorizationMiddleware` of
+    the call is set as the current principal in a new `contextvars.Context`, so concurrent calls never share the
+    identity of the user, even when served by the same thread.
+    The gRPC thread pool of the server is not configurable from Python: `max_concurrent_calls` bounds instead the
+    number of handlers running at once, with the others waiting for a free slot.
+
+    When many servers share the load, `locations` lists all of them: the endpoints returned by `get_flight_info`
+    include every location, rotated at each call so that clients connecting to the first one are spread across the
+    servers.
+    """
+
     resources = ["A", "B"]
 
-    def __init__(self, location="grpc://0.0.0.0:8815", **kwargs):
+    def __init__(
+        self,
+        location="grpc://0.0.0.0:8815",
+        catalog: Optional[pa.Table] = None,
+        batch_size: int = 64 * 1024,
+        max_concurrent_calls: Optional[int] = None,
+        locations: Optional[list[str]] = None,
+        **kwargs,
+    ):
+        # The server accepts calls as soon as it is initialized: set up its state first
+        self._location = location
+        self._locations = locations or [location]
+        self._rotation = itertools.count()
+        self._catalog = catalog if catalog is not None else sample_catalog()
+        self._batch_size = batch_size
+        self._call_slots = (
+            threading.BoundedSemaphore(max_concurrent_calls)
+            if max_concurrent_calls
+            else contextlib.nullcontext()
+        )
         super(PocFlightServer, self).__init__(
             location,
             # auth_handler=NoOpAuthHandler(),
@@ -32,7 +142,6 @@ class PocFlightServer(fl.FlightServerBase):
             },
             **kwargs,
         )
-        self._location = location
 
     def descriptor_to_key(descriptor):
         return (
@@ -41,63 +150,73 @@ class PocFlightServer(fl.FlightServerBase):
             tuple(descriptor.path or tuple()),
         )
 
-    def _make_flight_info(self, resource):
-        schema = pa.schema([("name", pa.string()), ("message", pa.string())])
-        endpoints = [fl.FlightEndpoint(repr(resource), [self._location])]
+    def _make_flight_info(self, ticket: FlightTicket, command: bytes):
+        schema = RESOURCE_SCHEMA if ticket.api == "list" else RESULT_SCHEMA
+        first = next(self._rotation) % len(self._locations)
+        locations = self._locations[first:] + self._locations[:first]
+        endpoints = [fl.FlightEndpoint(encode_ticket(ticket), locations)]
         return fl.FlightInfo(
-            schema, fl.FlightDescriptor.for_command(resource), endpoints, 1, 1
+            schema, fl.FlightDescriptor.for_command(command), endpoints, -1, -1
         )
 
     def list_flights(self, context, criteria):
         for resource in PocFlightServer.resources:
-            yield self._make_flight_info(resource)
+            command = json.dumps({"resource": resource, "api": "list"}).encode()
+            yield self._make_flight_info(parse_command(command), command)
 
     def get_flight_info(self, context, descriptor):
-        resource = descriptor.command.decode("utf-8")
-        return self._make_flight_info(resource)
+        try:
+            ticket = parse_command(descriptor.command)
+        except ValueError as e:
+            raise fl.FlightServerError(message=str(e))
+        return self._make_flight_info(ticket, descriptor.command)
 
     def do_put(self, context, descriptor, reader, writer):
         pass
 
-    def do_get(self, context, ticket):
-        auth_manager = os.getenv("AUTH_MANAGER", "").lower()
-        print(f"auth_manager is {auth_manager}")
-        if auth_manager != "":
+    def _run_call(self, context, handler, *args):
+        """
+        Runs the handler in a new `contextvars.Context` whose current principal is the one of the call, waiting for a
+        free call slot first.
+        The streams returned by the handler take a call slot again while producing their batches.
+        """
+
+        def call():
             auth_middleware = context.get_middleware("auth")
-            sm = _get_security_manager()
-            sm.set_current_user(auth_middleware.current_user)
-            sm.role_manager.clear()
-            sm.role_manager.add_roles_for_user(
-                auth_middleware.current_user, auth_middleware.roles
-            )
+            if auth_middleware is not None:
+                _get_security_manager().set_current_principal(auth_middleware.principal)
+            return handler(*args)
+
+        with self._call_slots:
+            return contextvars.Context().run(call)
+
+    def _in_call_slot(self, batches: Iterator[pa.RecordBatch]):
+        """
+        Produces the given batches holding a call slot, acquired by the first batch and released once the batches
+        are exhausted or the stream is closed.
+        """
+        with self._call_slots:
+            yield from batches
+
+    def do_get(self, context, ticket):
+        return self._run_call(context, self._do_get, ticket)
 
-        command = json.loads(ast.literal_eval(ticket.ticket.decode()))
-        resource = command["resource"].split(".")[1]
-        if resource not in PocFlightServer.resources:
-            print(f"Unknown resource {resource}")
-            return None
+    def _do_get(self, ticket):
+        try:
+            resource_type, name, api = decode_ticket(ticket.ticket)
+        except ValueError as e:
+            raise fl.FlightServerError(message=str(e))
 
-        api = command["api"]
+        if api == "list":
+            return self.list_resources(resource_type.value)
 
-        print(f"Executing API {api} on {resource}")
-        resource: Resource
+        logger.debug("Executing API %s on %s:%s", api, resource_type, name)
+        resource: Resource = _RESOURCE_CLASSES[resource_type](name, [])
         try:
-            if resource == AuthzedResourceType.A.value:
-                resource = ResourceA("a", [])
-
-                if api == "read":
-                    resource.read_protected()
-                elif api == "edit":
-                    resource.edit_protected()
-            elif resource == AuthzedResourceType.B.value:
-                resource = ResourceB("b", [])
-
-                if api == "read":
-                    resource.read_protected()
-                elif api == "edit":
-                    resource.edit_protected()
-            else:
-                raise NotImplementedError
+            if api == "read":
+                resource.read_protected()
+            elif api == "edit":
+                resource.edit_protected()
         except PermissionError as pe:
             message = str(pe)
             raise fl.FlightUnauthorizedError(message=message)
@@ -105,14 +224,47 @@ class PocFlightServer(fl.FlightServerBase):
         return self.return_result(resource, api)
 
     def return_result(self, resource: Resource, api: str):
-        table = pa.Table.from_arrays(
+        batch = pa.RecordBatch.from_arrays(
             [
                 pa.array([f"{resource.get_type()}:{resource.get_name()}"]),
                 pa.array([api]),
             ],
-            names=["name", "message"],
+            schema=RESULT_SCHEMA,
+        )
+        return fl.GeneratorStream(RESULT_SCHEMA, iter([batch]))
+
+    def list_resources(self, resource_type: str):
+        def batches_of_type():
+            for batch in self._catalog.to_batches(max_chunksize=self._batch_size):
+                yield batch.filter(pc.equal(batch.column("type"), resource_type))
+
+        with _authorization_errors():
+            authorized = ArrowAuthorizer(_get_security_manager()).filter_batches(
+                batches_of_type(), AuthzedAction.READ
+            )
+        return fl.GeneratorStream(
+            self._catalog.schema,
+            self._in_call_slot(_reporting_authorization_errors(authorized)),
         )
-        return pa.flight.RecordBatchStream(table)
+
+    def do_exchange(self, context, descriptor, reader, writer):
+        return self._run_call(context, self._do_exchange, descriptor, reader, writer)
+
+    def _do_exchange(self, descriptor, reader, writer):
+        if descriptor.command != CHECK_COMMAND:
+            raise fl.FlightServerError(message=f"Unknown exchange {descriptor}")
+        if not reader.schema.equals(CHECK_SCHEMA):
+            raise fl.FlightServerError(
+                message=f"Invalid schema of permission checks: {reader.schema}"
+            )
+
+        authorizer = ArrowAuthorizer(_get_security_manager())
+        writer.begin(DECISION_SCHEMA)
+        for chunk in reader:
+            if chunk.data is not None:
+                with _authorization_errors():
+                    decisions = authorizer.check(chunk.data)
+                writer.write_batch(decisions)
 
     def list_actions(self, context):
         return []
@@ -125,12 +277,14 @@ class PocFlightServer(fl.FlightServerBase):
 
 
 if __name__ == "__main__":
+    configure_logging()
     am = get_auth_manager_instance()
-    print(f"am is {am}")
-    server = PocFlightServer()
-    server.serve()
-
-am = get_auth_manager_instance()
-print(f"am is {am}")
-server = PocFlightServer()
-server.serve()
+    logger.info("AuthManager is %s", am)
+    workers = int(os.getenv("FLIGHT_WORKERS", "1"))
+    if workers > 1:
+        from arrow_flight.prefork import serve_workers
+
+        serve_workers(workers)
+    else:
+        server = PocFlightServer()
+        server.serve()
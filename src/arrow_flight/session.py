@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
+import pyarrow.flight as fl
+
+from security.principal import Principal
+
+# The header carrying the session token, both in the server responses and in the client requests
+SESSION_HEADER = "x-flight-session"
+
+
+class SessionManager:
+    """
+    Issues short-lived session tokens for the authenticated principals, so that the bearer token is validated only
+    once per client instead of on every call.
+
+    A session token is made of a random session ID and its expiration time, signed with an HMAC of a secret key
+    generated at startup: forged or tampered tokens are rejected with a single hash computation, while valid ones
+    are resolved to their `Principal` with a dictionary lookup.
+    A session never outlives the access token it was opened for.
+    When `max_sessions` are active, the oldest session is dropped to make room for the new one.
+    """
+
+    def __init__(
+        self,
+        secret: Optional[bytes] = None,
+        ttl: float = 300.0,
+        max_sessions: int = 10000,
+    ):
+        self._secret = secret or os.urandom(32)
+        self._ttl = ttl
+        self._max_sessions = max_sessions
+        self._sessions: dict[str, tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+    def issue(self, principal: Principal, expires_at: Optional[float] = None) -> str:
+        """
+        Opens a new session for the given principal and returns its token.
+        The session expires after the configured `ttl`, or at the given `expires_at` time if earlier, e.g. the
+        expiration of the access token the principal was authenticated with.
+        """
+        expires = time.time() + self._ttl
+        if expires_at is not None:
+            expires = min(expires, expires_at)
+        payload = f"{secrets.token_urlsafe(16)}.{int(expires)}"
+        token = f"{payload}.{self._sign(payload)}"
+        with self._lock:
+            if len(self._sessions) >= self._max_sessions:
+                self._sessions.pop(next(iter(self._sessions)))
+            self._sessions[token] = (expires, principal)
+        return token
+
+    def resolve(self, token: str) -> Optional[Principal]:
+        """
+        Returns the principal of the given session token, or None if the token is invalid or expired.
+        """
+        payload, _, signature = token.rpartition(".")
+        if not payload or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        expires, principal = session
+        if expires < time.time():
+            with self._lock:
+                self._sessions.pop(token, None)
+            return None
+        return principal
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SessionClientMiddlewareFactory(fl.ClientMiddlewareFactory):
+    """
+    A client middleware storing the session token returned by the server and sending it on the following calls.
+    """
+
+    def __init__(self):
+        self.token: Optional[str] = None
+
+    def start_call(self, info):
+        return SessionClientMiddleware(self)
+
+
+class SessionClientMiddleware(fl.ClientMiddleware):
+    def __init__(self, factory: SessionClientMiddlewareFactory):
+        self._factory = factory
+
+    def sending_headers(self):
+        if self._factory.token is None:
+            return {}
+        return {SESSION_HEADER: self._factory.token}
+
+    def received_headers(self, headers):
+        tokens = headers.get(SESSION_HEADER)
+        if tokens:
+            self._factory.token = tokens[0]
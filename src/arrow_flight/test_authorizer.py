@@ -0,0 +1,218 @@
+import json
+
+import assertpy
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+
+from arrow_flight.authorizer import RESOURCE_SCHEMA, ArrowAuthorizer
+from arrow_flight.server import sample_catalog
+from impl import ResourceA, ResourceB
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.security_manager import SecurityManager
+
+ROWS = [
+    {"name": "a", "type": "A", "tags": {"team": "a-team"}},
+    {"name": "a-2024", "type": "A", "tags": {}},
+    {"name": "a-2023", "type": "A", "tags": {"team": "b-team"}},
+    {"name": "b", "type": "B", "tags": {"team": "a-team", "year": "2024"}},
+    {"name": "b-2024", "type": "B", "tags": None},
+    {"name": None, "type": "B", "tags": {}},
+    {"name": "c", "type": "C", "tags": {"team": "a-team"}},
+]
+
+
+def _resources():
+    resources = []
+    for row in ROWS:
+        if row["type"] == "A":
+            resources.append(ResourceA(row["name"], row["tags"]))
+        elif row["type"] == "B":
+            resources.append(ResourceB(row["name"], row["tags"]))
+        else:
+            resources.append(None)
+    return resources
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        DecisionStrategy.UNANIMOUS,
+        DecisionStrategy.AFFIRMATIVE,
+        DecisionStrategy.CONSENSUS,
+    ],
+)
+@pytest.mark.parametrize("user", ["a-reader", "a-team", "auditor", "b-manager", None])
+@pytest.mark.parametrize(
+    "actions",
+    [AuthzedAction.READ, AuthzedAction.EDIT, [AuthzedAction.READ, AuthzedAction.EDIT]],
+)
+def test_mask_matches_check_many(role_manager, permissions, strategy, user, actions):
+    sm = SecurityManager(
+        role_manager=role_manager,
+        policy_enforcer=PolicyEnforcer(decision_strategy=strategy),
+        permissions=permissions,
+    )
+    sm.set_current_user(user)
+    table = pa.Table.from_pylist(ROWS, schema=RESOURCE_SCHEMA)
+
+    mask = ArrowAuthorizer(sm).mask(table, actions).to_pylist()
+
+    resources = _resources()
+    known = [r for r in resources if r is not None]
+    decisions = iter(sm.check_many([(r, actions) for r in known]))
+    expected = [False if r is None else next(decisions).allowed for r in resources]
+    assertpy.assert_that(mask).is_equal_to(expected)
+
+
+def test_filter_record_batch(security_manager):
+    security_manager.set_current_user("auditor")
+    batch = pa.RecordBatch.from_pylist(ROWS, schema=RESOURCE_SCHEMA)
+
+    authorized = ArrowAuthorizer(security_manager).filter(batch, AuthzedAction.READ)
+
+    assertpy.assert_that(authorized).is_instance_of(pa.RecordBatch)
+    assertpy.assert_that(authorized.column("name").to_pylist()).is_equal_to(
+        ["a-2024", "b-2024"]
+    )
+
+
+def test_no_permissions_allow_all(role_manager):
+    sm = SecurityManager(role_manager=role_manager, policy_enforcer=PolicyEnforcer())
+    table = pa.Table.from_pylist(ROWS, schema=RESOURCE_SCHEMA)
+
+    assertpy.assert_that(
+        ArrowAuthorizer(sm).mask(table, AuthzedAction.READ).to_pylist()
+    ).is_equal_to([True] * len(ROWS))
+
+
+def _list(client: fl.FlightClient, user: str, resource_type: AuthzedResourceType):
+    opts = fl.FlightCallOptions(
+        headers=[(b"authorization", f"Bearer {user}".encode("utf-8"))]
+    )
+    command = json.dumps({"resource": str(resource_type), "api": "list"})
+    flight = client.get_flight_info(
+        fl.FlightDescriptor.for_command(command), options=opts
+    )
+    reader = client.do_get(flight.endpoints[0].ticket, options=opts)
+    return reader.read_all().column("name").to_pylist()
+
+
+def test_flight_list(flight_client):
+    assertpy.assert_that(
+        _list(flight_client, "a-reader", AuthzedResourceType.A)
+    ).is_equal_to(["a", "a-2024"])
+    assertpy.assert_that(
+        _list(flight_client, "a-reader", AuthzedResourceType.B)
+    ).is_empty()
+    assertpy.assert_that(
+        _list(flight_client, "auditor", AuthzedResourceType.B)
+    ).is_equal_to(["b-2024"])
+    assertpy.assert_that(
+        _list(flight_client, "b-manager", AuthzedResourceType.B)
+    ).is_equal_to(
+        [row["name"] for row in sample_catalog().to_pylist() if row["type"] == "B"]
+    )
+
+
+def test_flight_list_reports_authorization_failures(flight_client, monkeypatch):
+    def fail(self, plan, data):
+        raise pa.ArrowInvalid("invalid pattern")
+
+    monkeypatch.setattr(ArrowAuthorizer, "_apply", fail)
+
+    with pytest.raises(fl.FlightServerError, match="Cannot authorize the call"):
+        _list(flight_client, "a-reader", AuthzedResourceType.A)
+
+
+def test_filter_batches_evaluates_permissions_eagerly(security_manager):
+    security_manager.set_current_user("auditor")
+    table = pa.Table.from_pylist(ROWS, schema=RESOURCE_SCHEMA)
+
+    batches = ArrowAuthorizer(security_manager).filter_batches(
+        table.to_batches(max_chunksize=2), AuthzedAction.READ
+    )
+    security_manager.set_current_user("b-manager")
+
+    assertpy.assert_that(
+        [batch.column("name").to_pylist() for batch in batches]
+    ).is_equal_to([["a-2024"], ["b-2024"]])
+
+
+def test_flight_list_streams_batches(start_flight_server):
+    catalog = pa.Table.from_pylist(
+        [
+            {"name": f"{t.lower()}-{i}", "type": t, "tags": {}}
+            for i in range(1000)
+            for t in ("A", "B")
+        ],
+        schema=RESOURCE_SCHEMA,
+    )
+    client = start_flight_server(catalog=catalog, batch_size=128)
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer a-reader")])
+    command = json.dumps({"resource": str(AuthzedResourceType.A), "api": "list"})
+    flight = client.get_flight_info(
+        fl.FlightDescriptor.for_command(command), options=opts
+    )
+
+    reader = client.do_get(flight.endpoints[0].ticket, options=opts)
+    batches = [chunk.data for chunk in reader]
+
+    assertpy.assert_that(len(batches)).is_greater_than(1)
+    assertpy.assert_that(max(b.num_rows for b in batches)).is_less_than_or_equal_to(128)
+    assertpy.assert_that(
+        [name for b in batches for name in b.column("name").to_pylist()]
+    ).is_equal_to([f"a-{i}" for i in range(1000)])
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["(?!tmp).*"],
+        ["(a)\\1"],
+        ["a.b"],
+        ["[a-z]+"],
+        ["(x|y)+", "(a)\\1"],
+        ["(?i)ab", "x"],
+        ["(?i)a.b", "(?!tmp)x+"],
+        ["(?P<g>a)b", "(?P<g>x)+"],
+    ],
+)
+def test_mask_matches_check_many_on_python_patterns(role_manager, patterns):
+    sm = SecurityManager(
+        role_manager=role_manager,
+        policy_enforcer=PolicyEnforcer(decision_strategy=DecisionStrategy.AFFIRMATIVE),
+        permissions=[
+            Permission(
+                name="read-matching-A",
+                resources=[
+                    AuthzedResource(type=AuthzedResourceType.A, name_patterns=patterns)
+                ],
+                actions=[AuthzedAction.READ],
+            )
+        ],
+    )
+    names = [
+        "tmp-1",
+        "x",
+        "aa",
+        "ab",
+        "AB",
+        "A\nB",
+        "a\nb",
+        "axb",
+        "xy",
+        "xx",
+        "b\n",
+        "",
+    ]
+    table = pa.Table.from_pylist(
+        [{"name": n, "type": "A", "tags": {}} for n in names], schema=RESOURCE_SCHEMA
+    )
+
+    mask = ArrowAuthorizer(sm).mask(table, AuthzedAction.READ).to_pylist()
+
+    decisions = sm.check_many([(ResourceA(n, {}), AuthzedAction.READ) for n in names])
+    assertpy.assert_that(mask).is_equal_to([d.allowed for d in decisions])
@@ -0,0 +1,115 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import assertpy
+import pyarrow.flight as fl
+import pytest
+
+from arrow_flight.authorizer import ArrowAuthorizer
+
+STREAMS = 64
+CALLS_PER_STREAM = 8
+# The clients listing at once against a slow authorizer, taking `DELAY` seconds per batch
+CLIENTS = 8
+DELAY = 0.1
+
+# The expected outcome of the `list` and `read` apis for each user and resource type
+EXPECTED = {
+    ("a-reader", "A"): (["a", "a-2024"], True),
+    ("a-reader", "B"): ([], False),
+    ("auditor", "A"): (["a-2024"], False),
+    ("auditor", "B"): (["b-2024"], False),
+    ("a-team", "A"): (["a", "a-2024"], False),
+    ("b-manager", "B"): (["b", "b-2024"], True),
+}
+
+
+def _call(client: fl.FlightClient, user: str, resource: str, api: str):
+    opts = fl.FlightCallOptions(
+        headers=[(b"authorization", f"Bearer {user}".encode("utf-8"))]
+    )
+    command = json.dumps({"resource": resource, "api": api})
+    flight = client.get_flight_info(
+        fl.FlightDescriptor.for_command(command), options=opts
+    )
+    return client.do_get(flight.endpoints[0].ticket, options=opts).read_all()
+
+
+def _stream(client: fl.FlightClient, stream: int) -> list[str]:
+    errors = []
+    cases = list(EXPECTED.items())
+    for i in range(CALLS_PER_STREAM):
+        (user, resource), (names, can_read) = cases[(stream + i) % len(cases)]
+        listed = _call(client, user, resource, "list").column("name").to_pylist()
+        if listed != names:
+            errors.append(f"{user} listed {listed} on {resource}")
+        try:
+            _call(client, user, resource, "read")
+            allowed = True
+        except fl.FlightUnauthorizedError:
+            allowed = False
+        if allowed != can_read:
+            errors.append(f"{user} read on {resource} allowed={allowed}")
+    return errors
+
+
+@pytest.mark.parametrize("max_concurrent_calls", [None, 4])
+def test_concurrent_streams(start_flight_server, max_concurrent_calls):
+    client = start_flight_server(max_concurrent_calls=max_concurrent_calls)
+
+    with ThreadPoolExecutor(max_workers=STREAMS) as executor:
+        results = list(
+            executor.map(lambda stream: _stream(client, stream), range(STREAMS))
+        )
+
+    assertpy.assert_that([e for errors in results for e in errors]).is_empty()
+
+
+@pytest.fixture
+def slow_authorizer(monkeypatch):
+    """
+    Makes every authorized batch of the `list` api take `DELAY` seconds, releasing the GIL as a slow I/O would.
+    """
+    apply = ArrowAuthorizer._apply
+
+    def slow_apply(self, plan, data):
+        time.sleep(DELAY)
+        return apply(self, plan, data)
+
+    monkeypatch.setattr(ArrowAuthorizer, "_apply", slow_apply)
+
+
+def _list_concurrently(client: fl.FlightClient) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+        results = list(
+            executor.map(
+                lambda _: _call(client, "a-reader", "A", "list"), range(CLIENTS)
+            )
+        )
+    elapsed = time.perf_counter() - start
+    for table in results:
+        assertpy.assert_that(table.column("name").to_pylist()).is_equal_to(
+            ["a", "a-2024"]
+        )
+    return elapsed
+
+
+def test_concurrent_calls_overlap(start_flight_server, slow_authorizer):
+    client = start_flight_server()
+
+    start = time.perf_counter()
+    _call(client, "a-reader", "A", "list")
+    serial = time.perf_counter() - start
+
+    assertpy.assert_that(_list_concurrently(client)).is_less_than(CLIENTS * serial / 2)
+
+
+def test_call_slots_are_held_while_streaming(start_flight_server, slow_authorizer):
+    client = start_flight_server(max_concurrent_calls=2)
+
+    # Two calls at a time, each one streaming for at least `DELAY` seconds
+    assertpy.assert_that(_list_concurrently(client)).is_greater_than_or_equal_to(
+        CLIENTS / 2 * DELAY
+    )
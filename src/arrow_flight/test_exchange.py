@@ -0,0 +1,112 @@
+import assertpy
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+
+from arrow_flight.authorizer import CHECK_SCHEMA, ArrowAuthorizer
+from arrow_flight.server import CHECK_COMMAND
+from impl import ResourceA, ResourceB
+from security.permissions import AuthzedAction
+from security.principal import Principal
+
+COLUMNS = ["user", "roles", "type", "name", "tags", "action"]
+REQUESTS = [
+    dict(zip(COLUMNS, row))
+    for row in [
+        ("a-reader", None, "A", "a", {}, "read"),
+        ("a-reader", None, "A", "a", {}, "edit"),
+        ("a-reader", None, "B", "b", {}, "read"),
+        ("someone", ["auditor"], "B", "b-2024", {}, "read"),
+        ("someone", ["auditor"], "B", "b-2023", {}, "read"),
+        ("someone", ["a-team"], "B", "b", {"team": "a-team"}, "read"),
+        ("b-manager", None, "B", "b", {}, "all"),
+        ("b-manager", [], "B", "b", {}, "read"),
+        ("a-reader", None, "A", "a", {}, "delete"),
+        ("a-reader", None, "A", "a", {}, None),
+    ]
+]
+
+
+def _expected(sm):
+    expected = []
+    for request in REQUESTS:
+        try:
+            action = AuthzedAction(request["action"])
+        except ValueError:
+            expected.append(False)
+            continue
+        roles = request["roles"]
+        if roles is None:
+            roles = sm.role_manager.get_roles_for_user(request["user"]) or []
+        sm.set_current_principal(Principal(request["user"], roles))
+        resource_class = ResourceA if request["type"] == "A" else ResourceB
+        resource = resource_class(request["name"], request["tags"])
+        expected.append(sm.check_many([(resource, action)])[0].allowed)
+    return expected
+
+
+def test_check(security_manager):
+    batch = pa.RecordBatch.from_pylist(REQUESTS, schema=CHECK_SCHEMA)
+
+    decisions = ArrowAuthorizer(security_manager).check(batch)
+
+    assertpy.assert_that(decisions.column("allowed").to_pylist()).is_equal_to(
+        [True, False, False, True, False, True, True, False, False, False]
+    )
+    assertpy.assert_that(decisions.column("allowed").to_pylist()).is_equal_to(
+        _expected(security_manager)
+    )
+
+
+def test_flight_exchange(flight_client, security_manager):
+    batch = pa.RecordBatch.from_pylist(REQUESTS, schema=CHECK_SCHEMA)
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer service")])
+
+    writer, reader = flight_client.do_exchange(
+        fl.FlightDescriptor.for_command(CHECK_COMMAND), options=opts
+    )
+    writer.begin(CHECK_SCHEMA)
+    decisions = []
+    for _ in range(3):
+        writer.write_batch(batch)
+        decisions.append(reader.read_chunk().data.column("allowed").to_pylist())
+    writer.done_writing()
+    writer.close()
+
+    assertpy.assert_that(decisions).is_equal_to([_expected(security_manager)] * 3)
+
+
+def test_flight_exchange_rejects_invalid_requests(flight_client):
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer service")])
+
+    for command, schema in [
+        (b"unknown", CHECK_SCHEMA),
+        (CHECK_COMMAND, pa.schema([("user", pa.string())])),
+    ]:
+        writer, reader = flight_client.do_exchange(
+            fl.FlightDescriptor.for_command(command), options=opts
+        )
+        with pytest.raises(fl.FlightServerError):
+            writer.begin(schema)
+            writer.done_writing()
+            reader.read_all()
+            writer.close()
+
+
+def test_flight_exchange_reports_authorization_failures(flight_client, monkeypatch):
+    def fail(self, plan, data):
+        raise pa.ArrowInvalid("invalid pattern")
+
+    monkeypatch.setattr(ArrowAuthorizer, "_apply", fail)
+    batch = pa.RecordBatch.from_pylist(REQUESTS, schema=CHECK_SCHEMA)
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer service")])
+
+    writer, reader = flight_client.do_exchange(
+        fl.FlightDescriptor.for_command(CHECK_COMMAND), options=opts
+    )
+    with pytest.raises(fl.FlightServerError, match="Cannot authorize the call"):
+        writer.begin(CHECK_SCHEMA)
+        writer.write_batch(batch)
+        writer.done_writing()
+        reader.read_all()
+        writer.close()
@@ -0,0 +1,106 @@
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import assertpy
+import pyarrow.flight as fl
+
+from arrow_flight.prefork import worker_locations
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.permissions import AuthzedAction, Permission
+from security.registry import dump_permissions
+
+# Runs two workers with the permissions of the given file, unlike the permissions of the auth managers
+SCRIPT = """
+import sys
+from arrow_flight.prefork import serve_workers
+from security.enforcer import PolicyEnforcer
+from security.registry import PermissionRegistry
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager, _set_security_manager
+
+sm = SecurityManager(RoleManager(), PolicyEnforcer(), [])
+_set_security_manager(sm)
+PermissionRegistry(sys.argv[2], sm, poll_interval=0.05).start()
+serve_workers(2, host="127.0.0.1", port=int(sys.argv[1]))
+"""
+
+
+def _read_any(resource_type: AuthzedResourceType) -> Permission:
+    return Permission(
+        name=f"read-any-{resource_type.value}",
+        resources=[AuthzedResource(type=resource_type)],
+        policies=[],
+        actions=[AuthzedAction.READ],
+    )
+
+
+def _list(client: fl.FlightClient, resource: str) -> list[str]:
+    command = json.dumps({"resource": resource, "api": "list"})
+    flight = client.get_flight_info(fl.FlightDescriptor.for_command(command))
+    return client.do_get(flight.endpoints[0].ticket).read_all()["name"].to_pylist()
+
+
+@contextlib.contextmanager
+def _workers(port: int, permissions_path: str):
+    env = dict(os.environ, AUTH_MANAGER="")
+    process = subprocess.Popen(
+        [sys.executable, "-c", SCRIPT, str(port), permissions_path],
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        yield worker_locations("127.0.0.1", port, 2)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=10)
+    time.sleep(0.1)
+    assertpy.assert_that(process.returncode).is_equal_to(0)
+
+
+def test_prefork_workers(tmp_path):
+    path = str(tmp_path / "permissions.yaml")
+    dump_permissions([_read_any(AuthzedResourceType.A)], path)
+
+    with _workers(20000 + os.getpid() % 20000, path) as locations:
+        for location in locations:
+            client = fl.FlightClient(location)
+            client.wait_for_available(timeout=10)
+
+            assertpy.assert_that(_list(client, "A")).is_equal_to(["a", "a-2024"])
+            assertpy.assert_that(_list(client, "B")).is_empty()
+
+            command = json.dumps({"resource": "A", "api": "list"})
+            flights = [
+                client.get_flight_info(fl.FlightDescriptor.for_command(command))
+                for _ in range(2)
+            ]
+            assertpy.assert_that(
+                [f.endpoints[0].locations[0].uri.decode() for f in flights]
+            ).is_equal_to(locations)
+            client.close()
+
+
+def test_prefork_workers_reload_the_permissions(tmp_path):
+    path = str(tmp_path / "permissions.yaml")
+    dump_permissions([_read_any(AuthzedResourceType.A)], path)
+
+    with _workers(20000 + (os.getpid() + 10) % 20000, path) as locations:
+        clients = [fl.FlightClient(location) for location in locations]
+        for client in clients:
+            client.wait_for_available(timeout=10)
+            assertpy.assert_that(_list(client, "B")).is_empty()
+
+        dump_permissions([_read_any(t) for t in AuthzedResourceType], path)
+
+        deadline = time.monotonic() + 10
+        for client in clients:
+            while not _list(client, "B") and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assertpy.assert_that(_list(client, "B")).is_equal_to(["b", "b-2024"])
+            client.close()
@@ -0,0 +1,104 @@
+import json
+import time
+
+import assertpy
+import jwt
+import pyarrow.flight as fl
+import pytest
+
+from arrow_flight.middleware import AuthorizationMiddlewareFactory
+from arrow_flight.session import (
+    SESSION_HEADER,
+    SessionClientMiddlewareFactory,
+    SessionManager,
+)
+from security.principal import Principal
+
+
+def test_resolve_issued_session():
+    sessions = SessionManager()
+    principal = Principal("user", ["role"])
+
+    token = sessions.issue(principal)
+
+    assertpy.assert_that(sessions.resolve(token)).is_same_as(principal)
+    assertpy.assert_that(sessions.resolve(token + "x")).is_none()
+    assertpy.assert_that(sessions.resolve("x" + token)).is_none()
+    assertpy.assert_that(sessions.resolve("")).is_none()
+    assertpy.assert_that(SessionManager().resolve(token)).is_none()
+
+
+def test_expired_session():
+    sessions = SessionManager(ttl=-1)
+
+    token = sessions.issue(Principal("user", []))
+
+    assertpy.assert_that(sessions.resolve(token)).is_none()
+    assertpy.assert_that(sessions).is_length(0)
+
+
+def test_session_expires_with_the_access_token():
+    sessions = SessionManager(ttl=300)
+    principal = Principal("user", [])
+
+    token = sessions.issue(principal, expires_at=time.time() + 0.2)
+    assertpy.assert_that(sessions.resolve(token)).is_same_as(principal)
+
+    time.sleep(0.3)
+    assertpy.assert_that(sessions.resolve(token)).is_none()
+
+
+def test_max_sessions():
+    sessions = SessionManager(max_sessions=2)
+
+    tokens = [sessions.issue(Principal(f"user-{i}", [])) for i in range(3)]
+
+    assertpy.assert_that(sessions).is_length(2)
+    assertpy.assert_that(sessions.resolve(tokens[0])).is_none()
+    assertpy.assert_that(sessions.resolve(tokens[2]).user).is_equal_to("user-2")
+
+
+def _read(client: fl.FlightClient, opts: fl.FlightCallOptions):
+    command = json.dumps({"resource": "AuthzedResourceType.A", "api": "read"})
+    flight = client.get_flight_info(
+        fl.FlightDescriptor.for_command(command), options=opts
+    )
+    return client.do_get(flight.endpoints[0].ticket, options=opts).read_all()
+
+
+def test_flight_validates_bearer_once(start_flight_server, auth_manager):
+    session = SessionClientMiddlewareFactory()
+    client = start_flight_server(client_middleware=[session])
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer a-reader")])
+
+    for _ in range(3):
+        assertpy.assert_that(_read(client, opts).num_rows).is_equal_to(1)
+
+    assertpy.assert_that(session.token).is_not_none()
+    assertpy.assert_that(auth_manager.calls).is_equal_to(1)
+
+
+def test_middleware_sessions_expire_with_the_bearer_token(auth_manager):
+    factory = AuthorizationMiddlewareFactory()
+    expiring = jwt.encode({"sub": "a-reader", "exp": int(time.time()) + 1}, "s" * 32)
+
+    middleware = factory.start_call(None, {"authorization": [f"Bearer {expiring}"]})
+    session_token = middleware.sending_headers()[SESSION_HEADER]
+
+    _, expires, _ = session_token.split(".")
+    assertpy.assert_that(int(expires)).is_less_than_or_equal_to(int(time.time()) + 1)
+    assertpy.assert_that(factory.session_manager.resolve(session_token)).is_not_none()
+    time.sleep(1.1)
+    assertpy.assert_that(factory.session_manager.resolve(session_token)).is_none()
+
+
+def test_flight_without_session(start_flight_server, auth_manager):
+    client = start_flight_server()
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer a-reader")])
+
+    _read(client, opts)
+    assertpy.assert_that(auth_manager.calls).is_equal_to(2)
+
+    forged = fl.FlightCallOptions(headers=[(b"x-flight-session", b"a.b.c")])
+    with pytest.raises(fl.FlightUnauthenticatedError):
+        _read(client, forged)
@@ -0,0 +1,92 @@
+import json
+
+import assertpy
+import pyarrow.flight as fl
+import pytest
+
+from arrow_flight.ticket import (
+    TICKET_VERSION,
+    FlightTicket,
+    decode_ticket,
+    encode_ticket,
+    parse_command,
+)
+from security.authzed_resource import AuthzedResourceType
+
+
+@pytest.mark.parametrize(
+    "ticket",
+    [
+        FlightTicket(AuthzedResourceType.A, "a", "read"),
+        FlightTicket(AuthzedResourceType.B, "", "list"),
+        FlightTicket(AuthzedResourceType.B, "bé-" * 100, "edit"),
+    ],
+)
+def test_roundtrip(ticket):
+    data = encode_ticket(ticket)
+
+    assertpy.assert_that(data[0]).is_equal_to(TICKET_VERSION)
+    assertpy.assert_that(decode_ticket(data)).is_equal_to(ticket)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\x01\x01\x01\x00",
+        bytes([TICKET_VERSION + 1, 1, 1, 0, 1]) + b"a",
+        bytes([TICKET_VERSION, 9, 1, 0, 1]) + b"a",
+        bytes([TICKET_VERSION, 1, 9, 0, 1]) + b"a",
+        bytes([TICKET_VERSION, 1, 1, 0, 2]) + b"a",
+        bytes([TICKET_VERSION, 1, 1, 0, 1]) + b"ab",
+        bytes([TICKET_VERSION, 1, 1, 0, 1]) + b"\xff",
+        repr(json.dumps({"resource": "AuthzedResourceType.A", "api": "read"})).encode(),
+    ],
+)
+def test_decode_rejects_malformed_tickets(data):
+    assertpy.assert_that(decode_ticket).raises(ValueError).when_called_with(data)
+
+
+def test_parse_command():
+    assertpy.assert_that(
+        parse_command(b'{"resource": "AuthzedResourceType.A", "api": "read"}')
+    ).is_equal_to(FlightTicket(AuthzedResourceType.A, "a", "read"))
+    assertpy.assert_that(
+        parse_command(b'{"resource": "B", "name": "b-2024", "api": "edit"}')
+    ).is_equal_to(FlightTicket(AuthzedResourceType.B, "b-2024", "edit"))
+
+    for command in [
+        b"not json",
+        b"[]",
+        b'{"api": "read"}',
+        b'{"resource": "AuthzedResourceType.ALL", "api": "read"}',
+        b'{"resource": "A", "api": "delete"}',
+        b'{"resource": "A", "api": "read", "name": 1}',
+    ]:
+        assertpy.assert_that(parse_command).raises(ValueError).when_called_with(command)
+
+
+def test_flight_tickets(flight_client):
+    opts = fl.FlightCallOptions(headers=[(b"authorization", b"Bearer a-reader")])
+
+    command = json.dumps({"resource": "AuthzedResourceType.A", "api": "read"})
+    flight = flight_client.get_flight_info(
+        fl.FlightDescriptor.for_command(command), options=opts
+    )
+    result = flight_client.do_get(flight.endpoints[0].ticket, options=opts).read_all()
+    assertpy.assert_that(result.to_pylist()).is_equal_to(
+        [{"name": "AuthzedResourceType.A:a", "message": "read"}]
+    )
+
+    flights = list(flight_client.list_flights(options=opts))
+    assertpy.assert_that(flights).is_length(2)
+    assertpy.assert_that(
+        decode_ticket(flights[1].endpoints[0].ticket.ticket)
+    ).is_equal_to(FlightTicket(AuthzedResourceType.B, "b", "list"))
+
+    with pytest.raises(fl.FlightServerError, match="Invalid ticket"):
+        flight_client.do_get(fl.Ticket(b"\x00"), options=opts).read_all()
+    with pytest.raises(fl.FlightServerError, match="Invalid command"):
+        flight_client.get_flight_info(
+            fl.FlightDescriptor.for_command(b"{}"), options=opts
+        )
@@ -0,0 +1,91 @@
+import json
+import struct
+from typing import NamedTuple
+
+from security.authzed_resource import AuthzedResourceType
+
+TICKET_VERSION = 1
+
+# version, resource type code, api code, length of the UTF-8 encoded resource name
+_HEADER = struct.Struct("!BBBH")
+
+_TYPE_CODES = {
+    AuthzedResourceType.A: 1,
+    AuthzedResourceType.B: 2,
+}
+_TYPES_BY_CODE = {code: t for t, code in _TYPE_CODES.items()}
+
+_API_CODES = {
+    "read": 1,
+    "edit": 2,
+    "list": 3,
+}
+_APIS_BY_CODE = {code: api for api, code in _API_CODES.items()}
+
+# Accepts both the `str()` of the enum, e.g. `AuthzedResourceType.A`, and its value
+_TYPES_BY_NAME = {str(t): t for t in _TYPE_CODES} | {t.value: t for t in _TYPE_CODES}
+
+
+class FlightTicket(NamedTuple):
+    """
+    The request identified by a Flight ticket: the `api` to invoke on the resource of the given type and name.
+    """
+
+    resource_type: AuthzedResourceType
+    name: str
+    api: str
+
+
+def parse_command(command: bytes) -> FlightTicket:
+    """
+    Parses the JSON command of a `FlightDescriptor`, like `{"resource": "AuthzedResourceType.A", "api": "read"}`,
+    with an optional resource `name` defaulting to the lowercase type.
+    Raises ValueError if the command is malformed or refers to an unknown resource type or api.
+    """
+    try:
+        payload = json.loads(command)
+        resource_type = _TYPES_BY_NAME[payload["resource"]]
+        api = payload["api"]
+        name = payload.get("name", resource_type.value.lower())
+    except (TypeError, KeyError, AttributeError) as e:
+        raise ValueError(f"Invalid command {command!r}") from e
+    if api not in _API_CODES or not isinstance(name, str):
+        raise ValueError(f"Invalid command {command!r}")
+    return FlightTicket(resource_type, name, api)
+
+
+def encode_ticket(ticket: FlightTicket) -> bytes:
+    """
+    Encodes the ticket in the compact binary format: a fixed-size header with the format version, the codes of the
+    resource type and of the api and the length of the name, followed by the UTF-8 encoded name.
+    """
+    name = ticket.name.encode("utf-8")
+    return (
+        _HEADER.pack(
+            TICKET_VERSION,
+            _TYPE_CODES[ticket.resource_type],
+            _API_CODES[ticket.api],
+            len(name),
+        )
+        + name
+    )
+
+
+def decode_ticket(data: bytes) -> FlightTicket:
+    """
+    Decodes a ticket produced by `encode_ticket`.
+    Raises ValueError if the ticket is malformed, has an unsupported version or unknown codes.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Invalid ticket: too short")
+    version, type_code, api_code, length = _HEADER.unpack_from(data)
+    if version != TICKET_VERSION:
+        raise ValueError(f"Invalid ticket: unsupported version {version}")
+    if len(data) != _HEADER.size + length:
+        raise ValueError("Invalid ticket: wrong name length")
+    resource_type = _TYPES_BY_CODE.get(type_code)
+    api = _APIS_BY_CODE.get(api_code)
+    if resource_type is None or api is None:
+        raise ValueError("Invalid ticket: unknown resource type or api")
+    name = bytes(data[_HEADER.size :]).decode("utf-8")
+    return FlightTicket(resource_type, name, api)
@@ -1,49 +1,66 @@
 from auth.auth_manager import AuthManager, AllowAll
-from auth.oidc_auth_manager import OidcAuthManager
-from auth.kubernetes_auth_manager import KubernetesAuthManager
+import logging
 import os
-from fastapi import Request
-from typing import Any
+import threading
+
+logger = logging.getLogger(__name__)
 
 _auth_manager: AuthManager = None
+_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """
+    Imports the `AuthManager` implementations and the FastAPI dependency only when first accessed, so that importing
+    the package does not import the OIDC, Kubernetes and FastAPI libraries.
+    """
+    if name == "OidcAuthManager":
+        from auth.oidc_auth_manager import OidcAuthManager
+
+        return OidcAuthManager
+    if name == "KubernetesAuthManager":
+        from auth.kubernetes_auth_manager import KubernetesAuthManager
+
+        return KubernetesAuthManager
+    if name == "inject_user_data":
+        from auth.dependencies import inject_user_data
+
+        return inject_user_data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _init_auth_manager():
     """
     Factory function: initializes the global `AuthManager` instance according to the value of the `Auth_MANAGER` env variable.
+    Only the module of the selected `AuthManager` is imported.
     """
 
     global _auth_manager
     auth_manager = os.getenv("AUTH_MANAGER", "").lower()
-    print(f"Creating AuthManager for {auth_manager}")
+    logger.info("Creating AuthManager for %s", auth_manager)
     if auth_manager == "oidc":
-        _auth_manager = OidcAuthManager()
+        from auth.oidc_auth_manager import OidcAuthManager
+
+        manager = OidcAuthManager()
     elif auth_manager == "k8s":
-        _auth_manager = KubernetesAuthManager()
+        from auth.kubernetes_auth_manager import KubernetesAuthManager
+
+        manager = KubernetesAuthManager()
     else:
-        _auth_manager = AllowAll()
-    _auth_manager.init()
+        manager = AllowAll()
+    manager.init()
+    _auth_manager = manager
 
 
 def get_auth_manager_instance() -> AuthManager:
     """
-    The global `AuthManager` instance.
+    The global `AuthManager` instance, initialized by :func:`_init_auth_manager` at the first invocation.
+    Applications should invoke it at startup, to avoid initializing the manager while serving the first request.
     """
 
     global _auth_manager
     if _auth_manager is None:
-        raise RuntimeError(
-            "AuthManager is not initialized. Call '_init_auth_manager()' first."
-        )
+        with _lock:
+            if _auth_manager is None:
+                _init_auth_manager()
     return _auth_manager
-
-
-async def inject_user_data(request: Request) -> Any:
-    """
-    A global function to delegate the injection of user data to the global `AuthManager` instance.
-    """
-
-    return await get_auth_manager_instance().inject_user_data(request)
-
-
-_init_auth_manager()
@@ -1,7 +1,10 @@
-from fastapi import Request
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:
+    # FastAPI is only needed by the REST service
+    from fastapi import Request
+
 
 class AuthManager(ABC):
     def init(self):
@@ -11,7 +14,7 @@ class AuthManager(ABC):
         pass
 
     @abstractmethod
-    async def inject_user_data(self, request: Request) -> Any:
+    async def inject_user_data(self, request: "Request") -> Any:
         """
         A function to initialize the user details (e.g. extract authentication token and obtain
         user ID and roles to be propagated to the security layer).
@@ -28,5 +31,5 @@ class AllowAll(AuthManager):
 
         _set_security_manager(DefaultSecurityManager())
 
-    async def inject_user_data(self, request: Request) -> Any:
+    async def inject_user_data(self, request: "Request") -> Any:
         return True
@@ -1,3 +1,7 @@
+import logging
+import os
+from typing import Optional
+
 from security.permissions import (
     AuthzedAction,
     AuthzedResource,
@@ -5,6 +9,10 @@ from security.permissions import (
     Permission,
 )
 from security.policy import RoleBasedPolicy
+from security.registry import PermissionRegistry
+from security.security_manager import SecurityManager
+
+logger = logging.getLogger(__name__)
 
 
 def setup_permissions():
@@ -38,3 +46,30 @@ def setup_permissions():
         )
     )
     return permissions
+
+
+def setup_permission_registry(sm: SecurityManager) -> Optional[PermissionRegistry]:
+    """
+    When the `PERMISSIONS_FILE` env variable is set, loads the permissions of the given `SecurityManager` from that
+    file and keeps watching it for changes, every `PERMISSIONS_POLL_INTERVAL` seconds (1 by default).
+    Returns the started `PermissionRegistry`, or None when the variable is not set.
+
+    When the `PERMISSIONS_ARTIFACT` env variable is also set, the permissions are loaded at startup from that artifact,
+    compiled with `python -m security.compile`, unless it was not compiled from the current permission file.
+    """
+    path = os.getenv("PERMISSIONS_FILE", "")
+    artifact = os.getenv("PERMISSIONS_ARTIFACT", "")
+    loaded = False
+    if artifact:
+        try:
+            sm.load_compiled(artifact, source_path=path or None)
+            loaded = True
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring the permission artifact %s: %s", artifact, e)
+    if not path:
+        return None
+    registry = PermissionRegistry(
+        path, sm, poll_interval=float(os.getenv("PERMISSIONS_POLL_INTERVAL", "1"))
+    )
+    registry.start(load=not loaded)
+    return registry
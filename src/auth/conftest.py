@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+class JwksStub:
+    """
+    A local JWKS endpoint publishing the public keys of the registered signing keys.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.requests = 0
+        self.delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.delay)
+                body = json.dumps(stub.jwks()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/certs"
+
+    def add_key(self, kid: str):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.keys = {**self.keys, kid: key}
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, private_key in self.keys.items():
+            jwk = json.loads(
+                jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key())
+            )
+            jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+    def token(self, kid: str, claims: dict) -> str:
+        return jwt.encode(
+            claims, self.keys[kid], algorithm="RS256", headers={"kid": kid}
+        )
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def jwks_stub():
+    stub = JwksStub()
+    stub.add_key("key-1")
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def oidc_auth_manager(jwks_stub, monkeypatch):
+    from auth.oidc_auth_manager import OidcAuthManager
+
+    monkeypatch.setenv("OIDC_SERVER_URL", jwks_stub.base_url)
+    monkeypatch.setenv("REALM", "poc")
+    monkeypatch.setenv("CLIENT_ID", "app")
+    manager = OidcAuthManager()
+    manager.init()
+    yield manager
+    manager.jwks_cache.stop()
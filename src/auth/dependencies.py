@@ -0,0 +1,12 @@
+from fastapi import Request
+from typing import Any
+
+from auth import get_auth_manager_instance
+
+
+async def inject_user_data(request: Request) -> Any:
+    """
+    A global function to delegate the injection of user data to the global `AuthManager` instance.
+    """
+
+    return await get_auth_manager_instance().inject_user_data(request)
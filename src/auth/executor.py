@@ -0,0 +1,38 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor = None
+_lock = threading.Lock()
+
+
+def _get_auth_executor() -> ThreadPoolExecutor:
+    """
+    The global executor running the blocking work of the `AuthManager`s, like token signature verification and key
+    fetches, outside of the event loop.
+    Its size is bounded by the `AUTH_EXECUTOR_WORKERS` env variable, 8 by default.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("AUTH_EXECUTOR_WORKERS", "8")),
+                    thread_name_prefix="auth",
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs the given blocking function in the auth executor, without blocking the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_auth_executor(), functools.partial(func, *args, **kwargs)
+    )
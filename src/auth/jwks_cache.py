@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+from typing import Optional
+
+import jwt
+from jwt import PyJWK, PyJWKSet
+from jwt.exceptions import PyJWKClientError
+
+from forking import restart_after_fork
+
+logger = logging.getLogger(__name__)
+
+
+class JwksCache:
+    """
+    A cache of the signing keys published by an OIDC server at the given JWKS `url`, indexed by key ID (`kid`).
+
+    The keys are fetched once and then refreshed:
+    - periodically, every `refresh_interval` seconds, by a background thread started with :meth:`start`
+    - when a token is signed with an unknown `kid`, at most once every `min_refresh_interval` seconds
+
+    Concurrent refresh requests are coalesced into a single HTTP request.
+    The background thread is started again in the child processes forked after :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 10.0,
+        timeout: float = 5.0,
+    ):
+        self._url = url
+        self._headers = headers or {}
+        self._refresh_interval = refresh_interval
+        self._min_refresh_interval = min_refresh_interval
+        self._timeout = timeout
+        self._keys: dict[str, PyJWK] = {}
+        self._last_refresh: Optional[float] = None
+        self._lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        restart_after_fork(self._restart_after_fork)
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    def start(self):
+        """
+        Starts the background thread refreshing the keys every `refresh_interval` seconds.
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._start_refreshing()
+
+    def _start_refreshing(self):
+        self._thread = threading.Thread(
+            target=self._refresh_periodically, name="jwks-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def _restart_after_fork(self):
+        # The refresher of the parent does not exist in a forked child, and may have held the lock while forking
+        self._lock = threading.Lock()
+        self._inflight = None
+        if self._thread is not None:
+            self._stopped = threading.Event()
+            self._start_refreshing()
+
+    def stop(self):
+        """
+        Stops the background refresh thread, if started.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_periodically(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except PyJWKClientError as e:
+                logger.warning("Failed to refresh JWKS from %s: %s", self._url, e)
+            self._stopped.wait(self._refresh_interval)
+
+    def get_signing_key_from_jwt(self, token: str) -> PyJWK:
+        """
+        Returns the key used to sign the given JWT token, according to its `kid` header.
+        """
+        header = jwt.get_unverified_header(token)
+        return self.get_signing_key(header.get("kid"))
+
+    def get_signing_key(self, kid: str) -> PyJWK:
+        """
+        Returns the signing key with the given ID, refreshing the keys if the ID is unknown.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        last_refresh = self._last_refresh
+        if (
+            last_refresh is None
+            or time.monotonic() - last_refresh >= self._min_refresh_interval
+        ):
+            self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise PyJWKClientError(
+                f'Unable to find a signing key that matches: "{kid}"'
+            )
+        return key
+
+    def refresh(self):
+        """
+        Fetches the keys from the JWKS endpoint. If another thread is already fetching them, waits for
+        that fetch to complete instead of sending a new request.
+        """
+        with self._lock:
+            inflight = self._inflight
+            if inflight is None:
+                self._inflight = threading.Event()
+        if inflight is not None:
+            inflight.wait(self._timeout)
+            return
+
+        try:
+            keys = self._fetch_keys()
+            self._keys = keys
+        finally:
+            self._last_refresh = time.monotonic()
+            with self._lock:
+                inflight, self._inflight = self._inflight, None
+            inflight.set()
+
+    def _fetch_keys(self) -> dict[str, PyJWK]:
+        request = urllib.request.Request(self._url, headers=self._headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self._timeout) as response:
+                jwk_set = PyJWKSet.from_dict(json.load(response))
+        except (OSError, ValueError, jwt.PyJWTError) as e:
+            raise PyJWKClientError(f'Fail to fetch data from the url, err: "{e}"')
+
+        return {key.key_id: key for key in jwk_set.keys if key.key_id is not None}
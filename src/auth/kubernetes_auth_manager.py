@@ -1,4 +1,4 @@
-from auth.config import setup_permissions
+from auth.config import setup_permission_registry, setup_permissions
 from security.enforcer import PolicyEnforcer
 from security.security_manager import (
     SecurityManager,
@@ -6,16 +6,22 @@ from security.security_manager import (
     _get_security_manager,
 )
 from security.role_manager import RoleManager
+from security.principal import Principal
 from auth.auth_manager import AuthManager
-from typing import Any
+from security.registry import PermissionRegistry
+from auth.rbac_cache import RbacCache
+from typing import Any, Optional
 from fastapi import Request
 from starlette.authentication import (
     AuthenticationError,
 )
 import binascii
+import logging
 import jwt
 from kubernetes import client, config
 
+logger = logging.getLogger(__name__)
+
 
 class KubernetesAuthManager(AuthManager):
     """
@@ -25,12 +31,15 @@ class KubernetesAuthManager(AuthManager):
     By inspecting the role bindings, this `AuthManager` extract the associated `Role`s and use them
     to populate the `RoleManager`.
     The client `ServiceAccount` is instead used as the user ID.
+    The role bindings are cached in a `RbacCache`, updated by watching the cluster resources.
     """
 
     def __init__(self):
         config.load_incluster_config()
         self.v1 = client.CoreV1Api()
         self.rbac_v1 = client.RbacAuthorizationV1Api()
+        self.rbac_cache = RbacCache(self.rbac_v1)
+        self._permission_registry: Optional[PermissionRegistry] = None
 
     def init(self):
         sm = SecurityManager(
@@ -39,46 +48,22 @@ class KubernetesAuthManager(AuthManager):
             permissions=setup_permissions(),
         )
         _set_security_manager(sm)
+        self._permission_registry = setup_permission_registry(sm)
+        self.rbac_cache.start()
 
     async def inject_user_data(self, request: Request) -> Any:
         sa_namespace, sa_name = decode_token(request)
-        print(f"Received request from {sa_name} in {sa_namespace}")
+        logger.debug("Received request from %s in %s", sa_name, sa_namespace)
 
         roles = self.get_roles(sa_namespace, sa_name)
-        print(f"SA roles are: {roles}")
+        logger.debug("SA roles are: %s", roles)
 
         sm = _get_security_manager()
         current_user = f"{sa_namespace}:{sa_name}"
-        sm.set_current_user(current_user)
-        sm.role_manager.clear()
-        sm.role_manager.add_roles_for_user(current_user, roles)
-
-    def get_roles(self, namespace: str, service_account_name: str) -> list[str]:
-        role_bindings = self.rbac_v1.list_namespaced_role_binding(namespace)
-        cluster_role_bindings = self.rbac_v1.list_cluster_role_binding()
-
-        roles = []
-
-        for binding in role_bindings.items:
-            if binding.subjects is not None:
-                for subject in binding.subjects:
-                    if (
-                        subject.kind == "ServiceAccount"
-                        and subject.name == service_account_name
-                    ):
-                        roles.append(binding.role_ref.name)
-
-        for binding in cluster_role_bindings.items:
-            if binding.subjects is not None:
-                for subject in binding.subjects:
-                    if (
-                        subject.kind == "ServiceAccount"
-                        and subject.name == service_account_name
-                        and subject.namespace == namespace
-                    ):
-                        roles.append(binding.role_ref.name)
+        sm.set_current_principal(Principal(current_user, roles))
 
-        return set(roles)
+    def get_roles(self, namespace: str, service_account_name: str) -> set[str]:
+        return self.rbac_cache.get_roles(namespace, service_account_name)
 
 
 def decode_token(request: Request) -> (str, str):
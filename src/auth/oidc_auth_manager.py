@@ -1,4 +1,4 @@
-from auth.config import setup_permissions
+from auth.config import setup_permission_registry, setup_permissions
 from security.enforcer import PolicyEnforcer
 from security.security_manager import (
     SecurityManager,
@@ -6,15 +6,22 @@ from security.security_manager import (
     _get_security_manager,
 )
 from security.role_manager import RoleManager
+from security.principal import Principal
 from fastapi import HTTPException, Request
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from auth.auth_manager import AuthManager
-from jwt import PyJWKClient
+from security.registry import PermissionRegistry
+from auth.executor import run_blocking
+from auth.jwks_cache import JwksCache
+from auth.token_cache import TokenCache
 import jwt
+import logging
 from typing import Any, Optional
 from dotenv import load_dotenv
 import os
 
+logger = logging.getLogger(__name__)
+
 OIDC_SERVER_URL: str = ""
 REALM: str = ""
 CLIENT_ID: str = ""
@@ -33,8 +40,30 @@ class OidcAuthManager(AuthManager):
     - `OIDC_SERVER_URL`
     - `REALM`
     - `CLIENT_ID`
+
+    The signing keys of the OIDC server are cached for the lifetime of the manager in a `JwksCache`, refreshed
+    in background.
+    Verified tokens are cached in a `TokenCache` until their expiration, so that the REST and Arrow Flight
+    endpoints do not repeat the signature verification of the same token.
+
+    In `inject_user_data`, cached tokens are resolved on the event loop, while the signature verification and any
+    key fetch of new tokens run in the bounded auth executor, so that a slow OIDC server never blocks the other
+    requests.
     """
 
+    def __init__(self):
+        self._jwks_cache: Optional[JwksCache] = None
+        self._token_cache: TokenCache = TokenCache()
+        self._permission_registry: Optional[PermissionRegistry] = None
+
+    @property
+    def jwks_cache(self) -> Optional[JwksCache]:
+        return self._jwks_cache
+
+    @property
+    def token_cache(self) -> TokenCache:
+        return self._token_cache
+
     def init(self):
         sm = SecurityManager(
             role_manager=RoleManager(),
@@ -42,6 +71,7 @@ class OidcAuthManager(AuthManager):
             permissions=setup_permissions(),
         )
         _set_security_manager(sm)
+        self._permission_registry = setup_permission_registry(sm)
 
         load_dotenv("../.env")
         global OIDC_SERVER_URL, REALM, CLIENT_ID
@@ -49,6 +79,11 @@ class OidcAuthManager(AuthManager):
         REALM = os.getenv("REALM")
         CLIENT_ID = os.getenv("CLIENT_ID")
 
+        url = f"{OIDC_SERVER_URL}/realms/{REALM}/protocol/openid-connect/certs"
+        optional_custom_headers = {"User-agent": "custom-user-agent"}
+        self._jwks_cache = JwksCache(url, headers=optional_custom_headers)
+        self._jwks_cache.start()
+
     async def inject_user_data(self, request: Request) -> Any:
         """
         Fetches an access token for the configured client, then decodes it to extract the
@@ -56,24 +91,30 @@ class OidcAuthManager(AuthManager):
         """
 
         access_token = await oauth_2_scheme(request=request)
-        current_user, roles = self.user_details_from_access_token(access_token)
+        cached = (
+            self._token_cache.get(access_token) if access_token is not None else None
+        )
+        if cached is not None:
+            current_user, roles = cached
+        else:
+            current_user, roles = await run_blocking(
+                self.user_details_from_access_token, access_token
+            )
         sm = _get_security_manager()
-        sm.set_current_user(current_user)
-        sm.role_manager.clear()
-        sm.role_manager.add_roles_for_user(current_user, roles)
+        sm.set_current_principal(Principal(current_user, roles))
 
     def user_details_from_access_token(
         self, access_token: Optional[str]
     ) -> (str, list[str]):
-        global OIDC_SERVER_URL
-        global REALM
         global CLIENT_ID
-        url = f"{OIDC_SERVER_URL}/realms/{REALM}/protocol/openid-connect/certs"
-        optional_custom_headers = {"User-agent": "custom-user-agent"}
-        jwks_client = PyJWKClient(url, headers=optional_custom_headers)
+
+        if access_token is not None:
+            cached = self._token_cache.get(access_token)
+            if cached is not None:
+                return cached
 
         try:
-            signing_key = jwks_client.get_signing_key_from_jwt(access_token)
+            signing_key = self._jwks_cache.get_signing_key_from_jwt(access_token)
             data = jwt.decode(
                 access_token,
                 signing_key.key,
@@ -84,7 +125,8 @@ class OidcAuthManager(AuthManager):
 
             current_user = data["preferred_username"]
             roles = data["resource_access"][f"{CLIENT_ID}"]["roles"]
-            print(f"Running for user {current_user} with roles {roles}")
+            logger.debug("Running for user %s with roles %s", current_user, roles)
+            self._token_cache.put(access_token, data.get("exp"), current_user, roles)
             return (current_user, roles)
-        except jwt.exceptions.InvalidTokenError:
+        except (jwt.exceptions.InvalidTokenError, jwt.exceptions.PyJWKClientError):
             raise HTTPException(status_code=401, detail="Not authenticated")
@@ -0,0 +1,183 @@
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Optional
+
+from kubernetes import watch
+from kubernetes.client import RbacAuthorizationV1Api
+from kubernetes.client.rest import ApiException
+
+from forking import restart_after_fork
+
+logger = logging.getLogger(__name__)
+
+_ROLE_BINDINGS = "RoleBinding"
+_CLUSTER_ROLE_BINDINGS = "ClusterRoleBinding"
+_HTTP_GONE = 410
+
+
+class RbacCache:
+    """
+    An informer-style cache of the Kubernetes `RoleBinding`s and `ClusterRoleBinding`s, kept up to date by watch
+    streams and indexed by `(namespace, service account name)`, so that the roles of a `ServiceAccount` are
+    resolved with a dictionary lookup.
+
+    :meth:`start` lists all the bindings before returning, then the watch threads apply the incremental updates.
+    Whenever a watch expires, the bindings of the same kind are listed again.
+    The watch threads are started again in the child processes forked after :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        rbac_v1: RbacAuthorizationV1Api,
+        watch_factory: Callable[[], Any] = watch.Watch,
+        timeout_seconds: int = 300,
+        retry_interval: float = 5.0,
+    ):
+        self._list_functions = {
+            _ROLE_BINDINGS: rbac_v1.list_role_binding_for_all_namespaces,
+            _CLUSTER_ROLE_BINDINGS: rbac_v1.list_cluster_role_binding,
+        }
+        self._watch_factory = watch_factory
+        self._timeout_seconds = timeout_seconds
+        self._retry_interval = retry_interval
+        # (kind, namespace, name) -> (role name, list of (namespace, service account name))
+        self._bindings: dict[
+            tuple[str, str, str], tuple[str, list[tuple[str, str]]]
+        ] = {}
+        self._role_counts: dict[tuple[str, str], Counter] = {}
+        self._roles: dict[tuple[str, str], frozenset[str]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watches: dict[str, Any] = {}
+        self._threads: list[threading.Thread] = []
+        restart_after_fork(self._restart_after_fork)
+
+    def start(self):
+        """
+        Loads all the bindings and starts the watch threads.
+        """
+        self._stopped.clear()
+        self._start_watches({kind: self._relist(kind) for kind in self._list_functions})
+
+    def _start_watches(self, resource_versions: dict[str, Optional[str]]):
+        for kind, resource_version in resource_versions.items():
+            thread = threading.Thread(
+                target=self._watch,
+                args=(kind, resource_version),
+                name=f"rbac-watch-{kind}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _restart_after_fork(self):
+        # The watches of the parent do not exist in a forked child: they are started again from a new list of the
+        # bindings, made by the watch threads so that forking never waits for the API server
+        self._lock = threading.Lock()
+        if self._threads:
+            self._stopped = threading.Event()
+            self._watches = {}
+            self._threads = []
+            self._start_watches(dict.fromkeys(self._list_functions))
+
+    def stop(self):
+        """
+        Stops the watch threads.
+        """
+        self._stopped.set()
+        for w in list(self._watches.values()):
+            w.stop()
+        for thread in self._threads:
+            thread.join(timeout=self._retry_interval)
+        self._threads.clear()
+
+    def get_roles(self, namespace: str, service_account_name: str) -> set[str]:
+        """
+        Returns the names of the roles and cluster roles bound to the given `ServiceAccount`.
+        """
+        return set(self._roles.get((namespace, service_account_name), ()))
+
+    def _watch(self, kind: str, resource_version: Optional[str]):
+        list_function = self._list_functions[kind]
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._relist(kind)
+                w = self._watch_factory()
+                self._watches[kind] = w
+                for event in w.stream(
+                    list_function,
+                    resource_version=resource_version,
+                    timeout_seconds=self._timeout_seconds,
+                ):
+                    if self._stopped.is_set():
+                        break
+                    binding = event["object"]
+                    resource_version = binding.metadata.resource_version
+                    if event["type"] in ("ADDED", "MODIFIED"):
+                        self._update(kind, binding)
+                    elif event["type"] == "DELETED":
+                        self._delete(kind, binding)
+            except ApiException as e:
+                resource_version = None
+                if e.status != _HTTP_GONE:
+                    logger.warning("Failed to watch %ss: %s", kind, e)
+                    self._stopped.wait(self._retry_interval)
+            except Exception as e:
+                resource_version = None
+                logger.warning("Failed to watch %ss: %s", kind, e)
+                self._stopped.wait(self._retry_interval)
+
+    def _relist(self, kind: str) -> str:
+        bindings = self._list_functions[kind]()
+        with self._lock:
+            for key in [k for k in self._bindings if k[0] == kind]:
+                self._remove_locked(key)
+            for binding in bindings.items:
+                self._add_locked(kind, binding)
+        return bindings.metadata.resource_version
+
+    def _update(self, kind: str, binding: Any):
+        with self._lock:
+            self._remove_locked(_binding_key(kind, binding))
+            self._add_locked(kind, binding)
+
+    def _delete(self, kind: str, binding: Any):
+        with self._lock:
+            self._remove_locked(_binding_key(kind, binding))
+
+    def _add_locked(self, kind: str, binding: Any):
+        subjects = []
+        for subject in binding.subjects or []:
+            if subject.kind != "ServiceAccount":
+                continue
+            if kind == _ROLE_BINDINGS:
+                subjects.append((binding.metadata.namespace, subject.name))
+            else:
+                subjects.append((subject.namespace, subject.name))
+        role = binding.role_ref.name
+        self._bindings[_binding_key(kind, binding)] = (role, subjects)
+        for subject in subjects:
+            self._role_counts.setdefault(subject, Counter())[role] += 1
+            self._roles[subject] = frozenset(self._role_counts[subject])
+
+    def _remove_locked(self, key: tuple[str, str, str]):
+        entry = self._bindings.pop(key, None)
+        if entry is None:
+            return
+        role, subjects = entry
+        for subject in subjects:
+            counts = self._role_counts[subject]
+            counts[role] -= 1
+            if counts[role] <= 0:
+                del counts[role]
+            if counts:
+                self._roles[subject] = frozenset(counts)
+            else:
+                del self._role_counts[subject]
+                del self._roles[subject]
+
+
+def _binding_key(kind: str, binding: Any) -> tuple[str, str, str]:
+    return (kind, binding.metadata.namespace or "", binding.metadata.name)
@@ -0,0 +1,31 @@
+import assertpy
+
+from benchmarks.bench_imports import import_times
+
+HEAVY_MODULES = ["kubernetes", "jwt", "dotenv", "fastapi"]
+
+
+def test_allow_all_does_not_import_the_other_managers():
+    times = import_times("import auth; auth.get_auth_manager_instance()")
+
+    assertpy.assert_that(times).contains_key("auth", "security.security_manager")
+    assertpy.assert_that(times).does_not_contain_key(
+        "auth.oidc_auth_manager", "auth.kubernetes_auth_manager", *HEAVY_MODULES
+    )
+
+
+def test_import_does_not_initialize_the_auth_manager():
+    times = import_times("import auth; assert auth._auth_manager is None", "oidc")
+
+    assertpy.assert_that(times).does_not_contain_key(
+        "auth.oidc_auth_manager", *HEAVY_MODULES
+    )
+
+
+def test_lazy_attributes():
+    times = import_times("from auth import OidcAuthManager, inject_user_data")
+
+    assertpy.assert_that(times).contains_key(
+        "auth.oidc_auth_manager", "auth.dependencies", "jwt", "fastapi"
+    )
+    assertpy.assert_that(times).does_not_contain_key("kubernetes")
@@ -0,0 +1,94 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import assertpy
+import pytest
+from jwt.exceptions import PyJWKClientError
+
+from auth.jwks_cache import JwksCache
+
+
+def test_keys_are_cached(jwks_stub):
+    cache = JwksCache(jwks_stub.url)
+    token = jwks_stub.token("key-1", {"sub": "user"})
+
+    for _ in range(10):
+        key = cache.get_signing_key_from_jwt(token)
+
+    assertpy.assert_that(key.key_id).is_equal_to("key-1")
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(1)
+
+
+def test_refresh_on_unknown_kid(jwks_stub):
+    cache = JwksCache(jwks_stub.url, min_refresh_interval=0)
+    cache.get_signing_key("key-1")
+
+    jwks_stub.add_key("key-2")
+    assertpy.assert_that(cache.get_signing_key("key-2").key_id).is_equal_to("key-2")
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(2)
+
+    with pytest.raises(PyJWKClientError):
+        cache.get_signing_key("missing")
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(3)
+
+
+def test_unknown_kid_refresh_is_rate_limited(jwks_stub):
+    cache = JwksCache(jwks_stub.url, min_refresh_interval=60)
+    cache.get_signing_key("key-1")
+
+    for _ in range(5):
+        with pytest.raises(PyJWKClientError):
+            cache.get_signing_key("missing")
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(1)
+
+
+def test_concurrent_misses_are_coalesced(jwks_stub):
+    jwks_stub.delay = 0.2
+    cache = JwksCache(jwks_stub.url)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        keys = list(executor.map(lambda _: cache.get_signing_key("key-1"), range(10)))
+
+    assertpy.assert_that([k.key_id for k in keys]).contains_only("key-1")
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(1)
+
+
+def test_background_refresh(jwks_stub):
+    cache = JwksCache(jwks_stub.url, refresh_interval=0.05, min_refresh_interval=60)
+    cache.start()
+    try:
+        cache.get_signing_key("key-1")
+        jwks_stub.add_key("key-2")
+        key = None
+        deadline = time.monotonic() + 5
+        while key is None and time.monotonic() < deadline:
+            try:
+                key = cache.get_signing_key("key-2")
+            except PyJWKClientError:
+                time.sleep(0.01)
+    finally:
+        cache.stop()
+
+    assertpy.assert_that(key).is_not_none()
+    assertpy.assert_that(jwks_stub.requests).is_greater_than_or_equal_to(2)
+
+
+def test_fetch_errors():
+    cache = JwksCache("http://127.0.0.1:1/certs", timeout=0.5)
+    with pytest.raises(PyJWKClientError):
+        cache.get_signing_key("key-1")
+
+
+def test_refresh_thread_is_restarted_in_forked_children(jwks_stub):
+    cache = JwksCache(jwks_stub.url)
+    cache.start()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # The refresher of the parent is not running in the child
+            os._exit(0 if cache._thread.is_alive() else 1)
+        _, status = os.waitpid(pid, 0)
+        assertpy.assert_that(os.waitstatus_to_exitcode(status)).is_equal_to(0)
+    finally:
+        cache.stop()
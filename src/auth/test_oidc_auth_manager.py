@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import assertpy
+import pytest
+from fastapi import HTTPException
+
+from security.security_manager import _get_security_manager
+
+
+def _claims(username: str, roles: list[str], exp_in: int = 60) -> dict:
+    return {
+        "preferred_username": username,
+        "aud": "account",
+        "exp": int(time.time()) + exp_in,
+        "resource_access": {"app": {"roles": roles}},
+    }
+
+
+def test_user_details(oidc_auth_manager, jwks_stub):
+    token = jwks_stub.token("key-1", _claims("a-reader", ["a-reader"]))
+
+    for _ in range(5):
+        user, roles = oidc_auth_manager.user_details_from_access_token(token)
+
+    assertpy.assert_that(user).is_equal_to("a-reader")
+    assertpy.assert_that(roles).is_equal_to(["a-reader"])
+    assertpy.assert_that(jwks_stub.requests).is_equal_to(1)
+
+
+def test_invalid_tokens(oidc_auth_manager, jwks_stub):
+    expired = jwks_stub.token("key-1", _claims("a-reader", ["a-reader"], exp_in=-60))
+    with pytest.raises(HTTPException):
+        oidc_auth_manager.user_details_from_access_token(expired)
+
+    jwks_stub.add_key("unpublished")
+    unknown = jwks_stub.token("unpublished", _claims("a-reader", ["a-reader"]))
+    jwks_stub.keys.pop("unpublished")
+    with pytest.raises(HTTPException):
+        oidc_auth_manager.user_details_from_access_token(unknown)
+
+
+def test_verified_tokens_are_cached(oidc_auth_manager, jwks_stub, monkeypatch):
+    token = jwks_stub.token("key-1", _claims("b-manager", ["b-reader", "b-editor"]))
+    oidc_auth_manager.user_details_from_access_token(token)
+    assertpy.assert_that(len(oidc_auth_manager.token_cache)).is_equal_to(1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Signature verified again")
+
+    monkeypatch.setattr("jwt.decode", fail)
+    user, roles = oidc_auth_manager.user_details_from_access_token(token)
+    assertpy.assert_that(user).is_equal_to("b-manager")
+    assertpy.assert_that(roles).is_equal_to(["b-reader", "b-editor"])
+
+
+def _request(token: str):
+    from starlette.requests import Request
+
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+def test_inject_user_data_does_not_block_the_event_loop(
+    oidc_auth_manager, jwks_stub, monkeypatch
+):
+    token = jwks_stub.token("key-1", _claims("a-reader", ["a-reader"]))
+    verify = oidc_auth_manager.user_details_from_access_token
+
+    def slow_verify(access_token):
+        # Like a slow fetch of the signing keys
+        time.sleep(0.5)
+        return verify(access_token)
+
+    monkeypatch.setattr(
+        oidc_auth_manager, "user_details_from_access_token", slow_verify
+    )
+
+    async def run():
+        ticks = []
+
+        async def tick():
+            for _ in range(20):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def inject():
+            await oidc_auth_manager.inject_user_data(_request(token))
+            return _get_security_manager().current_principal
+
+        principal, _ = await asyncio.gather(inject(), tick())
+        return principal, ticks
+
+    principal, ticks = asyncio.run(run())
+
+    assertpy.assert_that(principal.user).is_equal_to("a-reader")
+    assertpy.assert_that(principal.roles).is_equal_to(frozenset(["a-reader"]))
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    assertpy.assert_that(max(gaps)).is_less_than(0.25)
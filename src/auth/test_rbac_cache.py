@@ -0,0 +1,211 @@
+import queue
+import time
+
+import assertpy
+from kubernetes.client import (
+    RbacV1Subject,
+    V1ListMeta,
+    V1ObjectMeta,
+    V1RoleBinding,
+    V1RoleBindingList,
+    V1RoleRef,
+    V1ClusterRoleBinding,
+    V1ClusterRoleBindingList,
+)
+from kubernetes.client.rest import ApiException
+
+from auth.rbac_cache import RbacCache
+
+
+def _sa(name: str, namespace: str = None) -> RbacV1Subject:
+    return RbacV1Subject(kind="ServiceAccount", name=name, namespace=namespace)
+
+
+def _role_binding(namespace, name, role, subjects, resource_version="1"):
+    return V1RoleBinding(
+        metadata=V1ObjectMeta(
+            namespace=namespace, name=name, resource_version=resource_version
+        ),
+        role_ref=V1RoleRef(
+            api_group="rbac.authorization.k8s.io", kind="Role", name=role
+        ),
+        subjects=subjects,
+    )
+
+
+def _cluster_role_binding(name, role, subjects, resource_version="1"):
+    return V1ClusterRoleBinding(
+        metadata=V1ObjectMeta(name=name, resource_version=resource_version),
+        role_ref=V1RoleRef(
+            api_group="rbac.authorization.k8s.io", kind="ClusterRole", name=role
+        ),
+        subjects=subjects,
+    )
+
+
+class FakeRbacApi:
+    def __init__(self):
+        self.role_bindings = []
+        self.cluster_role_bindings = []
+        self.list_calls = 0
+
+    def list_role_binding_for_all_namespaces(self, **kwargs):
+        self.list_calls += 1
+        return V1RoleBindingList(
+            items=list(self.role_bindings), metadata=V1ListMeta(resource_version="1")
+        )
+
+    def list_cluster_role_binding(self, **kwargs):
+        self.list_calls += 1
+        return V1ClusterRoleBindingList(
+            items=list(self.cluster_role_bindings),
+            metadata=V1ListMeta(resource_version="1"),
+        )
+
+
+class FakeWatches:
+    """
+    Fake `watch.Watch` factory, streaming the events pushed on a queue for each list function.
+    """
+
+    def __init__(self):
+        self.queues = {}
+
+    def push(self, list_function_name, event_type, obj):
+        self.queues.setdefault(list_function_name, queue.Queue()).put((event_type, obj))
+
+    def expire(self, list_function_name):
+        self.push(list_function_name, "GONE", None)
+
+    def __call__(self):
+        watches = self
+
+        class FakeWatch:
+            def __init__(self):
+                self._stopped = False
+
+            def stop(self):
+                self._stopped = True
+
+            def stream(self, func, **kwargs):
+                events = watches.queues.setdefault(func.__name__, queue.Queue())
+                while not self._stopped:
+                    try:
+                        event_type, obj = events.get(timeout=0.01)
+                    except queue.Empty:
+                        continue
+                    if event_type == "GONE":
+                        raise ApiException(status=410, reason="Gone")
+                    yield {"type": event_type, "object": obj}
+
+        return FakeWatch()
+
+
+def _eventually(assertion, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            assertion()
+            return
+        except AssertionError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def test_initial_list():
+    api = FakeRbacApi()
+    api.role_bindings = [
+        _role_binding("feast", "rb1", "a-reader", [_sa("app"), _sa("other")]),
+        _role_binding("other", "rb2", "a-editor", [_sa("app")]),
+        _role_binding("feast", "rb3", "b-reader", None),
+    ]
+    api.cluster_role_bindings = [
+        _cluster_role_binding("crb1", "admin", [_sa("app", "feast")]),
+        _cluster_role_binding("crb2", "view", [_sa("app", "other")]),
+    ]
+    cache = RbacCache(api, watch_factory=FakeWatches())
+    cache.start()
+    try:
+        assertpy.assert_that(cache.get_roles("feast", "app")).is_equal_to(
+            {"a-reader", "admin"}
+        )
+        assertpy.assert_that(cache.get_roles("other", "app")).is_equal_to(
+            {"a-editor", "view"}
+        )
+        assertpy.assert_that(cache.get_roles("feast", "missing")).is_empty()
+    finally:
+        cache.stop()
+
+
+def test_watch_events():
+    api = FakeRbacApi()
+    api.role_bindings = [_role_binding("feast", "rb1", "a-reader", [_sa("app")])]
+    watches = FakeWatches()
+    cache = RbacCache(api, watch_factory=watches)
+    cache.start()
+    try:
+        rb_events = "list_role_binding_for_all_namespaces"
+        crb_events = "list_cluster_role_binding"
+
+        watches.push(
+            rb_events, "ADDED", _role_binding("feast", "rb2", "a-reader", [_sa("app")])
+        )
+        watches.push(
+            crb_events,
+            "ADDED",
+            _cluster_role_binding("crb1", "b-editor", [_sa("app", "feast")]),
+        )
+        _eventually(
+            lambda: assertpy.assert_that(cache.get_roles("feast", "app")).is_equal_to(
+                {"a-reader", "b-editor"}
+            )
+        )
+
+        watches.push(
+            rb_events,
+            "DELETED",
+            _role_binding("feast", "rb1", "a-reader", [_sa("app")]),
+        )
+        watches.push(
+            rb_events,
+            "MODIFIED",
+            _role_binding("feast", "rb2", "b-reader", [_sa("app")]),
+        )
+        _eventually(
+            lambda: assertpy.assert_that(cache.get_roles("feast", "app")).is_equal_to(
+                {"b-reader", "b-editor"}
+            )
+        )
+
+        watches.push(
+            crb_events,
+            "DELETED",
+            _cluster_role_binding("crb1", "b-editor", [_sa("app", "feast")]),
+        )
+        _eventually(
+            lambda: assertpy.assert_that(cache.get_roles("feast", "app")).is_equal_to(
+                {"b-reader"}
+            )
+        )
+    finally:
+        cache.stop()
+
+
+def test_relist_on_expired_watch():
+    api = FakeRbacApi()
+    api.role_bindings = [_role_binding("feast", "rb1", "a-reader", [_sa("app")])]
+    watches = FakeWatches()
+    cache = RbacCache(api, watch_factory=watches)
+    cache.start()
+    try:
+        api.role_bindings = [_role_binding("feast", "rb2", "a-editor", [_sa("app")])]
+        watches.expire("list_role_binding_for_all_namespaces")
+        _eventually(
+            lambda: assertpy.assert_that(cache.get_roles("feast", "app")).is_equal_to(
+                {"a-editor"}
+            )
+        )
+        assertpy.assert_that(api.list_calls).is_equal_to(3)
+    finally:
+        cache.stop()
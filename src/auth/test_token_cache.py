@@ -0,0 +1,38 @@
+import time
+
+import assertpy
+
+from auth.token_cache import TokenCache
+
+
+def test_expiration():
+    cache = TokenCache()
+    cache.put("valid", time.time() + 60, "user", ["r1"])
+    cache.put("expired", time.time() - 1, "user", ["r1"])
+    cache.put("no-exp", None, "user", ["r1"])
+
+    assertpy.assert_that(cache.get("valid")).is_equal_to(("user", ["r1"]))
+    assertpy.assert_that(cache.get("expired")).is_none()
+    assertpy.assert_that(cache.get("no-exp")).is_none()
+    assertpy.assert_that(len(cache)).is_equal_to(1)
+
+
+def test_bounded_size():
+    cache = TokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("t1", exp, "u1", [])
+    cache.put("t2", exp, "u2", [])
+    cache.get("t1")
+    cache.put("t3", exp, "u3", [])
+
+    assertpy.assert_that(len(cache)).is_equal_to(2)
+    assertpy.assert_that(cache.get("t2")).is_none()
+    assertpy.assert_that(cache.get("t1")).is_equal_to(("u1", []))
+
+
+def test_cached_roles_are_copied():
+    cache = TokenCache()
+    cache.put("t1", time.time() + 60, "u1", ["r1"])
+    cache.get("t1")[1].append("r2")
+
+    assertpy.assert_that(cache.get("t1")).is_equal_to(("u1", ["r1"]))
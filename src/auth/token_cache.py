@@ -0,0 +1,70 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenCache:
+    """
+    A bounded LRU cache of verified access tokens, mapping the SHA-256 hash of each token to the user details
+    extracted from it. Entries expire at the `exp` claim of the token, so a cached token is never accepted
+    past its validity.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self._max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, str, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(access_token: str) -> bytes:
+        return hashlib.sha256(access_token.encode("utf-8")).digest()
+
+    def get(self, access_token: str) -> Optional[tuple[str, list[str]]]:
+        """
+        Returns the `(current_user, roles)` extracted from the given token, or None if the token is not cached
+        or expired.
+        """
+        key = self._key(access_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            exp, current_user, roles = entry
+            if exp <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return (current_user, list(roles))
+
+    def put(
+        self,
+        access_token: str,
+        exp: Optional[float],
+        current_user: str,
+        roles: list[str],
+    ):
+        """
+        Caches the user details of a verified token until its `exp` time. Tokens without expiration are not cached.
+        """
+        if exp is None:
+            return
+        key = self._key(access_token)
+        with self._lock:
+            self._entries[key] = (exp, current_user, tuple(roles))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all the cached tokens.
+        """
+        with self._lock:
+            self._entries.clear()
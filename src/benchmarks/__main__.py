@@ -0,0 +1,103 @@
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from benchmarks import (
+    bench_fastapi,
+    bench_flight,
+    bench_imports,
+    bench_logging,
+    bench_registry,
+    bench_security,
+)
+from benchmarks.synthetic import generate_permissions
+
+SUITES = {
+    "security": bench_security.run,
+    "fastapi": bench_fastapi.run,
+    "flight": bench_flight.run,
+    "registry": bench_registry.run,
+}
+# The suites not depending on the size of the permission sets
+UNSIZED_SUITES = {
+    "logging": bench_logging.run,
+    "imports": bench_imports.run,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv: list[str] = None) -> dict:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Runs the benchmarks of the authorization hot path on synthetic permission sets.",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="10,100,1000,10000,100000",
+        help="comma separated sizes of the synthetic permission sets",
+    )
+    parser.add_argument(
+        "--suites",
+        default=",".join([*SUITES, *UNSIZED_SUITES]),
+        help="comma separated suites to run, out of: %(default)s",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimum time in seconds of each measurement",
+    )
+    parser.add_argument(
+        "--output", help="path of the JSON report, printed to stdout if missing"
+    )
+    args = parser.parse_args(argv)
+
+    suites = args.suites.split(",")
+    unknown = set(suites) - {*SUITES, *UNSIZED_SUITES}
+    if unknown:
+        parser.error(f"unknown suites {sorted(unknown)}")
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        permissions = generate_permissions(size)
+        for suite in suites:
+            if suite in SUITES:
+                print(f"Running {suite} with {size} permissions", file=sys.stderr)
+                results.extend(SUITES[suite](size, args.min_time, permissions))
+    for suite in suites:
+        if suite in UNSIZED_SUITES:
+            print(f"Running {suite}", file=sys.stderr)
+            results.extend(UNSIZED_SUITES[suite](args.min_time))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+
+from benchmarks.synthetic import generate_principals
+from benchmarks.timing import cycle, measure, result
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, Permission
+from security.role_manager import RoleManager
+from security.security_manager import (
+    SecurityManager,
+    _get_security_manager,
+    _set_security_manager,
+)
+
+
+async def _request(app, method: str, path: str) -> int:
+    """
+    Sends a request to the given ASGI application, without any network or HTTP client, and returns the status code.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status["code"]
+
+
+def _expected_status(sm: SecurityManager, principal, resource, action) -> int:
+    if resource is None:
+        return 200
+    sm.set_current_principal(principal)
+    return 200 if sm.check_many([(resource, action)])[0].allowed else 403
+
+
+def run(size: int, min_time: float, permissions: list[Permission]) -> list[dict]:
+    """
+    Measures the end-to-end latency of the protected endpoints of the FastAPI `app`, invoked in process through the
+    ASGI interface. The user injection is replaced by a stand-in setting the next synthetic principal, and each
+    response must have the status expected for that principal: 200 when allowed, 403 when denied.
+    """
+    root = logging.getLogger()
+    previous = (_get_security_manager(), root.level, list(root.handlers))
+    # Importing the app configures the logging
+    import app as poc_app
+    from auth import inject_user_data
+
+    sm = SecurityManager(RoleManager(), PolicyEnforcer(), permissions)
+    _set_security_manager(sm)
+    principals = generate_principals(size)
+    current = {}
+
+    async def inject_principal():
+        sm.set_current_principal(current["principal"])
+
+    poc_app.app.dependency_overrides[inject_user_data] = inject_principal
+    loop = asyncio.new_event_loop()
+    try:
+        results = []
+        for method, path, resource, action in [
+            ("GET", "/", None, None),
+            ("GET", "/a", poc_app.a, AuthzedAction.READ),
+            ("POST", "/b", poc_app.b, AuthzedAction.EDIT),
+        ]:
+            next_case = cycle(
+                [(p, _expected_status(sm, p, resource, action)) for p in principals]
+            )
+
+            def request(method=method, path=path, next_case=next_case):
+                current["principal"], expected = next_case()
+                status = loop.run_until_complete(_request(poc_app.app, method, path))
+                if status != expected:
+                    raise AssertionError(
+                        f"{method} {path} returned {status} instead of {expected}"
+                    )
+
+            ns = measure(request, min_time)
+            results.append(result(f"fastapi {method} {path}", size, ns))
+        return results
+    finally:
+        poc_app.app.dependency_overrides.clear()
+        loop.close()
+        _set_security_manager(previous[0])
+        root.setLevel(previous[1])
+        root.handlers = previous[2]
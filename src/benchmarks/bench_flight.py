@@ -0,0 +1,104 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.flight as fl
+
+import auth
+from arrow_flight.authorizer import CHECK_SCHEMA
+from arrow_flight.server import CHECK_COMMAND, PocFlightServer
+from benchmarks.synthetic import generate_principals, generate_resources
+from benchmarks.timing import measure, result
+from security.enforcer import PolicyEnforcer
+from security.permissions import Permission
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager, _set_security_manager
+
+
+class StandInAuthManager:
+    """
+    Resolves the access tokens, which are the names of the synthetic users, to their principals.
+    """
+
+    def __init__(self, principals):
+        self._principals = {p.user: p for p in principals}
+
+    def user_details_from_access_token(self, access_token: str):
+        principal = self._principals[access_token]
+        return principal.user, list(principal.roles)
+
+
+def _options(user: str) -> fl.FlightCallOptions:
+    return fl.FlightCallOptions(headers=[(b"authorization", f"Bearer {user}".encode())])
+
+
+def run(size: int, min_time: float, permissions: list[Permission]) -> list[dict]:
+    """
+    Measures the latency of the Flight `get_flight_info` + `do_get` round trip against a local `PocFlightServer`,
+    and the throughput of bulk checks sent through `do_exchange`.
+    """
+    principals = generate_principals(size)
+    _set_security_manager(SecurityManager(RoleManager(), PolicyEnforcer(), permissions))
+    previous = (os.environ.get("AUTH_MANAGER"), auth._auth_manager)
+    os.environ["AUTH_MANAGER"] = "bench"
+    auth._auth_manager = StandInAuthManager(principals)
+    server = PocFlightServer(location="grpc://127.0.0.1:0")
+    client = fl.FlightClient(f"grpc://127.0.0.1:{server.port}")
+    try:
+        options = _options(principals[0].user)
+        command = json.dumps({"resource": "A", "api": "read"})
+
+        def read():
+            flight = client.get_flight_info(
+                fl.FlightDescriptor.for_command(command), options=options
+            )
+            try:
+                client.do_get(flight.endpoints[0].ticket, options=options).read_all()
+            except fl.FlightUnauthorizedError:
+                pass
+
+        results = [result("flight read", size, measure(read, min_time))]
+
+        resources = generate_resources()
+        rows = [
+            {
+                "user": principal.user,
+                "roles": sorted(principal.roles),
+                "type": r.get_type().value,
+                "name": r.get_name(),
+                "tags": r.get_tags(),
+                "action": "read",
+            }
+            for principal in principals[:10]
+            for r in resources
+        ]
+        batch = pa.RecordBatch.from_pylist(rows, schema=CHECK_SCHEMA)
+        writer, reader = client.do_exchange(
+            fl.FlightDescriptor.for_command(CHECK_COMMAND), options=options
+        )
+        writer.begin(CHECK_SCHEMA)
+
+        def exchange():
+            writer.write_batch(batch)
+            reader.read_chunk()
+
+        ns = measure(exchange, min_time)
+        writer.done_writing()
+        writer.close()
+        results.append(
+            result(
+                "flight exchange check",
+                size,
+                ns / batch.num_rows,
+                batch_rows=batch.num_rows,
+            )
+        )
+        return results
+    finally:
+        client.close()
+        server.shutdown()
+        if previous[0] is None:
+            os.environ.pop("AUTH_MANAGER", None)
+        else:
+            os.environ["AUTH_MANAGER"] = previous[0]
+        auth._auth_manager = previous[1]
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.timing import result
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The statements whose import time is measured, with the value of the AUTH_MANAGER env variable
+STATEMENTS = {
+    "import auth": ("import auth", ""),
+    "init auth allow-all": ("import auth; auth.get_auth_manager_instance()", ""),
+    "import app": ("import app", ""),
+}
+
+
+def _imports(statement: str, auth_manager: str) -> list[tuple[str, int, int]]:
+    """
+    Runs the given statement in a new interpreter with `-X importtime` and returns the imported modules, in order,
+    with their cumulative import time in microseconds and their nesting depth.
+    """
+    env = dict(os.environ, AUTH_MANAGER=auth_manager)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_SRC,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip())) // 2
+        imports.append((module.strip(), int(cumulative), depth))
+    return imports
+
+
+def import_times(statement: str, auth_manager: str = "") -> dict[str, int]:
+    """
+    Runs the given statement in a new interpreter with `-X importtime` and returns the cumulative import time, in
+    microseconds, of each imported module.
+    """
+    return {
+        module: cumulative
+        for module, cumulative, _ in _imports(statement, auth_manager)
+    }
+
+
+def statement_time(statement: str, auth_manager: str = "") -> int:
+    """
+    Returns the time in microseconds spent by the given statement importing modules, excluding the modules imported
+    at the startup of the interpreter.
+    """
+    startup = {module for module, _, _ in _imports("pass", auth_manager)}
+    return sum(
+        cumulative
+        for module, cumulative, depth in _imports(statement, auth_manager)
+        if depth == 0 and module not in startup
+    )
+
+
+def run(min_time: float = 0.2, repeat: int = 3) -> list[dict]:
+    """
+    Measures the time spent importing modules when importing the `auth` package, initializing it with the `AllowAll`
+    manager and importing the FastAPI `app`, as the best of `repeat` runs in new interpreters.
+    """
+    return [
+        result(
+            name,
+            0,
+            1000 * min(statement_time(statement, auth_manager) for _ in range(repeat)),
+        )
+        for name, (statement, auth_manager) in STATEMENTS.items()
+    ]
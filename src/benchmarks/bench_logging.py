@@ -0,0 +1,37 @@
+import io
+import json
+import logging
+
+from benchmarks.timing import measure, result
+from impl import ResourceA
+from security.security_manager import DefaultSecurityManager, _set_security_manager
+
+
+def run(min_time: float = 0.2) -> list[dict]:
+    """
+    Measures the cost of a protected call with the debug logging disabled and enabled.
+    """
+    _set_security_manager(DefaultSecurityManager())
+    resource = ResourceA("a", {})
+    root = logging.getLogger()
+    previous = (root.level, root.handlers)
+    # Log to memory only, the cost of the console is not measured
+    root.handlers = [logging.StreamHandler(io.StringIO())]
+    try:
+        root.setLevel(logging.WARNING)
+        disabled = measure(resource.read_protected, min_time)
+
+        root.setLevel(logging.DEBUG)
+        enabled = measure(resource.read_protected, min_time)
+    finally:
+        root.setLevel(previous[0])
+        root.handlers = previous[1]
+
+    return [
+        result("logging disabled", 0, disabled),
+        result("logging enabled", 0, enabled),
+    ]
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
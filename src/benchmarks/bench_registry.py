@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import generate_principals, generate_resources
+from benchmarks.timing import cycle, measure, result
+from security.decision_cache import DecisionCache
+from security.enforcer import PolicyEnforcer
+from security.compile import compile_permissions
+from security.permissions import AuthzedAction, Permission
+from security.registry import PermissionRegistry, dump_permissions
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager
+
+
+def run(size: int, min_time: float, permissions: list[Permission]) -> list[dict]:
+    """
+    Measures the `PermissionRegistry` with the given synthetic permissions:
+    - the latency of a reload, from parsing the JSON or YAML permission file to swapping in the compiled snapshot
+    - the latency of loading the same permissions from an artifact of `security.compile`, where the name patterns
+      are compiled later, at the first match
+    - the latency of an uncached `assert_permissions`, while the registry keeps reloading the file in background,
+      with the overhead over the same check when no reload is running (the reloads hold the GIL while parsing)
+    """
+    results = []
+    sm = SecurityManager(RoleManager(), PolicyEnforcer(), [], DecisionCache(max_size=0))
+    next_principal = cycle(generate_principals(size))
+    next_resource = cycle(generate_resources())
+
+    def check():
+        sm.set_current_principal(next_principal())
+        try:
+            sm.assert_permissions(next_resource(), AuthzedAction.READ)
+        except PermissionError:
+            pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format in ["json", "yaml"]:
+            path = os.path.join(directory, f"permissions.{file_format}")
+            dump_permissions(permissions, path)
+            registry = PermissionRegistry(path, sm)
+
+            start = time.perf_counter_ns()
+            registry.reload()
+            results.append(
+                result(
+                    f"registry reload {file_format}",
+                    size,
+                    time.perf_counter_ns() - start,
+                )
+            )
+
+        artifact = os.path.join(directory, "permissions.compiled")
+        compile_permissions(path, artifact)
+        start = time.perf_counter_ns()
+        sm.load_compiled(artifact, source_path=path)
+        results.append(
+            result("registry load compiled", size, time.perf_counter_ns() - start)
+        )
+
+        steady = measure(check, min_time)
+        stopped = threading.Event()
+        reloads = 0
+
+        def reload_continuously():
+            nonlocal reloads
+            while not stopped.is_set():
+                registry.reload()
+                reloads += 1
+
+        reloader = threading.Thread(target=reload_continuously)
+        reloader.start()
+        try:
+            reloading = measure(check, min_time)
+        finally:
+            stopped.set()
+            reloader.join()
+        results.append(
+            result(
+                "registry check during reloads",
+                size,
+                reloading,
+                overhead_ns=round(reloading - steady, 1),
+                reloads=reloads,
+            )
+        )
+    return results
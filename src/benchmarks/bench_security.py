@@ -0,0 +1,128 @@
+import math
+import time
+
+from benchmarks.synthetic import (
+    generate_principals,
+    generate_resources,
+    role_count,
+)
+from benchmarks.timing import cycle, measure, result
+from security.decision_cache import DecisionCache
+from security.enforcer import PolicyEnforcer
+from security.permission_index import PermissionIndex
+from security.permissions import AuthzedAction, Permission
+from security.principal import Principal
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager, _set_security_manager
+
+
+def _assert(sm: SecurityManager, next_principal, next_resource):
+    def check():
+        sm.set_current_principal(next_principal())
+        try:
+            sm.assert_permissions(next_resource(), AuthzedAction.READ)
+        except PermissionError:
+            pass
+
+    return check
+
+
+def _call(method_name: str, sm: SecurityManager, next_principal, next_resource):
+    def call():
+        sm.set_current_principal(next_principal())
+        try:
+            getattr(next_resource(), method_name)()
+        except PermissionError:
+            pass
+
+    return call
+
+
+def run(size: int, min_time: float, permissions: list[Permission]) -> list[dict]:
+    """
+    Measures the authorization hot path with the given synthetic permissions:
+    - the compilation of the `PermissionIndex`
+    - `PolicyEnforcer.enforce_policy`, without any decision cache
+    - `SecurityManager.assert_permissions`, with and without the decision cache
+    - a method protected by `require_permissions` and an unprotected one, invoked on the same resources
+    - the same methods invoked repeatedly by a single principal on a single resource, where the decision is always
+      cached and the measured overhead is the one of the per-call path of `require_permissions`; the principal holds
+      all the roles, so that it is allowed by all the given permissions
+    """
+    results = []
+    start = time.perf_counter_ns()
+    PermissionIndex(permissions)
+    results.append(result("build_index", size, time.perf_counter_ns() - start))
+
+    principals = generate_principals(size)
+    resources = generate_resources()
+    role_manager = RoleManager()
+    enforcer = PolicyEnforcer()
+    enforcer.index_for(permissions)
+
+    next_principal, next_resource = cycle(principals), cycle(resources)
+
+    def enforce():
+        principal = next_principal()
+        enforcer.enforce_policy(
+            role_manager,
+            permissions,
+            principal.user,
+            next_resource(),
+            [AuthzedAction.READ],
+            principal,
+        )
+
+    results.append(result("enforce_policy", size, measure(enforce, min_time)))
+
+    uncached = SecurityManager(
+        role_manager, PolicyEnforcer(), permissions, DecisionCache(max_size=0)
+    )
+    results.append(
+        result(
+            "assert_permissions_uncached",
+            size,
+            measure(_assert(uncached, next_principal, next_resource), min_time),
+        )
+    )
+
+    sm = SecurityManager(role_manager, PolicyEnforcer(), permissions)
+    # Principals and resources advance together: warm up the decision cache with all the pairs of a full cycle
+    check = _assert(sm, next_principal, next_resource)
+    for _ in range(math.lcm(len(principals), len(resources))):
+        check()
+    results.append(result("assert_permissions_cached", size, measure(check, min_time)))
+
+    _set_security_manager(sm)
+    protected = measure(
+        _call("read_protected", sm, next_principal, next_resource), min_time
+    )
+    unprotected = measure(
+        _call("unprotected", sm, next_principal, next_resource), min_time
+    )
+    results.append(
+        result(
+            "require_permissions",
+            size,
+            protected,
+            overhead_ns=round(protected - unprotected, 1),
+        )
+    )
+
+    sm.set_current_principal(
+        Principal("steady", {f"role-{i}" for i in range(role_count(size))})
+    )
+    resource = resources[0]
+    resource.read_protected()
+    protected = measure(resource.read_protected, min_time)
+    unprotected = measure(resource.unprotected, min_time)
+    results.append(
+        result(
+            "require_permissions steady",
+            size,
+            protected,
+            overhead_ns=round(protected - unprotected, 1),
+            overhead_ratio=round(protected / unprotected, 1),
+        )
+    )
+    return results
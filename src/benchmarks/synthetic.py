@@ -0,0 +1,96 @@
+import random
+
+from impl import ResourceA, ResourceB
+from resources import Resource
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import RoleBasedPolicy
+from security.principal import Principal
+
+_TYPES = [AuthzedResourceType.A, AuthzedResourceType.B, AuthzedResourceType.ALL]
+_ACTIONS = [[AuthzedAction.READ], [AuthzedAction.EDIT], [AuthzedAction.ALL]]
+_TEAMS = 50
+_NAMES = 1000
+
+
+def role_count(size: int) -> int:
+    """
+    The number of distinct roles used by a synthetic permission set of the given size.
+    """
+    return max(10, size // 10)
+
+
+def generate_permissions(size: int, seed: int = 0) -> list[Permission]:
+    """
+    Generates `size` permissions on random resource types and actions, where:
+    - one third of the resources is filtered by a name pattern
+    - one third of the resources is filtered by a required tag
+    - each permission requires one or two roles, out of :func:`role_count` roles
+    """
+    rnd = random.Random(seed)
+    roles = role_count(size)
+    permissions = []
+    for i in range(size):
+        kind = i % 3
+        resource_type = rnd.choice(_TYPES)
+        if kind == 0:
+            resource = AuthzedResource(
+                type=resource_type,
+                name_patterns=[f"res-{rnd.randrange(_NAMES)}(-.*)?"],
+            )
+        elif kind == 1:
+            resource = AuthzedResource(
+                type=resource_type,
+                required_tags={"team": f"team-{rnd.randrange(_TEAMS)}"},
+            )
+        else:
+            resource = AuthzedResource(type=resource_type)
+        permissions.append(
+            Permission(
+                name=f"permission-{i}",
+                resources=[resource],
+                policies=[
+                    RoleBasedPolicy(
+                        roles=[
+                            f"role-{rnd.randrange(roles)}"
+                            for _ in range(rnd.randint(1, 2))
+                        ]
+                    )
+                ],
+                actions=rnd.choice(_ACTIONS),
+                decision_strategy=DecisionStrategy.UNANIMOUS,
+            )
+        )
+    return permissions
+
+
+def generate_principals(size: int, count: int = 100, seed: int = 0) -> list[Principal]:
+    """
+    Generates `count` principals, each one with up to 5 of the roles of a synthetic permission set of the given size.
+    """
+    rnd = random.Random(seed)
+    roles = role_count(size)
+    return [
+        Principal(
+            f"user-{i}",
+            {f"role-{rnd.randrange(roles)}" for _ in range(rnd.randint(1, 5))},
+        )
+        for i in range(count)
+    ]
+
+
+def generate_resources(count: int = 1000, seed: int = 0) -> list[Resource]:
+    """
+    Generates `count` resources of random type, name and team.
+    """
+    rnd = random.Random(seed)
+    resources = []
+    for i in range(count):
+        resource_class = rnd.choice([ResourceA, ResourceB])
+        resources.append(
+            resource_class(
+                f"res-{rnd.randrange(_NAMES)}-{i}",
+                {"team": f"team-{rnd.randrange(_TEAMS)}"},
+            )
+        )
+    return resources
@@ -0,0 +1,44 @@
+import json
+
+import assertpy
+
+from benchmarks.__main__ import main
+from benchmarks.synthetic import generate_permissions
+
+
+def test_generate_permissions():
+    permissions = generate_permissions(30)
+
+    assertpy.assert_that(permissions).is_length(30)
+    assertpy.assert_that([p.name for p in generate_permissions(30)]).is_equal_to(
+        [p.name for p in permissions]
+    )
+    assertpy.assert_that(
+        [r.name_patterns for p in permissions for r in p.resources if r.name_patterns]
+    ).is_length(10)
+
+
+def test_report(tmp_path):
+    output = tmp_path / "report.json"
+
+    main(["--sizes", "10", "--min-time", "0.001", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assertpy.assert_that(report["meta"]).contains_key("commit", "python", "timestamp")
+    names = [r["name"] for r in report["results"]]
+    assertpy.assert_that(names).contains(
+        "enforce_policy",
+        "assert_permissions_cached",
+        "require_permissions",
+        "require_permissions steady",
+        "fastapi GET /a",
+        "flight read",
+        "flight exchange check",
+        "registry reload yaml",
+        "registry load compiled",
+        "registry check during reloads",
+        "logging disabled",
+        "import auth",
+    )
+    for r in report["results"]:
+        assertpy.assert_that(r["ns_per_op"]).is_greater_than(0)
@@ -0,0 +1,52 @@
+import time
+from typing import Callable
+
+
+def measure(
+    func: Callable[[], object], min_time: float = 0.2, repeat: int = 3
+) -> float:
+    """
+    Returns the best time of `repeat` runs of the given function, in nanoseconds per call.
+    Each run loops over the function for at least `min_time` seconds, doubling the number of calls until then.
+    """
+    best = None
+    for _ in range(repeat):
+        number = 1
+        while True:
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= min_time * 1e9:
+                break
+            number *= 2
+        per_call = elapsed / number
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def result(name: str, size: int, ns_per_op: float, **extra) -> dict:
+    """
+    A benchmark result, as written to the JSON report.
+    """
+    return {
+        "name": name,
+        "size": size,
+        "ns_per_op": round(ns_per_op, 1),
+        "ops_per_sec": round(1e9 / ns_per_op, 1) if ns_per_op else None,
+        **extra,
+    }
+
+
+def cycle(items: list) -> Callable[[], object]:
+    """
+    Returns a function returning the given items in a round-robin.
+    """
+    state = {"i": 0}
+
+    def next_item():
+        i = state["i"]
+        state["i"] = i + 1 if i + 1 < len(items) else 0
+        return items[i]
+
+    return next_item
@@ -0,0 +1,20 @@
+import os
+import weakref
+from typing import Callable
+
+
+def restart_after_fork(restart: Callable[[], None]):
+    """
+    Invokes the given bound method in every child process forked from now on, as long as its object is alive.
+
+    Background threads do not survive fork(): the objects owning them use it to create again their locks, which a
+    thread of the parent may have held while forking, and to restart their threads in the child.
+    """
+    ref = weakref.WeakMethod(restart)
+
+    def after_in_child():
+        method = ref()
+        if method is not None:
+            method()
+
+    os.register_at_fork(after_in_child=after_in_child)
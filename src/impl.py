@@ -1,8 +1,12 @@
+import logging
+
 from resources import Resource
 from security.security_manager import require_permissions
 from security.authzed_resource import AuthzedResourceType
 from security.permissions import AuthzedAction
 
+logger = logging.getLogger(__name__)
+
 
 class ResourceA(Resource):
     def __init__(self, name, tags):
@@ -13,14 +17,14 @@ class ResourceA(Resource):
 
     @require_permissions(actions=[AuthzedAction.READ])
     def read_protected(self):
-        print(f"Calling read_protected on {self.name}")
+        logger.debug("Calling read_protected on %s", self.name)
 
     @require_permissions(actions=[AuthzedAction.EDIT])
     def edit_protected(self):
-        print(f"Calling edit_protected on {self.name}")
+        logger.debug("Calling edit_protected on %s", self.name)
 
     def unprotected(self):
-        print(f"Calling unprotected on {self.name}")
+        logger.debug("Calling unprotected on %s", self.name)
 
 
 class ResourceB(Resource):
@@ -32,11 +36,11 @@ class ResourceB(Resource):
 
     @require_permissions(actions=[AuthzedAction.READ])
     def read_protected(self):
-        print(f"Calling read_protected on {self.name}")
+        logger.debug("Calling read_protected on %s", self.name)
 
     @require_permissions(actions=[AuthzedAction.EDIT])
     def edit_protected(self):
-        print(f"Calling edit_protected on {self.name}")
+        logger.debug("Calling edit_protected on %s", self.name)
 
     def unprotected(self):
-        print(f"Calling unprotected on {self.name}")
+        logger.debug("Calling unprotected on %s", self.name)
@@ -0,0 +1,46 @@
+import logging
+import os
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """
+    Parses a comma separated list of `logger=LEVEL` pairs, like `security.enforcer=DEBUG,auth=INFO`, into a
+    dictionary of logger names and levels.
+    Raises ValueError for unknown levels or malformed pairs.
+    """
+    levels = {}
+    for pair in spec.split(","):
+        if not pair.strip():
+            continue
+        name, sep, level = pair.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Invalid logger level {pair!r}")
+        levels[name.strip()] = _level_of(level)
+    return levels
+
+
+def _level_of(level: str) -> int:
+    # Returns the number of a known level name, and a "Level ..." string otherwise
+    value = logging.getLevelName(level.strip().upper())
+    if isinstance(value, int):
+        return value
+    raise ValueError(f"Unknown log level {level!r}")
+
+
+def configure_logging(level: Optional[str] = None, levels: Optional[str] = None):
+    """
+    Configures the logging of the POC applications.
+    The root level is given by `level`, or the `LOG_LEVEL` env variable, and defaults to `WARNING`: the debug messages
+    of the authorization hot path are then discarded without being formatted.
+    The levels of single modules are given by `levels`, or the `LOG_LEVELS` env variable, as a comma separated list of
+    `logger=LEVEL` pairs, e.g. `LOG_LEVELS=security.enforcer=DEBUG,auth=INFO`.
+    """
+    level = level if level is not None else os.getenv("LOG_LEVEL", "WARNING")
+    levels = levels if levels is not None else os.getenv("LOG_LEVELS", "")
+    logging.basicConfig(format=LOG_FORMAT, level=_level_of(level))
+    logging.getLogger().setLevel(_level_of(level))
+    for name, value in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(value)
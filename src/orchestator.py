@@ -1,7 +1,11 @@
+import logging
+
 from impl import ResourceA, ResourceB
 from security.permissions import AuthzedAction
 from security.security_manager import SecurityManager
 
+logger = logging.getLogger(__name__)
+
 
 class Orchestrator:
     def __init__(self, sm: SecurityManager) -> None:
@@ -9,37 +13,31 @@ class Orchestrator:
 
     def do_something(self, a: ResourceA, b: ResourceB) -> list[str]:
         messages: list[str] = []
-        # Read from A
-        try:
-            print(f"Trying read from {a}")
-            self.sm.assert_permissions(a, AuthzedAction.READ)
-            a.read_protected()
-            messages.append("DONE a.read_protected()")
-        except PermissionError as e:
-            messages.append(f"{e}")
-
-        try:
-            print(f"Trying read from {b}")
-            self.sm.assert_permissions(b, AuthzedAction.READ)
-            b.read_protected()
-            messages.append("DONE b.read_protected()")
-        except PermissionError as e:
-            messages.append(f"{e}")
-
-        try:
-            print(f"Trying edit of {a}")
-            self.sm.assert_permissions(a, AuthzedAction.EDIT)
-            a.edit_protected()
-            messages.append("DONE a.edit_protected()")
-        except PermissionError as e:
-            messages.append(f"{e}")
+        # All the permissions are checked in a single batch
+        logger.debug("Trying read from %s and %s, edit of %s and %s", a, b, a, b)
+        decisions = self.sm.check_many(
+            [
+                (a, AuthzedAction.READ),
+                (b, AuthzedAction.READ),
+                (a, AuthzedAction.EDIT),
+                (b, AuthzedAction.EDIT),
+            ]
+        )
+        calls = [
+            (a.read_protected, "DONE a.read_protected()"),
+            (b.read_protected, "DONE b.read_protected()"),
+            (a.edit_protected, "DONE a.edit_protected()"),
+            (b.edit_protected, "DONE b.edit_protected()"),
+        ]
 
-        try:
-            print(f"Trying edit of {b}")
-            self.sm.assert_permissions(b, AuthzedAction.EDIT)
-            b.edit_protected()
-            messages.append("DONE b.edit_protected()")
-        except PermissionError as e:
-            messages.append(f"{e}")
+        for decision, (call, done) in zip(decisions, calls):
+            if not decision.allowed:
+                messages.append(decision.explain)
+                continue
+            try:
+                call()
+                messages.append(done)
+            except PermissionError as e:
+                messages.append(f"{e}")
 
         return messages
@@ -15,5 +15,5 @@ class Resource(ABC):
     def get_type(self) -> AuthzedResourceType:
         raise NotImplementedError
 
-    def get_tags(self) -> list[str]:
+    def get_tags(self) -> dict[str, str]:
         return self.tags
@@ -1,4 +1,6 @@
 import enum
+import functools
+import re
 from typing import Optional
 
 
@@ -12,10 +14,33 @@ class AuthzedResourceType(enum.Enum):
     B = "B"
 
 
+# Backreferences, named or numbered, and conditionals on groups; escaped backslashes are conservatively included
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _combinable(pattern: str) -> bool:
+    """
+    Returns True if the given pattern can be embedded in a combined expression: backreferences to numbered groups
+    would point to other groups once the preceding groups are added, named groups would clash with the same names
+    in other patterns, and global inline flags are only valid at the start of an expression.
+    """
+    if _GROUP_REFERENCE.search(pattern):
+        return False
+    try:
+        return not re.compile(f".(?:{pattern})").groupindex
+    except re.error:
+        return False
+
+
 class AuthzedResource:
     """
     The AuthzedResource identifies the protected resources by class type and optional filters
-    based on the resource name and tags
+    based on the resource name and tags.
+    The `name_patterns` are regular expressions, and a resource matches if its name fully matches any of them.
+    The patterns are combined into a single expression, except the ones that cannot be combined, like the ones with
+    backreferences, named groups or global inline flags, which are compiled one by one.
+    The `required_tags` must all be defined, with the same values, in the resource tags.
     """
 
     def __init__(
@@ -27,3 +52,42 @@ class AuthzedResource:
         self.type = type
         self.name_patterns = name_patterns
         self.required_tags = required_tags
+        self._name_regexes = self._compile_name_patterns()
+
+    def _compile_name_patterns(self) -> Optional[list[re.Pattern]]:
+        if not self.name_patterns:
+            return None
+        combined = [p for p in self.name_patterns if _combinable(p)]
+        regexes = [
+            re.compile(p, re.DOTALL) for p in self.name_patterns if not _combinable(p)
+        ]
+        if combined:
+            regexes.insert(
+                0, re.compile("|".join(f"(?:{p})" for p in combined), re.DOTALL)
+            )
+        return regexes
+
+    def __getstate__(self):
+        # The regexes are compiled again at the first match when unpickled
+        return {**self.__dict__, "_name_regexes": None}
+
+    def match_name(self, name: str) -> bool:
+        """
+        Returns True if there are no `name_patterns` or the given name fully matches any of them.
+        """
+        if not self.name_patterns:
+            return True
+        if self._name_regexes is None:
+            self._name_regexes = self._compile_name_patterns()
+        name = name or ""
+        return any(regex.fullmatch(name) is not None for regex in self._name_regexes)
+
+    def match_tags(self, tags: dict[str, str]) -> bool:
+        """
+        Returns True if all the `required_tags` are included in the given tags.
+        """
+        if not self.required_tags:
+            return True
+        if not isinstance(tags, dict):
+            return False
+        return all(tags.get(k) == v for k, v in self.required_tags.items())
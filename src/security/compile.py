@@ -0,0 +1,48 @@
+import argparse
+import logging
+import sys
+
+from security.permission_index import PermissionIndex
+from security.registry import load_permissions
+from security.snapshot import CompiledPermissions, file_digest, write_compiled
+
+logger = logging.getLogger(__name__)
+
+
+def compile_permissions(source_path: str, artifact_path: str) -> CompiledPermissions:
+    """
+    Compiles the permissions of the given YAML or JSON file, as read by `load_permissions`, into an artifact that
+    `SecurityManager.load_compiled` loads without parsing the file nor building the `PermissionIndex` again.
+    Raises ValueError or TypeError if the file is not a valid permission document.
+    """
+    # The digest is computed first: an artifact compiled from a file changed in the meantime is found stale
+    source_digest = file_digest(source_path)
+    permissions = load_permissions(source_path)
+    index = PermissionIndex(permissions)
+    write_compiled(permissions, index, source_digest, artifact_path)
+    return CompiledPermissions(source_digest, permissions, index)
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m security.compile",
+        description="Compiles a permission file into an artifact loaded at startup by the SecurityManager.",
+    )
+    parser.add_argument("source", help="path of the YAML or JSON permission file")
+    parser.add_argument("artifact", help="path of the compiled artifact to write")
+    args = parser.parse_args(argv)
+
+    try:
+        compiled = compile_permissions(args.source, args.artifact)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Cannot compile {args.source}: {e}", file=sys.stderr)
+        return 1
+    print(
+        f"Compiled {len(compiled.permissions)} permissions from {args.source} "
+        f"to {args.artifact} (sha256 {compiled.source_digest.hex()})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
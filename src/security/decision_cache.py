@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+from resources import Resource
+from security.permissions import AuthzedAction
+
+
+class DecisionCache:
+    """
+    A bounded LRU cache of authorization decisions, with an optional time-to-live for each entry.
+    Keys are computed with :func:`decision_key` from the user roles, the resource identity and the requested actions,
+    so that users sharing the same roles share the same cached decisions.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 300.0):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, tuple[bool, str]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[tuple[bool, str]]:
+        """
+        Returns the cached decision for the given key, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, decision = entry
+                if self._ttl is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return decision
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, decision: tuple[bool, str]):
+        """
+        Stores the given decision, evicting the least recently used entry when the cache is full.
+        """
+        expires_at = time.monotonic() + self._ttl if self._ttl is not None else 0
+        with self._lock:
+            self._entries[key] = (expires_at, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all the cached decisions. Hit and miss counters are preserved.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def _tags_fingerprint(tags: Any) -> Hashable:
+    if not tags:
+        return None
+    if isinstance(tags, dict):
+        return frozenset(tags.items())
+    return tuple(tags)
+
+
+def actions_key(actions: Iterable[AuthzedAction]) -> tuple[str, ...]:
+    """
+    The representation of the requested actions in the cache keys: the tuple of their values, which is hashed without
+    invoking the Python `__hash__` of the enum and can be computed once for a protected method.
+    For the same reason, the keys hold the value of the resource type.
+    """
+    return tuple(a.value for a in actions)
+
+
+def decision_key(
+    roles: Optional[list[str]],
+    resource: Resource,
+    actions: list[AuthzedAction],
+    version: int = 0,
+) -> Hashable:
+    """
+    Builds the canonical cache key of an authorization request. The roles are folded into a `frozenset`, so that
+    the key does not depend on their order, while `None` identifies a user without any registered role.
+    The `version` identifies the permissions the decision was taken with.
+    """
+    return decision_key_for(roles, resource, actions_key(actions), version)
+
+
+def decision_key_for(
+    roles: Optional[list[str]],
+    resource: Resource,
+    key_of_actions: tuple[str, ...],
+    version: int = 0,
+) -> Hashable:
+    """
+    Builds the same key of :func:`decision_key`, given the key of the actions computed by :func:`actions_key`.
+    """
+    return (
+        version,
+        frozenset(roles) if roles is not None else None,
+        resource.get_type().value,
+        resource.get_name(),
+        _tags_fingerprint(resource.get_tags()),
+        key_of_actions,
+    )
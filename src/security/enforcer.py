@@ -1,14 +1,90 @@
-from security.permissions import AuthzedAction, Permission
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.permission_index import PermissionIndex
+from security.policy import Policy
+from security.principal import Principal
 from resources import Resource
 from security.role_manager import RoleManager
+from typing import Callable, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def decide(
+    decision_strategy: DecisionStrategy,
+    decisions: Iterable[tuple[bool, str]],
+    count: int,
+) -> tuple[bool, str]:
+    """
+    Combines the given `count` decisions according to the decision strategy, consuming them lazily and stopping as
+    soon as the outcome is decided:
+    - `UNANIMOUS`: all the decisions must grant, stops at the first denial
+    - `AFFIRMATIVE`: at least one decision must grant, stops at the first grant
+    - `CONSENSUS`: the grants must be more than the denials, stops when either reaches the majority
+    """
+    grants = 0
+    denies = 0
+    denials = []
+    for result, explain in decisions:
+        if result:
+            grants += 1
+            if decision_strategy == DecisionStrategy.AFFIRMATIVE or (
+                decision_strategy == DecisionStrategy.CONSENSUS and 2 * grants > count
+            ):
+                return (True, "")
+        else:
+            denies += 1
+            if explain:
+                denials.append(explain)
+            if decision_strategy == DecisionStrategy.CONSENSUS:
+                if 2 * denies >= count:
+                    return (False, " ".join(denials))
+            elif decision_strategy != DecisionStrategy.AFFIRMATIVE:
+                return (False, " ".join(denials))
+    if decision_strategy in (DecisionStrategy.AFFIRMATIVE, DecisionStrategy.CONSENSUS):
+        return (False, " ".join(denials))
+    return (True, "")
 
 
 class PolicyEnforcer:
     """
     PolicyEnforcer defines the logic to apply the configured permissions when a given action is requested on
     a protected resource.
+    The configured permissions are compiled into a `PermissionIndex`, which is rebuilt whenever the list of
+    permissions changes.
+
+    The policies of each matching permission are combined using the permission's `decision_strategy`, then the
+    decisions of all the matching permissions are combined using the `decision_strategy` of the enforcer.
+    A permission without policies grants access to everyone.
     """
 
+    def __init__(
+        self, decision_strategy: DecisionStrategy = DecisionStrategy.UNANIMOUS
+    ):
+        self._decision_strategy = decision_strategy
+        self._index: PermissionIndex = None
+
+    @property
+    def decision_strategy(self) -> DecisionStrategy:
+        return self._decision_strategy
+
+    def index_for(self, permissions: list[Permission]) -> PermissionIndex:
+        """
+        Returns the compiled index of the given permissions, building it only if the permissions changed since
+        the last invocation.
+        """
+        index = self._index
+        if index is None or not index.is_compiled_from(permissions):
+            index = PermissionIndex(permissions)
+            self._index = index
+        return index
+
+    def set_index(self, index: PermissionIndex):
+        """
+        Installs a precompiled index, returned by :meth:`index_for` for the permissions it was compiled from.
+        """
+        self._index = index
+
     def enforce_policy(
         self,
         role_manager: RoleManager,
@@ -16,27 +92,119 @@ class PolicyEnforcer:
         user: str,
         resource: Resource,
         actions: list[AuthzedAction],
+        principal: Optional[Principal] = None,
+        index: Optional[PermissionIndex] = None,
     ) -> tuple[bool, str]:
-        if permissions == []:
-            return (True, "")
-        for p in permissions:
-            print(f"Trying permission {p.name}")
-            if p.match_resource(resource):
-                print(f"Matches {resource.name}/{resource.get_type()}")
-                if p.match_actions(actions):
-                    print(f"Matches actions {actions}")
-                    for policy in p.policies:
-                        result, explain = policy.validate_user(
-                            user, role_manager=role_manager
-                        )
-                        # TODO manage decision strategy
-                        message = ""
-                        if not result:
-                            message = f"No permissions to execute {actions} on {resource.get_type()}:{resource.get_name()}. {explain}"
-                            print(f"**PERMISSION ERROR**: {message}")
-                        return (result, message)
-                else:
-                    message = f"No permissions defined to manage {actions} on {resource.get_type()}:{resource.get_name()}."
-                    print(f"**PERMISSION ERROR**: {message}")
-                # TODO: manage multiple matching permissions
-        return (False, "")
+        return self.enforce_policies(
+            role_manager=role_manager,
+            permissions=permissions,
+            user=user,
+            requests=[(resource, actions)],
+            principal=principal,
+            index=index,
+        )[0]
+
+    def enforce_policies(
+        self,
+        role_manager: RoleManager,
+        permissions: list[Permission],
+        user: str,
+        requests: list[tuple[Resource, list[AuthzedAction]]],
+        principal: Optional[Principal] = None,
+        index: Optional[PermissionIndex] = None,
+    ) -> list[tuple[bool, str]]:
+        """
+        Evaluates many `(resource, actions)` requests for the same user at once.
+        The requests are grouped by resource type and actions to look up the candidate permissions once per group,
+        and each permission and policy is evaluated at most once for the whole batch.
+        The given `index`, when compiled from the same permissions, is used instead of the one of the enforcer.
+        """
+        if not permissions:
+            return [(True, "")] * len(requests)
+        if index is None:
+            index = self.index_for(permissions)
+
+        groups: dict[tuple, list[int]] = {}
+        for i, (resource, actions) in enumerate(requests):
+            groups.setdefault((resource.get_type(), tuple(actions)), []).append(i)
+
+        evaluate_permission = self.permission_evaluator(
+            index, user, role_manager, principal
+        )
+
+        results: list[tuple[bool, str]] = [None] * len(requests)
+        for (_, actions), positions in groups.items():
+            resources = [requests[i][0] for i in positions]
+            for i, resource, matching in zip(
+                positions, resources, index.matching_many(resources, list(actions))
+            ):
+                results[i] = self._decide_request(
+                    resource, list(actions), matching, evaluate_permission
+                )
+        return results
+
+    def permission_evaluator(
+        self,
+        index: PermissionIndex,
+        user: str,
+        role_manager: RoleManager,
+        principal: Optional[Principal] = None,
+    ) -> Callable[[Permission], tuple[bool, str]]:
+        """
+        Returns a function evaluating the decision of a permission for the given user, combining its policies with the
+        permission's decision strategy. Permission and policy decisions are memoized, so each of them is evaluated at
+        most once for the lifetime of the returned function.
+        """
+        policy_decisions: dict[int, tuple[bool, str]] = {}
+        permission_decisions: dict[int, tuple[bool, str]] = {}
+
+        def evaluate_policy(policy: Policy) -> tuple[bool, str]:
+            decision = policy_decisions.get(id(policy))
+            if decision is None:
+                decision = policy.validate_user(
+                    user, role_manager=role_manager, principal=principal
+                )
+                policy_decisions[id(policy)] = decision
+            return decision
+
+        def evaluate_permission(p: Permission) -> tuple[bool, str]:
+            decision = permission_decisions.get(id(p))
+            if decision is None:
+                logger.debug("Trying permission %s", p.name)
+                policies = index.policies_of(p)
+                decision = (
+                    decide(
+                        p.decision_strategy or DecisionStrategy.UNANIMOUS,
+                        (evaluate_policy(policy) for policy in policies),
+                        len(policies),
+                    )
+                    if policies
+                    else (True, "")
+                )
+                permission_decisions[id(p)] = decision
+            return decision
+
+        return evaluate_permission
+
+    def _decide_request(
+        self,
+        resource: Resource,
+        actions: list[AuthzedAction],
+        matching: list[Permission],
+        evaluate_permission: Callable[[Permission], tuple[bool, str]],
+    ) -> tuple[bool, str]:
+        if not matching:
+            message = f"No permissions defined to manage {actions} on {resource.get_type()}:{resource.get_name()}."
+            logger.info("**PERMISSION ERROR**: %s", message)
+            return (False, message)
+
+        result, explain = decide(
+            self._decision_strategy,
+            (evaluate_permission(p) for p in matching),
+            len(matching),
+        )
+        message = ""
+        if not result:
+            message = f"No permissions to execute {actions} on {resource.get_type()}:{resource.get_name()}. {explain}"
+            logger.info("**PERMISSION ERROR**: %s", message)
+        return (result, message)
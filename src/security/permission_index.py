@@ -0,0 +1,389 @@
+import functools
+import re
+from collections import Counter
+from itertools import compress, repeat
+from operator import is_, is_not, itemgetter
+from typing import Sequence
+
+from resources import Resource
+from security.authzed_resource import (
+    AuthzedResource,
+    AuthzedResourceType,
+    _combinable,
+)
+from security.permissions import AuthzedAction, Permission
+from security.policy import Policy
+
+_CONCRETE_TYPES = [t for t in AuthzedResourceType if t != AuthzedResourceType.ALL]
+_CONCRETE_ACTIONS = [a for a in AuthzedAction if a != AuthzedAction.ALL]
+
+
+# The most distinct pattern lists combined into a single expression: the compilation time of an expression grows
+# faster than its size, and the expressions of unchanged chunks are found again in the cache after a reload
+_CHUNK_SIZE = 256
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _groups(pattern: str) -> int:
+    return re.compile(pattern).groups
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_chunk(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.DOTALL)
+
+
+class NameMatcher:
+    """
+    Matches a resource name against the `name_patterns` of many `AuthzedResource`s at once.
+
+    The patterns are compiled into a few combined regular expressions, made of one optional lookahead per distinct
+    list of patterns, each followed by an empty marker group. A single match of a combined expression evaluates
+    all its lookaheads, and the marker groups that captured identify all the matching resources.
+    The lookaheads are split into chunks of at most `_CHUNK_SIZE`, whose compiled expressions are cached by their
+    source, so that a new matcher only compiles the chunks that changed.
+    Patterns that cannot be combined, like the ones with backreferences or named groups, are matched one by one.
+
+    When pickled, only the source of the expressions is kept: they are compiled again at the first match.
+    """
+
+    def __init__(self, patterns_by_entry: dict[int, list[str]]):
+        self._separate: list[tuple[int, str]] = []
+        entries_by_alternatives: dict[str, list[int]] = {}
+        groups: dict[str, int] = {}
+        for entry, patterns in patterns_by_entry.items():
+            combined = []
+            for p in patterns:
+                if _combinable(p):
+                    combined.append(p)
+                else:
+                    self._separate.append((entry, p))
+            if combined:
+                alternatives = "|".join(f"(?:{p})" for p in combined)
+                entries = entries_by_alternatives.get(alternatives)
+                if entries is None:
+                    entries = entries_by_alternatives[alternatives] = []
+                    groups[alternatives] = sum(_groups(p) for p in combined)
+                entries.append(entry)
+
+        # The source of each chunk, with the group index of its markers and the entries of each marker
+        self._chunks: list[tuple[str, list[int], list[list[int]]]] = []
+        distinct = list(entries_by_alternatives.items())
+        for start in range(0, len(distinct), _CHUNK_SIZE):
+            parts = []
+            markers = []
+            marker_entries = []
+            group = 0
+            for alternatives, entries in distinct[start : start + _CHUNK_SIZE]:
+                group += groups[alternatives]
+                parts.append(f"(?:(?=(?:{alternatives})\\Z)())?")
+                markers.append(group)
+                marker_entries.append(entries)
+                group += 1
+            self._chunks.append(("".join(parts), markers, marker_entries))
+        self._regexes = None
+        self._separate_regexes = None
+        self.compile()
+
+    def __getstate__(self):
+        return {**self.__dict__, "_regexes": None, "_separate_regexes": None}
+
+    def compile(self):
+        """
+        Compiles the expressions, if they were unpickled.
+        """
+        if self._regexes is None:
+            self._separate_regexes = [
+                (entry, re.compile(p, re.DOTALL)) for entry, p in self._separate
+            ]
+            self._regexes = [
+                # Always returns a tuple, also with a single marker
+                (_compile_chunk(pattern), itemgetter(*markers, -1), marker_entries)
+                for pattern, markers, marker_entries in self._chunks
+            ]
+
+    def match(self, name: str) -> set[int]:
+        """
+        Returns the IDs of all the entries whose patterns fully match the given name.
+        """
+        self.compile()
+        name = name or ""
+        matched = set()
+        for regex, markers_of, marker_entries in self._regexes:
+            m = regex.match(name)
+            if m.lastindex is not None:
+                # Some markers captured
+                captured = map(is_not, markers_of(m.groups()), repeat(None))
+                for entries in compress(marker_entries, captured):
+                    matched.update(entries)
+        for entry, regex in self._separate_regexes:
+            if entry not in matched and regex.fullmatch(name) is not None:
+                matched.add(entry)
+        return matched
+
+
+class TagMatcher:
+    """
+    Matches the tags of a resource against the `required_tags` of many `AuthzedResource`s at once.
+
+    The required tags are stored in an inverted index from each `(key, value)` pair to the entries requiring it,
+    so that only the postings of the actual resource tags are visited: an entry matches when all its required tags
+    were found.
+    """
+
+    def __init__(self, required_tags_by_entry: dict[int, dict[str, str]]):
+        self._postings: dict[tuple[str, str], list[int]] = {}
+        self._required: dict[int, int] = {}
+        for entry, required_tags in required_tags_by_entry.items():
+            self._required[entry] = len(required_tags)
+            for tag in required_tags.items():
+                self._postings.setdefault(tag, []).append(entry)
+
+    def match(self, tags: dict[str, str]) -> set[int]:
+        """
+        Returns the IDs of all the entries whose required tags are included in the given tags.
+        """
+        if not isinstance(tags, dict):
+            return set()
+        counts = Counter()
+        for tag in tags.items():
+            postings = self._postings.get(tag)
+            if postings is not None:
+                counts.update(postings)
+        return {entry for entry, n in counts.items() if n == self._required[entry]}
+
+
+class PermissionIndex:
+    """
+    A compiled view of a list of permissions, indexed by `AuthzedResourceType` and `AuthzedAction`.
+    The `ALL` wildcards are expanded at build time, so that looking up the candidate permissions for a
+    given request does not require scanning the whole permission list.
+    The `name_patterns` and `required_tags` of the candidate permissions are compiled into one `NameMatcher` and one
+    `TagMatcher` for each type and action. The entries found by the matchers are mapped back to the positions of their
+    permissions, so that matching a resource visits the entries found by the matchers and the ones without filters,
+    never the other candidates.
+    The policies of each permission are sorted by increasing `cost`.
+    The index keeps an immutable tuple of the permissions it was compiled from, and must be rebuilt whenever the
+    source list of permissions changes.
+
+    The index can be pickled together with its permissions, to be loaded without compiling it again.
+    """
+
+    def __init__(self, permissions: list[Permission]):
+        self._permissions: tuple[Permission, ...] = tuple(permissions)
+        self._policies: dict[int, list[Policy]] = {
+            id(p): sorted(p.policies, key=lambda policy: policy.cost)
+            for p in permissions
+        }
+        # All the AuthzedResource entries of the permissions, identified by their position
+        self._entries: list[AuthzedResource] = []
+        self._records: dict[
+            tuple[AuthzedResourceType, AuthzedAction],
+            list[tuple[Permission, tuple[int, ...]]],
+        ] = {}
+
+        for p in permissions:
+            actions = _CONCRETE_ACTIONS if AuthzedAction.ALL in p.actions else p.actions
+            entries_by_type: dict[AuthzedResourceType, list[int]] = {}
+            for r in p.resources:
+                entry = len(self._entries)
+                self._entries.append(r)
+                types = (
+                    _CONCRETE_TYPES if r.type == AuthzedResourceType.ALL else [r.type]
+                )
+                for t in types:
+                    entries_by_type.setdefault(t, []).append(entry)
+            for t, entries in entries_by_type.items():
+                for a in set(actions):
+                    self._records.setdefault((t, a), []).append((p, tuple(entries)))
+
+        self._name_matchers: dict[
+            tuple[AuthzedResourceType, AuthzedAction], NameMatcher
+        ] = {}
+        self._tag_matchers: dict[
+            tuple[AuthzedResourceType, AuthzedAction], TagMatcher
+        ] = {}
+        # For each type and action: the permissions of the records, the position of the record of each entry, the
+        # positions of the records with an entry matching any resource, and the entries filtered by both name
+        # patterns and tags
+        self._permissions_by_key: dict[
+            tuple[AuthzedResourceType, AuthzedAction], list[Permission]
+        ] = {}
+        self._positions: dict[
+            tuple[AuthzedResourceType, AuthzedAction], dict[int, int]
+        ] = {}
+        self._unfiltered: dict[
+            tuple[AuthzedResourceType, AuthzedAction], frozenset[int]
+        ] = {}
+        self._filtered_by_both: dict[
+            tuple[AuthzedResourceType, AuthzedAction], frozenset[int]
+        ] = {}
+        for key, records in self._records.items():
+            key_entries = [entry for _, entries in records for entry in entries]
+            self._permissions_by_key[key] = [p for p, _ in records]
+            self._positions[key] = {
+                entry: position
+                for position, (_, entries) in enumerate(records)
+                for entry in entries
+            }
+            self._unfiltered[key] = frozenset(
+                self._positions[key][entry]
+                for entry in key_entries
+                if not self._entries[entry].name_patterns
+                and not self._entries[entry].required_tags
+            )
+            self._filtered_by_both[key] = frozenset(
+                entry
+                for entry in key_entries
+                if self._entries[entry].name_patterns
+                and self._entries[entry].required_tags
+            )
+            patterns_by_entry = {
+                entry: self._entries[entry].name_patterns
+                for entry in key_entries
+                if self._entries[entry].name_patterns
+            }
+            if patterns_by_entry:
+                self._name_matchers[key] = NameMatcher(patterns_by_entry)
+            required_tags_by_entry = {
+                entry: self._entries[entry].required_tags
+                for entry in key_entries
+                if self._entries[entry].required_tags
+            }
+            if required_tags_by_entry:
+                self._tag_matchers[key] = TagMatcher(required_tags_by_entry)
+
+    def __getstate__(self):
+        # Permissions are identified by their id(), which changes when unpickled
+        state = dict(self.__dict__)
+        state["_policies"] = [self._policies[id(p)] for p in self._permissions]
+        return state
+
+    def __setstate__(self, state):
+        state["_policies"] = {
+            id(p): policies
+            for p, policies in zip(state["_permissions"], state["_policies"])
+        }
+        self.__dict__.update(state)
+
+    @property
+    def permissions(self) -> tuple[Permission, ...]:
+        return self._permissions
+
+    def is_compiled_from(self, permissions: Sequence[Permission]) -> bool:
+        """
+        Returns True if the index was built from the given permissions, in the same order.
+        The tuple of :attr:`permissions` is recognized by identity, while other sequences, like lists modified in
+        place, are compared item by item by identity, since `Permission`s define no equality.
+        """
+        if permissions is self._permissions:
+            return True
+        return len(permissions) == len(self._permissions) and all(
+            map(is_, permissions, self._permissions)
+        )
+
+    def compile_patterns(self):
+        """
+        Compiles all the name patterns left uncompiled when the index and its permissions were unpickled, e.g. before
+        forking processes that share the compiled expressions.
+        """
+        for matcher in self._name_matchers.values():
+            matcher.compile()
+        for entry in self._entries:
+            entry.match_name("")
+
+    def policies_of(self, permission: Permission) -> list[Policy]:
+        """
+        Returns the policies of the given permission, sorted by increasing cost.
+        """
+        return self._policies[id(permission)]
+
+    def _records_for(
+        self, resource_type: AuthzedResourceType, actions: list[AuthzedAction]
+    ) -> tuple[tuple, list[tuple[Permission, tuple[int, ...]]]]:
+        if not actions:
+            raise ValueError("At least one action must be requested")
+        if AuthzedAction.ALL in actions:
+            actions = _CONCRETE_ACTIONS
+        key = (resource_type, actions[0])
+        records = self._records.get(key, [])
+        for a in actions[1:]:
+            others = {id(p) for p, _ in self._records.get((resource_type, a), [])}
+            records = [r for r in records if id(r[0]) in others]
+        return key, records
+
+    def candidates(
+        self, resource_type: AuthzedResourceType, actions: list[AuthzedAction]
+    ) -> list[Permission]:
+        """
+        Returns the permissions, in the configured order, that are defined for the given resource type
+        and that cover all the given actions.
+        Raises ValueError if no action is given.
+        """
+        _, records = self._records_for(resource_type, actions)
+        return [p for p, _ in records]
+
+    def candidate_entries(
+        self, resource_type: AuthzedResourceType, actions: list[AuthzedAction]
+    ) -> list[tuple[Permission, list[AuthzedResource]]]:
+        """
+        Returns the candidate permissions for the given resource type and actions, as in :meth:`candidates`, each one with
+        its `AuthzedResource`s applying to the given type.
+        """
+        _, records = self._records_for(resource_type, actions)
+        return [(p, [self._entries[e] for e in entries]) for p, entries in records]
+
+    def matching(
+        self, resource: Resource, actions: list[AuthzedAction]
+    ) -> list[Permission]:
+        """
+        Returns the permissions, in the configured order, that match the given resource and cover all the given actions.
+        """
+        return self.matching_many([resource], actions)[0]
+
+    def matching_many(
+        self, resources: list[Resource], actions: list[AuthzedAction]
+    ) -> list[list[Permission]]:
+        """
+        Returns the matching permissions of each of the given resources, all of the same type, for the given actions.
+        The candidate permissions are looked up once for all the resources.
+        Raises ValueError if no action is given.
+        """
+        key, records = self._records_for(resources[0].get_type(), actions)
+        if not records:
+            return [[] for _ in resources]
+
+        key_permissions = self._permissions_by_key[key]
+        # With more actions, only the records of the permissions covering all of them are candidates
+        covering = (
+            None if records is self._records[key] else {id(p) for p, _ in records}
+        )
+        positions = self._positions[key]
+        unfiltered = self._unfiltered[key]
+        filtered_by_both = self._filtered_by_both[key]
+        name_matcher = self._name_matchers.get(key)
+        tag_matcher = self._tag_matchers.get(key)
+        result = []
+        for resource in resources:
+            names = (
+                name_matcher.match(resource.get_name())
+                if name_matcher is not None
+                else set()
+            )
+            tags = (
+                tag_matcher.match(resource.get_tags())
+                if tag_matcher is not None
+                else set()
+            )
+            # The entries found by a single matcher match unless they also require the other one
+            matched = ((names ^ tags) - filtered_by_both) | (names & tags)
+            matching = list(
+                map(
+                    key_permissions.__getitem__,
+                    sorted(unfiltered.union([positions[entry] for entry in matched])),
+                )
+            )
+            if covering is not None:
+                matching = [p for p in matching if id(p) in covering]
+            result.append(matching)
+        return result
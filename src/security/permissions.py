@@ -114,13 +114,23 @@ class Permission:
 
     def match_resource(self, resource: Resource) -> bool:
         for r in self._resources:
-            if r.type == AuthzedResourceType.ALL or resource.get_type() == r.type:
-                # TODO name and tags match
+            if (
+                (r.type == AuthzedResourceType.ALL or resource.get_type() == r.type)
+                and r.match_name(resource.get_name())
+                and r.match_tags(resource.get_tags())
+            ):
                 return True
         return False
 
     def match_actions(self, actions: list[AuthzedAction]):
+        """
+        Returns True if all the given actions are covered by this permission.
+        """
         if AuthzedAction.ALL in self._actions:
             return True
+        if AuthzedAction.ALL in actions:
+            return all(
+                a in self._actions for a in AuthzedAction if a != AuthzedAction.ALL
+            )
 
-        return all(a in actions for a in self._actions)
+        return all(a in self._actions for a in actions)
@@ -1,11 +1,16 @@
 from abc import ABC, abstractmethod
 
+from security.role_registry import _get_role_registry
+
 
 class Policy(ABC):
     """
     An abstract class to ensure that the current user matches the configured security policies.
+    The `cost` is a relative estimate of the validation cost, used to evaluate the cheapest policies first.
     """
 
+    cost: int = 100
+
     @abstractmethod
     def validate_user(self, user: str, **kwargs) -> (bool, str):
         raise NotImplementedError
@@ -15,19 +20,36 @@ class RoleBasedPolicy(Policy):
     """
     An Policy class where the user roles must be enforced to grant access to the requested action.
     All the configured roles must be granted to the current user in order to allow the execution.
+    The required roles are precomputed as a bitmask of the global `RoleRegistry`.
     """
 
+    cost: int = 1
+
     def __init__(
         self,
         roles: list[str],
     ):
         self.roles = roles
+        self.role_mask = _get_role_registry().mask_of(roles)
+
+    def __setstate__(self, state):
+        # Role bits are local to the process: recompute the mask when unpickled
+        self.__dict__.update(state)
+        self.role_mask = _get_role_registry().mask_of(self.roles)
 
     def get_roles(self):
-        self.roles
+        return self.roles
 
     def validate_user(self, user: str, **kwargs) -> (bool, str):
-        rm = kwargs.get("role_manager")
-        result = rm.has_roles_for_user(user, self.roles)
+        """
+        Validates the roles of the `principal` keyword argument, when given, otherwise the roles registered
+        for the given user in the `role_manager` keyword argument.
+        """
+        principal = kwargs.get("principal")
+        if principal is not None:
+            result = principal.has_role_mask(self.role_mask)
+        else:
+            rm = kwargs.get("role_manager")
+            result = rm.has_role_mask_for_user(user, self.role_mask)
         explain = "" if result else f"Requires roles {self.roles}"
         return (result, explain)
@@ -0,0 +1,32 @@
+from dataclasses import dataclass, field
+
+from security.role_registry import _get_role_registry
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The immutable identity of the user running the current request, with the roles granted for that request.
+    It is carried in a `ContextVar` by the `SecurityManager`, so that concurrent requests never share mutable state.
+    """
+
+    user: str
+    roles: frozenset[str] = field(default_factory=frozenset)
+    role_mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.roles, frozenset):
+            object.__setattr__(self, "roles", frozenset(self.roles))
+        object.__setattr__(self, "role_mask", _get_role_registry().mask_of(self.roles))
+
+    def has_roles(self, roles: list[str]) -> bool:
+        """
+        Returns True only if all the given roles are granted to the principal.
+        """
+        return self.has_role_mask(_get_role_registry().mask_of(roles))
+
+    def has_role_mask(self, mask: int) -> bool:
+        """
+        Returns True only if all the roles in the given bitmask are granted to the principal.
+        """
+        return self.role_mask & mask == mask
@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Optional
+
+import yaml
+
+from forking import restart_after_fork
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import RoleBasedPolicy
+from security.security_manager import PermissionSnapshot, SecurityManager
+
+logger = logging.getLogger(__name__)
+
+# The libyaml bindings parse large permission files many times faster than the pure Python loader
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _is_json(path: str) -> bool:
+    return path.lower().endswith(".json")
+
+
+def _strings(value: Any, field: str) -> list[str]:
+    """
+    The given value of a field as a list of strings, where a single string stands for a list with only that string.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"Expected a string or a list of strings as {field}")
+    return list(value)
+
+
+def _string_mapping(value: Any, field: str) -> dict[str, str]:
+    if value is None:
+        return {}
+    if not isinstance(value, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in value.items()
+    ):
+        raise ValueError(f"Expected a mapping of strings to strings as {field}")
+    return dict(value)
+
+
+def _parse_resource(spec: dict) -> AuthzedResource:
+    return AuthzedResource(
+        type=AuthzedResourceType(spec.get("type", "all")),
+        name_patterns=_strings(spec.get("name_patterns"), "name_patterns"),
+        required_tags=_string_mapping(spec.get("required_tags"), "required_tags"),
+    )
+
+
+def _parse_permission(spec: Any) -> Permission:
+    if not isinstance(spec, dict):
+        raise TypeError(f"Expected a mapping as permission, got {spec!r}")
+    name = spec.get("name")
+    if not name:
+        raise ValueError(f"Missing name of permission {spec}")
+    if not isinstance(name, str):
+        raise TypeError(f"Expected a string as name of permission {spec}")
+    try:
+        return Permission(
+            name=name,
+            resources=[_parse_resource(r) for r in spec.get("resources", [{}])],
+            actions=[
+                AuthzedAction(a)
+                for a in _strings(spec.get("actions", ["all"]), "actions")
+            ],
+            policies=[
+                RoleBasedPolicy(roles=_strings(p["roles"], "roles"))
+                for p in spec.get("policies", [])
+            ],
+            decision_strategy=DecisionStrategy(
+                spec.get("decision_strategy", "unanimous")
+            ),
+        )
+    except (KeyError, TypeError, AttributeError, ValueError, re.error) as e:
+        raise ValueError(f"Invalid permission {name}: {e!r}") from e
+
+
+def parse_permissions(document: Any) -> list[Permission]:
+    """
+    Builds the permissions described by the given document, a mapping with a `permissions` list where each item has:
+    - `name`
+    - `resources`: a list of `type` (`A`, `B` or `all`), `name_patterns` and `required_tags`, all optional
+    - `actions`: a list of `read`, `edit` or `all`, `all` by default
+    - `policies`: a list of role based policies, each one with the `roles` to require, allow-all when missing
+    - `decision_strategy`: `unanimous` by default
+
+    A single string is accepted in place of a list of strings, and the required tags must map strings to strings.
+
+    Raises TypeError if the document is not a mapping with a list of permissions, if a permission is not a mapping or
+    if its name is not a string, and ValueError if a permission is not valid otherwise.
+    """
+    if not isinstance(document, dict) or not isinstance(
+        document.get("permissions", []), list
+    ):
+        raise TypeError("Expected a mapping with a list of permissions")
+    return [_parse_permission(p) for p in document.get("permissions", [])]
+
+
+def load_permissions(path: str) -> list[Permission]:
+    """
+    Loads the permissions from the given YAML file, or JSON file when its extension is `.json`.
+    Raises ValueError or TypeError if the file is not a valid permission document, as :func:`parse_permissions`.
+    """
+    with open(path) as f:
+        try:
+            document = (
+                json.load(f) if _is_json(path) else yaml.load(f, Loader=_YamlLoader)
+            )
+        except (json.JSONDecodeError, yaml.YAMLError) as e:
+            raise ValueError(f"Cannot parse {path}: {e}") from e
+    return parse_permissions(document)
+
+
+def _dump_permission(p: Permission) -> dict:
+    return {
+        "name": p.name,
+        "resources": [
+            {
+                "type": r.type.value,
+                "name_patterns": list(r.name_patterns or []),
+                "required_tags": dict(r.required_tags or {}),
+            }
+            for r in p.resources
+        ],
+        "actions": [a.value for a in p.actions],
+        "policies": [{"roles": list(policy.get_roles())} for policy in p.policies],
+        "decision_strategy": (p.decision_strategy or DecisionStrategy.UNANIMOUS).value,
+    }
+
+
+def dump_permissions(permissions: list[Permission], path: str):
+    """
+    Writes the given permissions, made only of role based policies, to the given YAML or JSON file, in the format
+    read by :func:`load_permissions`.
+    The file is written to a temporary file first and then renamed, so that watchers never see a partial document.
+    """
+    document = {"permissions": [_dump_permission(p) for p in permissions]}
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".permissions-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            if _is_json(path):
+                json.dump(document, f, indent=2)
+            else:
+                yaml.dump(document, f, Dumper=_YamlDumper, sort_keys=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class PermissionRegistry:
+    """
+    Keeps the permissions of a `SecurityManager` in sync with a declarative permission file, as read by
+    :func:`load_permissions`.
+
+    :meth:`start` loads the file before returning, then a background thread polls it every `poll_interval` seconds.
+    Whenever the file changes, its permissions are compiled into a new `PermissionSnapshot` that atomically replaces
+    the current one, while checks in progress complete with the previous snapshot.
+    A file that cannot be loaded is logged and ignored until it changes again, keeping the current snapshot.
+    The watcher is started again in the child processes forked after :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        security_manager: SecurityManager,
+        poll_interval: float = 1.0,
+    ):
+        self._path = path
+        self._sm = security_manager
+        self._poll_interval = poll_interval
+        self._stamp: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        restart_after_fork(self._restart_after_fork)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def start(self, load: bool = True):
+        """
+        Loads the permission file and starts the background thread watching it.
+        With `load` False, the current permissions of the `SecurityManager` are kept until the file changes, e.g.
+        when they were loaded from an artifact compiled from the same file.
+        Raises ValueError or TypeError if the file is not a valid permission document.
+        """
+        if self._thread is not None:
+            return
+        if load:
+            self.reload()
+        else:
+            self._stamp = self._file_stamp()
+        self._stopped.clear()
+        self._start_watching()
+
+    def _start_watching(self):
+        self._thread = threading.Thread(
+            target=self._watch, name="permission-registry", daemon=True
+        )
+        self._thread.start()
+
+    def _restart_after_fork(self):
+        # The watcher of the parent does not exist in a forked child: it is started again, keeping the stamp of the
+        # file loaded by the parent, so that any change made in the meantime is loaded at the first poll
+        self._lock = threading.Lock()
+        if self._thread is not None:
+            self._stopped = threading.Event()
+            self._start_watching()
+
+    def stop(self):
+        """
+        Stops the background thread, if started.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reload(self) -> PermissionSnapshot:
+        """
+        Loads the permission file and swaps in the new snapshot, returning it.
+        Raises ValueError or TypeError if the file is not a valid permission document.
+        """
+        with self._lock:
+            # A file that cannot be loaded is not retried until it changes again
+            self._stamp = self._file_stamp()
+            permissions = load_permissions(self._path)
+            snapshot = self._sm.set_permissions(permissions)
+        logger.info(
+            "Loaded %d permissions from %s, version %d",
+            len(permissions),
+            self._path,
+            snapshot.version,
+        )
+        return snapshot
+
+    def reload_if_changed(self) -> Optional[PermissionSnapshot]:
+        """
+        Reloads the permission file only if it was modified since the last load.
+        Returns the new snapshot, or None if the file did not change.
+        """
+        if self._file_stamp() == self._stamp:
+            return None
+        return self.reload()
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _watch(self):
+        while not self._stopped.wait(self._poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception:
+                # Any failure, e.g. an invalid name pattern, keeps the current snapshot and the thread polling
+                logger.exception("Failed to reload permissions from %s", self._path)
@@ -1,31 +1,60 @@
+import logging
+from typing import Optional
+
+from security.role_registry import _get_role_registry
+
+logger = logging.getLogger(__name__)
+
+
 class RoleManager:
     """
     RoleManager is the registry of user roles captured by the AuthManager implementations and used by the
     RoleBasedPolicy policy.
+    The roles of each user are also stored as a bitmask of the global `RoleRegistry`.
     """
 
     def __init__(self):
         self.roles_by_user = {}
+        self.role_masks_by_user = {}
 
     def add_roles_for_user(self, user: str, roles: list[str]):
         """
         Adds the given roles to the given user.
         """
         self.roles_by_user.setdefault(user, []).extend(roles)
+        self.role_masks_by_user[user] = self.role_masks_by_user.get(
+            user, 0
+        ) | _get_role_registry().mask_of(roles)
+
+    def get_roles_for_user(self, user: str) -> Optional[list[str]]:
+        """
+        Returns the roles registered for the given user, or None if the user has no registered roles.
+        """
+        return self.roles_by_user.get(user)
 
     def clear(self) -> None:
         """
         Clears all the registered roles.
         """
         self.roles_by_user.clear()
+        self.role_masks_by_user.clear()
 
     def has_roles_for_user(self, user: str, roles: list[str]) -> bool:
         """
         Returns True only if the given user has any registered role and all the given roles are registered.
         """
-        print(
-            f"Check {user} has all {roles}: currently {self.roles_by_user[user] if user in self.roles_by_user else[]}"
-        )
-        return user in self.roles_by_user and all(
-            r in self.roles_by_user[user] for r in roles
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Check %s has all %s: currently %s",
+                user,
+                roles,
+                self.roles_by_user.get(user, []),
+            )
+        return self.has_role_mask_for_user(user, _get_role_registry().mask_of(roles))
+
+    def has_role_mask_for_user(self, user: str, mask: int) -> bool:
+        """
+        Returns True only if the given user has any registered role and all the roles in the given bitmask are registered.
+        """
+        granted = self.role_masks_by_user.get(user)
+        return granted is not None and granted & mask == mask
@@ -0,0 +1,60 @@
+import threading
+from typing import Iterable
+
+
+class RoleRegistry:
+    """
+    The registry of the known role names, where each role is interned and assigned a distinct bit.
+    Sets of roles are then represented as integer bitmasks, so that checking that all the required roles are granted
+    is a single AND-and-compare operation.
+    """
+
+    def __init__(self):
+        self._bits: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    @property
+    def roles(self) -> list[str]:
+        """
+        The names of the registered roles, in the order of their bits.
+        """
+        return list(self._bits)
+
+    def bit_of(self, role: str) -> int:
+        """
+        Returns the bit assigned to the given role, registering the role if needed.
+        """
+        bit = self._bits.get(role)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(role)
+                if bit is None:
+                    bit = 1 << len(self._bits)
+                    self._bits[role] = bit
+        return bit
+
+    def mask_of(self, roles: Iterable[str]) -> int:
+        """
+        Returns the bitmask of the given roles.
+        """
+        mask = 0
+        for r in roles:
+            mask |= self.bit_of(r)
+        return mask
+
+    def roles_of(self, mask: int) -> list[str]:
+        """
+        Returns the names of the roles in the given bitmask.
+        """
+        return [r for r, bit in self._bits.items() if mask & bit]
+
+
+_role_registry: RoleRegistry = RoleRegistry()
+
+
+def _get_role_registry() -> RoleRegistry:
+    global _role_registry
+    return _role_registry
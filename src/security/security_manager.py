@@ -1,10 +1,23 @@
-from typing import Optional, Union
+import functools
+import logging
+from typing import Iterable, NamedTuple, Optional, Union
 from contextvars import ContextVar
 
+from security.decision_cache import (
+    DecisionCache,
+    actions_key,
+    decision_key,
+    decision_key_for,
+)
 from security.enforcer import PolicyEnforcer
+from security.permission_index import PermissionIndex
 from security.permissions import AuthzedAction, Permission
+from security.principal import Principal
 from resources import Resource
 from security.role_manager import RoleManager
+from security.snapshot import load_compiled
+
+logger = logging.getLogger(__name__)
 
 
 def require_permissions(actions: Optional[list[AuthzedAction]] = [AuthzedAction.ALL]):
@@ -13,40 +26,80 @@ def require_permissions(actions: Optional[list[AuthzedAction]] = [AuthzedAction.
     against unauthorized access.
 
     The first parameter of the protected method must be `self`
+
+    The protected actions and their cache key are computed once, when the method is decorated, and the type of the
+    resource is validated at the first invocation on each class, so that each invocation only resolves the current
+    principal and looks up its cached decision before calling the method.
     """
+    protected_actions = tuple(_as_list(actions) or ())
+    key_of_actions = actions_key(protected_actions)
 
     def require_permissions_decorator(func):
-        def permission_checker(*args, **kwargs):
-            print(f"permission_checker for {args}, {kwargs}")
-            resource = args[0]
-            if issubclass(Resource, type(resource)):
-                raise NotImplementedError(
-                    f"First argument must be a Resource not {type(resource)}"
-                )
-
-            sm = _get_security_manager()
+        checked_types = set()
+
+        @functools.wraps(func)
+        def permission_checker(resource, *args, **kwargs):
+            resource_type = type(resource)
+            if resource_type not in checked_types:
+                if not issubclass(resource_type, Resource):
+                    raise NotImplementedError(
+                        f"First argument must be a Resource not {resource_type}"
+                    )
+                checked_types.add(resource_type)
+
+            sm = _sm
             if sm is None:
                 return True
 
-            sm.assert_permissions(
-                resource=resource,
-                actions=actions,
-            )
-            print(
-                f"User {sm.current_user} can invoke {actions} on {resource.get_name()}:{resource.get_type()} "
-            )
-            result = func(*args, **kwargs)
-            return result
+            sm._assert_permissions(resource, protected_actions, key_of_actions)
+            return func(resource, *args, **kwargs)
 
         return permission_checker
 
     return require_permissions_decorator
 
 
+class AuthzedDecision(NamedTuple):
+    """
+    The authorization decision for executing the given actions on a resource, with the explanation of any denial.
+    """
+
+    resource: Resource
+    actions: list[AuthzedAction]
+    allowed: bool
+    explain: str
+
+
+class PermissionSnapshot(NamedTuple):
+    """
+    An immutable version of the configured permissions, with the `PermissionIndex` compiled from them.
+    Snapshots are never modified: a new one replaces the current snapshot whenever the permissions change.
+    """
+
+    version: int
+    permissions: tuple[Permission, ...]
+    index: Optional[PermissionIndex]
+
+
+def _as_list(actions: Union[AuthzedAction, list[AuthzedAction]]) -> list[AuthzedAction]:
+    return [actions] if isinstance(actions, AuthzedAction) else actions
+
+
 class SecurityManager:
     """
     The security manager holds references to the security components (role manager, policy enforces) and the configured permissions.
     It is accessed and defined using the global functions :func:`_get_security_manager` and :func:`_set_security_manager`
+
+    The identity of the current request is held in `ContextVar`s: either the plain user, whose roles are registered
+    in the `RoleManager`, or an immutable `Principal` carrying its own roles.
+
+    The permissions are held in an immutable `PermissionSnapshot`, compiled before being swapped in with a single
+    assignment by :meth:`set_permissions`. Each check reads the current snapshot once and uses it until the end, so
+    the read path takes no lock and checks running during a reload keep the snapshot they started with.
+
+    Authorization decisions are cached in a `DecisionCache`, keyed by the version of the snapshot, the roles of the
+    current user, the resource identity and the requested actions. Since the roles are part of the key, changes in the
+    role assignments never return stale decisions, while the whole cache is dropped when the permissions change.
     """
 
     def __init__(
@@ -54,16 +107,31 @@ class SecurityManager:
         role_manager: RoleManager,
         policy_enforcer: PolicyEnforcer,
         permissions: list[Permission] = [],
+        decision_cache: Optional[DecisionCache] = None,
     ):
         self._role_manager: RoleManager = role_manager
         self._policy_enforcer: PolicyEnforcer = policy_enforcer
-        self._permissions: list[Permission] = permissions
+        self._decision_cache: DecisionCache = (
+            decision_cache if decision_cache is not None else DecisionCache()
+        )
+        self._snapshot: PermissionSnapshot = self._compile(0, permissions)
         self._current_user: ContextVar[Optional[str]] = ContextVar(
             "current_user", default=None
         )
+        self._current_principal: ContextVar[Optional[Principal]] = ContextVar(
+            "current_principal", default=None
+        )
 
     def set_current_user(self, user: str):
         self._current_user.set(user)
+        self._current_principal.set(None)
+
+    def set_current_principal(self, principal: Principal):
+        """
+        Sets the principal of the current request, whose roles are used instead of the ones in the `RoleManager`.
+        """
+        self._current_user.set(principal.user)
+        self._current_principal.set(principal)
 
     @property
     def role_manager(self) -> RoleManager:
@@ -78,28 +146,176 @@ class SecurityManager:
         return self._current_user.get()
 
     @property
-    def permissions(self) -> list[Permission]:
-        return self._permissions
+    def current_principal(self) -> Optional[Principal]:
+        return self._current_principal.get()
+
+    @property
+    def decision_cache(self) -> DecisionCache:
+        return self._decision_cache
+
+    @property
+    def permissions(self) -> tuple[Permission, ...]:
+        """
+        The permissions of the current snapshot, as an immutable tuple: use :meth:`set_permissions` to change them.
+        """
+        return self._snapshot.permissions
+
+    @property
+    def snapshot(self) -> PermissionSnapshot:
+        return self._snapshot
+
+    def set_permissions(
+        self,
+        permissions: list[Permission],
+        index: Optional[PermissionIndex] = None,
+    ) -> PermissionSnapshot:
+        """
+        Compiles the given permissions into a new `PermissionSnapshot`, then atomically replaces the current one.
+        The given `index`, when compiled from the same permissions, is used instead of compiling them again.
+        Returns the new snapshot.
+        """
+        return self._swap(permissions, index)
+
+    def load_compiled(
+        self, path: str, source_path: Optional[str] = None
+    ) -> PermissionSnapshot:
+        """
+        Replaces the permissions with the ones of the artifact at the given path, built by `python -m security.compile`,
+        using its precompiled index. When `source_path` is given, the artifact must be compiled from its current
+        content. Raises ValueError if the artifact cannot be loaded or is stale.
+        """
+        compiled = load_compiled(path, source_path)
+        return self.set_permissions(compiled.permissions, compiled.index)
+
+    def _compile(
+        self,
+        version: int,
+        permissions: list[Permission],
+        index: Optional[PermissionIndex] = None,
+    ) -> PermissionSnapshot:
+        if self._policy_enforcer is None:
+            index = None
+        elif index is not None and index.is_compiled_from(permissions):
+            self._policy_enforcer.set_index(index)
+        else:
+            index = self._policy_enforcer.index_for(permissions)
+        # The snapshot shares the tuple of its index, which the enforcer recognizes by identity
+        return PermissionSnapshot(
+            version,
+            index.permissions if index is not None else tuple(permissions),
+            index,
+        )
+
+    def _swap(
+        self,
+        permissions: list[Permission],
+        index: Optional[PermissionIndex] = None,
+    ) -> PermissionSnapshot:
+        snapshot = self._compile(self._snapshot.version + 1, permissions, index)
+        self._snapshot = snapshot
+        self._decision_cache.clear()
+        return snapshot
+
+    def _current_roles(self, user: str, principal: Optional[Principal]):
+        return (
+            principal.roles
+            if principal is not None
+            else self._role_manager.get_roles_for_user(user)
+        )
 
     def assert_permissions(
         self,
         resource: Resource,
         actions: Union[AuthzedAction, list[AuthzedAction]],
     ):
-        _actions = actions
-        if isinstance(actions, AuthzedAction):
-            _actions = [actions]
-
-        result, explain = self._policy_enforcer.enforce_policy(
-            role_manager=self._role_manager,
-            permissions=self._permissions,
-            user=self.current_user,
-            actions=_actions,
-            resource=resource,
-        )
+        _actions = tuple(_as_list(actions))
+        self._assert_permissions(resource, _actions, actions_key(_actions))
+
+    def _assert_permissions(
+        self,
+        resource: Resource,
+        actions: tuple[AuthzedAction, ...],
+        key_of_actions: tuple[str, ...],
+    ):
+        """
+        The implementation of :meth:`assert_permissions`, given the actions and their key computed by
+        :func:`actions_key`, as precomputed by :func:`require_permissions`.
+        """
+        snapshot = self.snapshot
+        principal = self._current_principal.get()
+        if principal is not None:
+            user = principal.user
+            roles = principal.roles
+        else:
+            user = self._current_user.get()
+            roles = self._role_manager.get_roles_for_user(user)
+        key = decision_key_for(roles, resource, key_of_actions, snapshot.version)
+        decision = self._decision_cache.get(key)
+        if decision is None:
+            decision = self._policy_enforcer.enforce_policy(
+                role_manager=self._role_manager,
+                permissions=snapshot.permissions,
+                user=user,
+                actions=list(actions),
+                resource=resource,
+                principal=principal,
+                index=snapshot.index,
+            )
+            self._decision_cache.put(key, decision)
+        result, explain = decision
         if not result:
             raise PermissionError(explain)
 
+    def check_many(
+        self,
+        requests: Iterable[tuple[Resource, Union[AuthzedAction, list[AuthzedAction]]]],
+    ) -> list[AuthzedDecision]:
+        """
+        Returns the authorization decisions of the current user for all the given `(resource, actions)` requests,
+        in the same order. Unlike :meth:`assert_permissions`, denials are reported in the returned decisions
+        instead of raising `PermissionError`.
+        """
+        requests = [(resource, _as_list(actions)) for resource, actions in requests]
+        snapshot = self.snapshot
+        user = self.current_user
+        principal = self.current_principal
+        roles = self._current_roles(user, principal)
+
+        keys = [decision_key(roles, r, a, snapshot.version) for r, a in requests]
+        decisions = [self._decision_cache.get(key) for key in keys]
+        missing = [i for i, d in enumerate(decisions) if d is None]
+        if missing:
+            evaluated = self._policy_enforcer.enforce_policies(
+                role_manager=self._role_manager,
+                permissions=snapshot.permissions,
+                user=user,
+                requests=[requests[i] for i in missing],
+                principal=principal,
+                index=snapshot.index,
+            )
+            for i, decision in zip(missing, evaluated):
+                decisions[i] = decision
+                self._decision_cache.put(keys[i], decision)
+
+        return [
+            AuthzedDecision(resource, actions, allowed, explain)
+            for (resource, actions), (allowed, explain) in zip(requests, decisions)
+        ]
+
+    def filter_authorized(
+        self,
+        resources: Iterable[Resource],
+        actions: Union[AuthzedAction, list[AuthzedAction]],
+    ) -> list[Resource]:
+        """
+        Returns the given resources on which the current user is allowed to execute the given actions.
+        """
+        return [
+            d.resource
+            for d in self.check_many((resource, actions) for resource in resources)
+            if d.allowed
+        ]
+
 
 class DefaultSecurityManager(SecurityManager):
     def __init__(self):
@@ -112,6 +328,23 @@ class DefaultSecurityManager(SecurityManager):
     ):
         return True
 
+    def _assert_permissions(
+        self,
+        resource: Resource,
+        actions: tuple[AuthzedAction, ...],
+        key_of_actions: tuple[str, ...],
+    ):
+        return True
+
+    def check_many(
+        self,
+        requests: Iterable[tuple[Resource, Union[AuthzedAction, list[AuthzedAction]]]],
+    ) -> list[AuthzedDecision]:
+        return [
+            AuthzedDecision(resource, _as_list(actions), True, "")
+            for resource, actions in requests
+        ]
+
 
 _sm: SecurityManager = None
 
@@ -0,0 +1,129 @@
+import contextlib
+import gc
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from typing import NamedTuple, Optional
+
+from security.permission_index import PermissionIndex
+from security.permissions import Permission
+
+# The version of the compiled artifacts, to be increased whenever the pickled classes change
+ARTIFACT_VERSION = 8
+_ARTIFACT_MAGIC = b"POCPOLC"
+# Format version and SHA-256 digest of the source file
+_ARTIFACT_HEADER = struct.Struct("!H32s")
+# The SHA-256 digest of the pickled payload, stored right after the header
+_PAYLOAD_DIGEST_SIZE = 32
+
+
+class CompiledPermissions(NamedTuple):
+    """
+    The content of a compiled artifact: the permissions with their `PermissionIndex` and the SHA-256 digest of the
+    source file of the permissions.
+    """
+
+    source_digest: bytes
+    permissions: list[Permission]
+    index: PermissionIndex
+
+
+def file_digest(path: str) -> bytes:
+    """
+    Returns the SHA-256 digest of the content of the given file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    # Unpickling allocates many objects, all alive: pausing the collections roughly halves the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _write_atomically(path: str, header: bytes, payload):
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".compiled-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(hashlib.sha256(data).digest())
+            f.write(data)
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_compiled(
+    permissions: list[Permission],
+    index: PermissionIndex,
+    source_digest: bytes,
+    path: str,
+):
+    """
+    Serializes the given permissions and their compiled index to a read-only artifact file at the given path.
+    The file is written to a temporary file first and then renamed, so that readers never see a partial artifact.
+    The artifact records the given digest of the source of the permissions and the version of the artifact format.
+    """
+    header = _ARTIFACT_MAGIC + _ARTIFACT_HEADER.pack(ARTIFACT_VERSION, source_digest)
+    _write_atomically(path, header, (permissions, index))
+
+
+def _load_payload(data: mmap.mmap, offset: int, path: str):
+    """
+    Unpickles the payload following the header of the given mapped file, after checking it against its digest, so that
+    a truncated or corrupted file is rejected before being unpickled.
+    """
+    start = offset + _PAYLOAD_DIGEST_SIZE
+    if len(data) < start:
+        raise ValueError(f"{path} is truncated")
+    with memoryview(data)[start:] as payload:
+        if hashlib.sha256(payload).digest() != data[offset:start]:
+            raise ValueError(
+                f"{path} is corrupted: the digest of its content does not match"
+            )
+        with _gc_paused():
+            return pickle.loads(payload)
+
+
+def load_compiled(path: str, source_path: Optional[str] = None) -> CompiledPermissions:
+    """
+    Loads a compiled artifact written by :func:`write_compiled`, with a single memory mapping of the file.
+    The role masks of the policies are computed again by the role registry of the current process.
+    Raises ValueError if the file is not an artifact of the current version, if its content does not match its
+    digest or, when `source_path` is given, if the artifact was not compiled from the current content of that file.
+    """
+    header_size = len(_ARTIFACT_MAGIC) + _ARTIFACT_HEADER.size
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        if data[: len(_ARTIFACT_MAGIC)] != _ARTIFACT_MAGIC or len(data) < header_size:
+            raise ValueError(f"{path} is not a compiled permission artifact")
+        version, source_digest = _ARTIFACT_HEADER.unpack_from(
+            data, len(_ARTIFACT_MAGIC)
+        )
+        if version != ARTIFACT_VERSION:
+            raise ValueError(
+                f"{path} has version {version} instead of {ARTIFACT_VERSION}"
+            )
+        if source_path is not None and file_digest(source_path) != source_digest:
+            raise ValueError(f"{path} is stale: {source_path} changed")
+        permissions, index = _load_payload(data, header_size, path)
+    return CompiledPermissions(source_digest, permissions, index)
@@ -0,0 +1,94 @@
+import assertpy
+
+from impl import ResourceA, ResourceB
+from orchestator import Orchestrator
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, Permission
+from security.policy import RoleBasedPolicy
+from security.principal import Principal
+from security.role_manager import RoleManager
+from security.security_manager import SecurityManager
+
+
+class CountingPolicy(RoleBasedPolicy):
+    def __init__(self, roles: list[str]):
+        super().__init__(roles)
+        self.calls = 0
+
+    def validate_user(self, user: str, **kwargs) -> (bool, str):
+        self.calls += 1
+        return super().validate_user(user, **kwargs)
+
+
+def test_check_many(security_manager):
+    sm = security_manager
+    sm.set_current_user("b-manager")
+    a = ResourceA(name="a", tags=[])
+    b = ResourceB(name="b", tags=[])
+
+    decisions = sm.check_many(
+        [
+            (a, AuthzedAction.READ),
+            (b, AuthzedAction.READ),
+            (a, [AuthzedAction.EDIT]),
+            (b, [AuthzedAction.READ, AuthzedAction.EDIT]),
+        ]
+    )
+
+    assertpy.assert_that([d.allowed for d in decisions]).is_equal_to(
+        [False, True, False, True]
+    )
+    assertpy.assert_that([d.resource for d in decisions]).is_equal_to([a, b, a, b])
+    assertpy.assert_that(decisions[0].explain).contains("Requires roles ['a-reader']")
+    assertpy.assert_that(decisions[1].explain).is_empty()
+
+    assertpy.assert_that(
+        sm.filter_authorized([a, b, ResourceB(name="c", tags=[])], AuthzedAction.EDIT)
+    ).extracting("name").is_equal_to(["b", "c"])
+
+
+def test_policies_evaluated_once_per_batch():
+    policy = CountingPolicy(roles=["reader"])
+    sm = SecurityManager(
+        role_manager=RoleManager(),
+        policy_enforcer=PolicyEnforcer(),
+        permissions=[
+            Permission(
+                name="read-tables",
+                resources=[
+                    AuthzedResource(
+                        type=AuthzedResourceType.ALL, name_patterns=["table-.*"]
+                    )
+                ],
+                policies=[policy],
+                actions=[AuthzedAction.READ],
+            )
+        ],
+    )
+    sm.set_current_principal(Principal("user", ["reader"]))
+    resources = [ResourceA(name=f"table-{i}", tags={}) for i in range(100)] + [
+        ResourceB(name=f"view-{i}", tags={}) for i in range(100)
+    ]
+
+    authorized = sm.filter_authorized(resources, AuthzedAction.READ)
+
+    assertpy.assert_that(authorized).is_length(100)
+    assertpy.assert_that(policy.calls).is_equal_to(1)
+    assertpy.assert_that(sm.decision_cache.misses).is_equal_to(200)
+
+    sm.filter_authorized(resources, AuthzedAction.READ)
+    assertpy.assert_that(policy.calls).is_equal_to(1)
+    assertpy.assert_that(sm.decision_cache.hits).is_equal_to(200)
+
+
+def test_orchestrator(security_manager):
+    security_manager.set_current_user("a-reader")
+    messages = Orchestrator(security_manager).do_something(
+        ResourceA(name="a", tags=[]), ResourceB(name="b", tags=[])
+    )
+
+    assertpy.assert_that(messages).is_length(4)
+    assertpy.assert_that(messages[0]).is_equal_to("DONE a.read_protected()")
+    for message in messages[1:]:
+        assertpy.assert_that(message).starts_with("No permissions to execute")
@@ -0,0 +1,169 @@
+import hashlib
+import struct
+
+import assertpy
+import pytest
+
+from auth.config import setup_permission_registry
+from impl import ResourceA, ResourceB
+from security.compile import compile_permissions, main
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.registry import dump_permissions
+from security.role_registry import _get_role_registry
+from security.security_manager import SecurityManager
+from security.snapshot import file_digest, load_compiled
+
+
+@pytest.fixture
+def source(tmp_path, permissions):
+    permissions.append(
+        Permission.with_permission_to_read(
+            "read-2024", roles=["compiled-reader"], name_patterns=[".*-2024"]
+        )
+    )
+    path = str(tmp_path / "permissions.yaml")
+    dump_permissions(permissions, path)
+    return path
+
+
+@pytest.fixture
+def artifact(tmp_path, source):
+    path = str(tmp_path / "permissions.compiled")
+    compile_permissions(source, path)
+    return path
+
+
+def test_load_compiled(source, artifact, role_manager):
+    role_manager.add_roles_for_user("compiled-reader", ["compiled-reader"])
+    sm = SecurityManager(role_manager, PolicyEnforcer(DecisionStrategy.AFFIRMATIVE), [])
+
+    snapshot = sm.load_compiled(artifact, source_path=source)
+
+    assertpy.assert_that([p.name for p in snapshot.permissions]).contains(
+        "read-from-any-A", "read-2024"
+    )
+    assertpy.assert_that(
+        snapshot.index.is_compiled_from(snapshot.permissions)
+    ).is_true()
+    assertpy.assert_that(_get_role_registry().roles).contains(
+        "a-reader", "compiled-reader"
+    )
+    sm.set_current_user("compiled-reader")
+    decisions = sm.check_many(
+        [
+            (ResourceB("b-2024", {}), AuthzedAction.READ),
+            (ResourceB("b-2023", {}), AuthzedAction.READ),
+            (ResourceA("a-2024", {}), AuthzedAction.EDIT),
+        ]
+    )
+    assertpy.assert_that([d.allowed for d in decisions]).is_equal_to(
+        [True, False, False]
+    )
+    # The precompiled index is used as is
+    assertpy.assert_that(sm.snapshot.index).is_same_as(snapshot.index)
+
+
+def test_file_digest(tmp_path):
+    path = tmp_path / "large"
+    data = bytes(range(256)) * 1000
+    path.write_bytes(data)
+
+    assertpy.assert_that(file_digest(str(path))).is_equal_to(
+        hashlib.sha256(data).digest()
+    )
+
+
+def test_load_compiled_rejects_stale_artifacts(tmp_path, source, artifact):
+    compiled = load_compiled(artifact, source_path=source)
+    assertpy.assert_that(compiled.source_digest).is_equal_to(file_digest(source))
+
+    with open(source, "a") as f:
+        f.write("# changed\n")
+
+    assertpy.assert_that(load_compiled).raises(ValueError).when_called_with(
+        artifact, source
+    ).contains("stale")
+
+
+def test_load_compiled_rejects_other_files(tmp_path, artifact):
+    other = tmp_path / "other"
+    other.write_bytes(b"not an artifact")
+    old = tmp_path / "old"
+    with open(artifact, "rb") as f:
+        data = bytearray(f.read())
+    struct.pack_into("!H", data, 7, 0)
+    old.write_bytes(bytes(data))
+
+    for path in [other, old]:
+        assertpy.assert_that(load_compiled).raises(ValueError).when_called_with(
+            str(path)
+        )
+
+
+def test_load_compiled_rejects_corrupted_artifacts(tmp_path, artifact, monkeypatch):
+    unpickled = []
+    monkeypatch.setattr("pickle.loads", unpickled.append)
+    with open(artifact, "rb") as f:
+        data = bytearray(f.read())
+    data[-2] ^= 0xFF
+    corrupted = tmp_path / "corrupted"
+    corrupted.write_bytes(bytes(data))
+    truncated = tmp_path / "truncated"
+    truncated.write_bytes(bytes(data[:50]))
+
+    assertpy.assert_that(load_compiled).raises(ValueError).when_called_with(
+        str(corrupted)
+    ).contains("corrupted")
+    assertpy.assert_that(load_compiled).raises(ValueError).when_called_with(
+        str(truncated)
+    ).contains("truncated")
+    # The payload is never unpickled
+    assertpy.assert_that(unpickled).is_empty()
+
+
+def test_main(tmp_path, source, capsys):
+    artifact = str(tmp_path / "out.compiled")
+
+    assertpy.assert_that(main([source, artifact])).is_equal_to(0)
+    assertpy.assert_that(capsys.readouterr().out).contains(file_digest(source).hex())
+    assertpy.assert_that(main([str(tmp_path / "missing.yaml"), artifact])).is_equal_to(
+        1
+    )
+    invalid = tmp_path / "invalid.yaml"
+    for document in ["permissions", "permissions: [oops]", "permissions: [name: [x]]"]:
+        invalid.write_text(document)
+        assertpy.assert_that(main([str(invalid), artifact])).is_equal_to(1)
+
+
+def test_setup_uses_fresh_artifacts_only(monkeypatch, source, artifact, role_manager):
+    monkeypatch.setenv("PERMISSIONS_FILE", source)
+    monkeypatch.setenv("PERMISSIONS_ARTIFACT", artifact)
+    sm = SecurityManager(role_manager, PolicyEnforcer(), [])
+
+    registry = setup_permission_registry(sm)
+    registry.stop()
+    assertpy.assert_that(sm.snapshot.version).is_equal_to(1)
+    assertpy.assert_that(registry.reload_if_changed()).is_none()
+
+    with open(source, "a") as f:
+        f.write("# changed\n")
+    sm = SecurityManager(role_manager, PolicyEnforcer(), [])
+
+    registry = setup_permission_registry(sm)
+    registry.stop()
+    assertpy.assert_that(sm.snapshot.version).is_equal_to(1)
+    assertpy.assert_that([p.name for p in sm.permissions]).contains("read-2024")
+
+
+def test_compile_patterns_of_loaded_artifacts(artifact):
+    index = load_compiled(artifact).index
+    matchers = list(index._name_matchers.values())
+    assertpy.assert_that([m._regexes for m in matchers]).contains_only(None)
+
+    index.compile_patterns()
+
+    assertpy.assert_that([m._regexes for m in matchers]).does_not_contain(None)
+    assertpy.assert_that(
+        [e._name_regexes for e in index._entries if e.name_patterns]
+    ).does_not_contain(None)
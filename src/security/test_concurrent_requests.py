@@ -5,6 +5,7 @@ from security.security_manager import (
     SecurityManager,
 )
 from security.role_manager import RoleManager
+from security.principal import Principal
 from security.enforcer import PolicyEnforcer
 from security.utils import (
     a_reader_reads_from_A,
@@ -12,7 +13,9 @@ from security.utils import (
     admin_executes_all,
     unexisting_user_allowed_uprotected,
 )
+from impl import ResourceA, ResourceB
 import assertpy
+import pytest
 
 
 def validate_current_user(user: str) -> bool:
@@ -81,3 +84,43 @@ def test_concurrent_security(security_manager):
         for f in futures:
             result = f.result()
             assertpy.assert_that(result).is_none()
+
+
+def validate_principal(sm: SecurityManager, user: str, roles: list[str]) -> bool:
+    sm.set_current_principal(Principal(user, roles))
+    a = ResourceA(name="a", tags=[])
+    b = ResourceB(name="b", tags=[])
+    for i in range(1, 50):
+        assertpy.assert_that(sm.current_principal.user).is_equal_to(user)
+        if "a-reader" in roles:
+            a.read_protected()
+        else:
+            with pytest.raises(PermissionError):
+                a.read_protected()
+        if "b-reader" in roles:
+            b.edit_protected()
+        else:
+            with pytest.raises(PermissionError):
+                b.edit_protected()
+
+    return True
+
+
+def test_concurrent_principals(security_manager):
+    sm = security_manager
+    sm.role_manager.clear()
+    grants = [
+        ["a-reader"],
+        ["b-reader", "b-editor"],
+        [],
+        ["a-reader", "b-reader", "b-editor"],
+    ]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(
+                validate_principal, sm, f"user-{i}", grants[i % len(grants)]
+            )
+            for i in range(32)
+        ]
+        for f in futures:
+            assertpy.assert_that(f.result()).is_true()
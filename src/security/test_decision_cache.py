@@ -0,0 +1,104 @@
+import time
+
+import assertpy
+import pytest
+
+from impl import ResourceA, ResourceB
+from security.decision_cache import DecisionCache, decision_key
+from security.permissions import AuthzedAction, Permission
+from security.policy import RoleBasedPolicy
+from security.role_manager import RoleManager
+from security.enforcer import PolicyEnforcer
+from security.security_manager import SecurityManager
+
+
+def test_lru_eviction():
+    cache = DecisionCache(max_size=2, ttl=None)
+    cache.put("a", (True, ""))
+    cache.put("b", (True, ""))
+    cache.get("a")
+    cache.put("c", (False, "denied"))
+
+    assertpy.assert_that(len(cache)).is_equal_to(2)
+    assertpy.assert_that(cache.get("b")).is_none()
+    assertpy.assert_that(cache.get("a")).is_equal_to((True, ""))
+    assertpy.assert_that(cache.get("c")).is_equal_to((False, "denied"))
+    assertpy.assert_that(cache.hits).is_equal_to(3)
+    assertpy.assert_that(cache.misses).is_equal_to(1)
+
+
+def test_ttl_expiration():
+    cache = DecisionCache(ttl=0.01)
+    cache.put("a", (True, ""))
+    assertpy.assert_that(cache.get("a")).is_equal_to((True, ""))
+    time.sleep(0.02)
+    assertpy.assert_that(cache.get("a")).is_none()
+    assertpy.assert_that(len(cache)).is_equal_to(0)
+
+
+def test_decision_key():
+    a = ResourceA(name="a", tags={"team": "x", "env": "dev"})
+    same_a = ResourceA(name="a", tags={"env": "dev", "team": "x"})
+    b = ResourceB(name="a", tags={"team": "x", "env": "dev"})
+    read = [AuthzedAction.READ]
+
+    assertpy.assert_that(decision_key(["r1", "r2"], a, read)).is_equal_to(
+        decision_key(["r2", "r1"], same_a, read)
+    )
+    assertpy.assert_that(decision_key(["r1"], a, read)).is_not_equal_to(
+        decision_key(["r1"], b, read)
+    )
+    assertpy.assert_that(decision_key(None, a, read)).is_not_equal_to(
+        decision_key([], a, read)
+    )
+    assertpy.assert_that(decision_key(["r1"], a, read)).is_not_equal_to(
+        decision_key(["r1"], a, [AuthzedAction.EDIT])
+    )
+
+
+def test_cached_decisions(security_manager):
+    sm = security_manager
+    cache = sm.decision_cache
+    a = ResourceA(name="a", tags=[])
+
+    sm.set_current_user("a-reader")
+    sm.assert_permissions(a, AuthzedAction.READ)
+    sm.assert_permissions(a, AuthzedAction.READ)
+    with pytest.raises(PermissionError):
+        sm.assert_permissions(a, AuthzedAction.EDIT)
+    with pytest.raises(PermissionError):
+        sm.assert_permissions(a, AuthzedAction.EDIT)
+
+    assertpy.assert_that(cache.misses).is_equal_to(2)
+    assertpy.assert_that(cache.hits).is_equal_to(2)
+
+    sm.role_manager.add_roles_for_user("a-reader", ["a-editor"])
+    sm.assert_permissions(a, AuthzedAction.EDIT)
+
+
+def test_invalidation_on_permission_changes():
+    rm = RoleManager()
+    rm.add_roles_for_user("user", ["a-reader"])
+    sm = SecurityManager(
+        role_manager=rm,
+        policy_enforcer=PolicyEnforcer(),
+        permissions=[
+            Permission(name="deny-all", policies=[RoleBasedPolicy(roles=["admin"])])
+        ],
+    )
+    sm.set_current_user("user")
+    a = ResourceA(name="a", tags=[])
+
+    with pytest.raises(PermissionError):
+        sm.assert_permissions(a, AuthzedAction.READ)
+    assertpy.assert_that(len(sm.decision_cache)).is_equal_to(1)
+
+    sm.set_permissions([])
+    assertpy.assert_that(len(sm.decision_cache)).is_equal_to(0)
+    sm.assert_permissions(a, AuthzedAction.READ)
+
+    sm.set_permissions(
+        [Permission(name="deny-all", policies=[RoleBasedPolicy(roles=["admin"])])]
+    )
+    with pytest.raises(PermissionError):
+        sm.assert_permissions(a, AuthzedAction.READ)
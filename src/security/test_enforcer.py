@@ -0,0 +1,140 @@
+import assertpy
+import pytest
+
+from impl import ResourceA
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.enforcer import PolicyEnforcer, decide
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import Policy
+from security.principal import Principal
+
+UNANIMOUS = DecisionStrategy.UNANIMOUS
+AFFIRMATIVE = DecisionStrategy.AFFIRMATIVE
+CONSENSUS = DecisionStrategy.CONSENSUS
+
+
+class FixedPolicy(Policy):
+    def __init__(self, result: bool, cost: int = 100, calls: list = None):
+        self.result = result
+        self.cost = cost
+        self.calls = calls if calls is not None else []
+
+    def validate_user(self, user: str, **kwargs) -> (bool, str):
+        self.calls.append(self)
+        return (self.result, "" if self.result else f"denied by {self.cost}")
+
+
+@pytest.mark.parametrize(
+    "strategy, results, expected, consumed",
+    [
+        (UNANIMOUS, [], True, 0),
+        (UNANIMOUS, [True, True], True, 2),
+        (UNANIMOUS, [True, False, True], False, 2),
+        (AFFIRMATIVE, [], False, 0),
+        (AFFIRMATIVE, [False, True, False], True, 2),
+        (AFFIRMATIVE, [False, False], False, 2),
+        (CONSENSUS, [True, True, False], True, 2),
+        (CONSENSUS, [False, True, False], False, 3),
+        (CONSENSUS, [False, False, True], False, 2),
+        (CONSENSUS, [True, False], False, 2),
+        (CONSENSUS, [True, False, True, True, False], True, 4),
+    ],
+)
+def test_decide(strategy, results, expected, consumed):
+    evaluated = []
+
+    def decisions():
+        for r in results:
+            evaluated.append(r)
+            yield (r, "" if r else "no")
+
+    result, _ = decide(strategy, decisions(), len(results))
+    assertpy.assert_that(result).is_equal_to(expected)
+    assertpy.assert_that(evaluated).is_length(consumed)
+
+
+def _enforce(enforcer, permissions):
+    return enforcer.enforce_policy(
+        role_manager=None,
+        permissions=permissions,
+        user="user",
+        resource=ResourceA("a", {}),
+        actions=[AuthzedAction.READ],
+        principal=Principal("user", []),
+    )
+
+
+def _permission(name, policies, strategy=UNANIMOUS):
+    return Permission(
+        name=name,
+        resources=[AuthzedResource(type=AuthzedResourceType.A)],
+        actions=[AuthzedAction.READ],
+        policies=policies,
+        decision_strategy=strategy,
+    )
+
+
+def test_cheapest_policies_first():
+    calls = []
+    expensive = FixedPolicy(False, cost=50, calls=calls)
+    cheap = FixedPolicy(False, cost=1, calls=calls)
+    permissions = [_permission("p", [expensive, cheap])]
+
+    result, explain = _enforce(PolicyEnforcer(), permissions)
+    assertpy.assert_that(result).is_false()
+    assertpy.assert_that(explain).ends_with("denied by 1")
+    assertpy.assert_that(calls).is_equal_to([cheap])
+
+
+def test_permission_strategies():
+    enforcer = PolicyEnforcer()
+    grant, deny = FixedPolicy(True), FixedPolicy(False)
+
+    assertpy.assert_that(
+        _enforce(enforcer, [_permission("p", [grant, deny], UNANIMOUS)])[0]
+    ).is_false()
+    assertpy.assert_that(
+        _enforce(enforcer, [_permission("p", [deny, grant], AFFIRMATIVE)])[0]
+    ).is_true()
+    assertpy.assert_that(
+        _enforce(enforcer, [_permission("p", [deny, grant, grant], CONSENSUS)])[0]
+    ).is_true()
+    assertpy.assert_that(
+        _enforce(enforcer, [_permission("p", [deny, grant], CONSENSUS)])[0]
+    ).is_false()
+    assertpy.assert_that(
+        _enforce(enforcer, [_permission("p", [], AFFIRMATIVE)])[0]
+    ).is_true()
+
+
+def test_multiple_matching_permissions():
+    calls = []
+    granting = _permission("granting", [FixedPolicy(True, calls=calls)])
+    denying = _permission("denying", [FixedPolicy(False, calls=calls)])
+    permissions = [granting, denying]
+
+    result, _ = _enforce(PolicyEnforcer(), permissions)
+    assertpy.assert_that(result).is_false()
+    assertpy.assert_that(calls).is_length(2)
+
+    calls.clear()
+    result, _ = _enforce(PolicyEnforcer(decision_strategy=AFFIRMATIVE), permissions)
+    assertpy.assert_that(result).is_true()
+    assertpy.assert_that(calls).is_length(1)
+
+    calls.clear()
+    result, _ = _enforce(PolicyEnforcer(decision_strategy=CONSENSUS), permissions)
+    assertpy.assert_that(result).is_false()
+
+
+def test_no_matching_permissions():
+    permissions = [
+        Permission(
+            name="edit-A",
+            resources=[AuthzedResource(type=AuthzedResourceType.A)],
+            actions=[AuthzedAction.EDIT],
+        )
+    ]
+    result, explain = _enforce(PolicyEnforcer(), permissions)
+    assertpy.assert_that(result).is_false()
+    assertpy.assert_that(explain).starts_with("No permissions defined")
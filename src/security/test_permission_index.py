@@ -0,0 +1,362 @@
+import re
+
+import assertpy
+import pytest
+
+from security.authzed_resource import AuthzedResource, AuthzedResourceType
+from security.enforcer import PolicyEnforcer
+from security.permission_index import NameMatcher, PermissionIndex, TagMatcher
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import RoleBasedPolicy
+from security.security_manager import SecurityManager
+from benchmarks.synthetic import generate_permissions, generate_resources
+from impl import ResourceA, ResourceB
+
+
+def test_candidates(permissions):
+    index = PermissionIndex(permissions)
+
+    def names(resource_type, actions):
+        return [p.name for p in index.candidates(resource_type, actions)]
+
+    assertpy.assert_that(
+        names(AuthzedResourceType.A, [AuthzedAction.READ])
+    ).is_equal_to(["read-from-any-A"])
+    assertpy.assert_that(
+        names(AuthzedResourceType.A, [AuthzedAction.EDIT])
+    ).is_equal_to(["edit-any-A"])
+    assertpy.assert_that(
+        names(AuthzedResourceType.A, [AuthzedAction.READ, AuthzedAction.EDIT])
+    ).is_empty()
+    assertpy.assert_that(
+        names(AuthzedResourceType.B, [AuthzedAction.READ])
+    ).is_equal_to(["all-to-any-B"])
+    assertpy.assert_that(names(AuthzedResourceType.B, [AuthzedAction.ALL])).is_equal_to(
+        ["all-to-any-B"]
+    )
+
+
+def test_wildcards_and_order():
+    permissions = [
+        Permission(
+            name="read-any",
+            resources=[AuthzedResource(type=AuthzedResourceType.ALL)],
+            policies=[RoleBasedPolicy(roles=["reader"])],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="all-to-A",
+            resources=[
+                AuthzedResource(type=AuthzedResourceType.A),
+                AuthzedResource(type=AuthzedResourceType.A),
+            ],
+            policies=[RoleBasedPolicy(roles=["a-admin"])],
+        ),
+    ]
+    index = PermissionIndex(permissions)
+
+    assertpy.assert_that(
+        [p.name for p in index.candidates(AuthzedResourceType.A, [AuthzedAction.READ])]
+    ).is_equal_to(["read-any", "all-to-A"])
+    assertpy.assert_that(
+        [p.name for p in index.candidates(AuthzedResourceType.B, [AuthzedAction.READ])]
+    ).is_equal_to(["read-any"])
+    assertpy.assert_that(
+        index.candidates(AuthzedResourceType.B, [AuthzedAction.EDIT])
+    ).is_empty()
+
+
+def test_index_is_rebuilt(permissions):
+    enforcer = PolicyEnforcer()
+    index = enforcer.index_for(permissions)
+    assertpy.assert_that(enforcer.index_for(permissions)).is_same_as(index)
+
+    permissions.append(Permission(name="all"))
+    rebuilt = enforcer.index_for(permissions)
+    assertpy.assert_that(rebuilt).is_not_same_as(index)
+    assertpy.assert_that(
+        rebuilt.candidates(AuthzedResourceType.A, [AuthzedAction.EDIT])
+    ).is_length(2)
+
+    # Copies of the same permissions share the index
+    assertpy.assert_that(enforcer.index_for(list(permissions))).is_same_as(rebuilt)
+    assertpy.assert_that(enforcer.index_for(rebuilt.permissions)).is_same_as(rebuilt)
+
+    index = enforcer.index_for(permissions)
+    permissions[-1] = Permission(name="replaced", actions=[AuthzedAction.READ])
+    rebuilt = enforcer.index_for(permissions)
+    assertpy.assert_that(rebuilt).is_not_same_as(index)
+    assertpy.assert_that(
+        rebuilt.candidates(AuthzedResourceType.A, [AuthzedAction.EDIT])
+    ).is_length(1)
+
+
+def test_no_actions(security_manager, permissions):
+    index = PermissionIndex(permissions)
+    security_manager.set_current_user("admin")
+
+    assertpy.assert_that(index.candidates).raises(ValueError).when_called_with(
+        AuthzedResourceType.A, []
+    )
+    assertpy.assert_that(security_manager.assert_permissions).raises(
+        ValueError
+    ).when_called_with(ResourceA("a", {}), [])
+
+
+def test_name_matcher():
+    matcher = NameMatcher(
+        {
+            0: ["sales-.*"],
+            3: ["(sales|marketing)-(\\d+)", "other"],
+            5: [".*-2024"],
+            7: ["sales"],
+        }
+    )
+
+    assertpy.assert_that(matcher.match("sales-2024")).is_equal_to({0, 3, 5})
+    assertpy.assert_that(matcher.match("marketing-2024")).is_equal_to({3, 5})
+    assertpy.assert_that(matcher.match("sales-42")).is_equal_to({0, 3})
+    assertpy.assert_that(matcher.match("other")).is_equal_to({3})
+    assertpy.assert_that(matcher.match("sales")).is_equal_to({7})
+    assertpy.assert_that(matcher.match("sales\n")).is_empty()
+    assertpy.assert_that(matcher.match("")).is_empty()
+
+    backreference = NameMatcher({0: ["(b)\\1"], 1: ["(a)\\1"]})
+    assertpy.assert_that(backreference.match("aa")).is_equal_to({1})
+    assertpy.assert_that(backreference.match("bb")).is_equal_to({0})
+
+
+def test_name_matcher_chunks():
+    patterns_by_entry = {
+        i: [f"n-{i % 400}(-.*)?"] if i % 3 else [f"(a|b)-{i % 700}", "c"]
+        for i in range(1000)
+    }
+    matcher = NameMatcher(patterns_by_entry)
+    assertpy.assert_that(len(matcher._chunks)).is_greater_than(1)
+
+    for name in ["n-1", "n-399-x", "a-3", "b-699", "c", "n-400", "a-"]:
+        expected = {
+            entry
+            for entry, patterns in patterns_by_entry.items()
+            if any(re.fullmatch(p, name) for p in patterns)
+        }
+        assertpy.assert_that(matcher.match(name)).described_as(name).is_equal_to(
+            expected
+        )
+
+
+def test_matching_name_patterns():
+    permissions = [
+        Permission(
+            name="read-sales",
+            resources=[
+                AuthzedResource(type=AuthzedResourceType.A, name_patterns=["sales-.*"])
+            ],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="read-any-A",
+            resources=[AuthzedResource(type=AuthzedResourceType.A)],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="read-2024",
+            resources=[
+                AuthzedResource(type=AuthzedResourceType.B, name_patterns=["x"]),
+                AuthzedResource(
+                    type=AuthzedResourceType.ALL, name_patterns=[".*-2024"]
+                ),
+            ],
+            actions=[AuthzedAction.READ],
+        ),
+    ]
+    index = PermissionIndex(permissions)
+
+    def names(resource):
+        return [p.name for p in index.matching(resource, [AuthzedAction.READ])]
+
+    assertpy.assert_that(names(ResourceA("sales-2024", {}))).is_equal_to(
+        ["read-sales", "read-any-A", "read-2024"]
+    )
+    assertpy.assert_that(names(ResourceA("sales-2023", {}))).is_equal_to(
+        ["read-sales", "read-any-A"]
+    )
+    assertpy.assert_that(names(ResourceB("x", {}))).is_equal_to(["read-2024"])
+    assertpy.assert_that(names(ResourceB("y", {}))).is_empty()
+
+    for p in permissions:
+        for r in [ResourceA("sales-2024", {}), ResourceB("x", {}), ResourceB("y", {})]:
+            assertpy.assert_that(p.match_resource(r)).is_equal_to(p.name in names(r))
+
+
+def test_name_patterns_with_groups():
+    def read(name: str, patterns: list[str]) -> Permission:
+        return Permission(
+            name=name,
+            resources=[
+                AuthzedResource(type=AuthzedResourceType.A, name_patterns=patterns)
+            ],
+            actions=[AuthzedAction.READ],
+        )
+
+    permissions = [
+        read("other", ["b.*"]),
+        read("backreference", ["(a)\\1"]),
+        read("year", ["sales-(?P<year>\\d+)"]),
+        read("same-year", ["(?P<year>\\d+)-sales"]),
+    ]
+    index = PermissionIndex(permissions)
+
+    for name, expected in [
+        ("aa", ["backreference"]),
+        ("ab", []),
+        ("sales-2024", ["year"]),
+        ("2024-sales", ["same-year"]),
+        ("bb", ["other"]),
+    ]:
+        resource = ResourceA(name, {})
+        matching = [p.name for p in index.matching(resource, [AuthzedAction.READ])]
+        assertpy.assert_that(matching).is_equal_to(expected)
+        assertpy.assert_that(
+            [p.name for p in permissions if p.match_resource(resource)]
+        ).is_equal_to(expected)
+
+
+@pytest.mark.parametrize(
+    "patterns, names",
+    [
+        (["(x|y)+", "(a)\\1"], ["aa", "xy", "ab", "xa"]),
+        (["(?i)ab", "c.d"], ["AB", "ab", "c\nd", "CD", "abc"]),
+        (["sales-(?P<year>\\d+)", "(?P<year>\\d+)-sales"], ["sales-1", "1-sales", "1"]),
+    ],
+)
+def test_match_resource_agrees_with_the_index(role_manager, patterns, names):
+    permission = Permission(
+        name="read",
+        resources=[AuthzedResource(type=AuthzedResourceType.A, name_patterns=patterns)],
+        actions=[AuthzedAction.READ],
+    )
+    sm = SecurityManager(
+        role_manager, PolicyEnforcer(DecisionStrategy.AFFIRMATIVE), [permission]
+    )
+    sm.set_current_user("a-reader")
+
+    for name in names:
+        resource = ResourceA(name, {})
+        allowed = True
+        try:
+            sm.assert_permissions(resource, AuthzedAction.READ)
+        except PermissionError:
+            allowed = False
+        assertpy.assert_that(permission.match_resource(resource)).described_as(
+            name
+        ).is_equal_to(allowed)
+    assertpy.assert_that(permission.match_resource(ResourceA(names[0], {}))).is_true()
+
+
+def test_tag_matcher():
+    matcher = TagMatcher(
+        {
+            1: {"team": "sales"},
+            2: {"team": "sales", "env": "prod"},
+            4: {"env": "prod"},
+            6: {"team": "marketing", "env": "prod"},
+        }
+    )
+
+    assertpy.assert_that(
+        matcher.match({"team": "sales", "env": "prod", "owner": "me"})
+    ).is_equal_to({1, 2, 4})
+    assertpy.assert_that(matcher.match({"team": "sales", "env": "dev"})).is_equal_to(
+        {1}
+    )
+    assertpy.assert_that(matcher.match({"env": "prod"})).is_equal_to({4})
+    assertpy.assert_that(matcher.match({})).is_empty()
+    assertpy.assert_that(matcher.match([])).is_empty()
+
+
+def test_matching_required_tags():
+    permissions = [
+        Permission(
+            name="read-sales",
+            resources=[
+                AuthzedResource(
+                    type=AuthzedResourceType.A,
+                    name_patterns=["sales-.*"],
+                    required_tags={"team": "sales"},
+                )
+            ],
+            actions=[AuthzedAction.READ],
+        ),
+        Permission(
+            name="read-prod",
+            resources=[
+                AuthzedResource(
+                    type=AuthzedResourceType.ALL,
+                    required_tags={"env": "prod", "team": "sales"},
+                )
+            ],
+            actions=[AuthzedAction.READ],
+        ),
+    ]
+    index = PermissionIndex(permissions)
+    resources = [
+        ResourceA("sales-1", {"team": "sales", "env": "prod"}),
+        ResourceA("sales-1", {"team": "sales"}),
+        ResourceA("other", {"team": "sales", "env": "prod"}),
+        ResourceB("sales-1", {"team": "sales", "env": "prod"}),
+        ResourceA("sales-1", []),
+    ]
+    expected = [
+        ["read-sales", "read-prod"],
+        ["read-sales"],
+        ["read-prod"],
+        ["read-prod"],
+        [],
+    ]
+
+    for resource, names in zip(resources, expected):
+        assertpy.assert_that(
+            [p.name for p in index.matching(resource, [AuthzedAction.READ])]
+        ).is_equal_to(names)
+        for p in permissions:
+            assertpy.assert_that(p.match_resource(resource)).is_equal_to(
+                p.name in names
+            )
+
+
+def test_matching_agrees_with_the_permissions():
+    permissions = generate_permissions(300)
+    permissions.append(
+        Permission(
+            name="read-team-1-res-1",
+            resources=[
+                AuthzedResource(
+                    type=AuthzedResourceType.ALL,
+                    name_patterns=["res-1(-.*)?"],
+                    required_tags={"team": "team-1"},
+                )
+            ],
+            actions=[AuthzedAction.READ],
+        )
+    )
+    index = PermissionIndex(permissions)
+    resources = generate_resources(200) + [
+        ResourceA("res-1-x", {"team": "team-1"}),
+        ResourceB("res-1", {"team": "team-2"}),
+    ]
+
+    for actions in [
+        [AuthzedAction.READ],
+        [AuthzedAction.READ, AuthzedAction.EDIT],
+        [AuthzedAction.ALL],
+    ]:
+        for resource in resources:
+            expected = [
+                p
+                for p in index.candidates(resource.get_type(), actions)
+                if p.match_resource(resource)
+            ]
+            assertpy.assert_that(index.matching(resource, actions)).is_equal_to(
+                expected
+            )
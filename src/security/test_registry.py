@@ -0,0 +1,244 @@
+import os
+import time
+
+import assertpy
+import pytest
+
+from auth.config import setup_permissions
+from impl import ResourceA, ResourceB
+from security.enforcer import PolicyEnforcer
+from security.permissions import AuthzedAction, DecisionStrategy, Permission
+from security.policy import RoleBasedPolicy
+from security.registry import (
+    PermissionRegistry,
+    dump_permissions,
+    load_permissions,
+    parse_permissions,
+)
+from security.security_manager import SecurityManager
+
+SAMPLE_PERMISSIONS = os.path.join(
+    os.path.dirname(__file__), "..", "..", "permissions.yaml"
+)
+
+
+def _describe(permissions: list[Permission]) -> list:
+    return [
+        (
+            p.name,
+            [(r.type, r.name_patterns, r.required_tags) for r in p.resources],
+            p.actions,
+            [policy.get_roles() for policy in p.policies],
+            p.decision_strategy,
+        )
+        for p in permissions
+    ]
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.01)
+
+
+def test_sample_file_matches_the_sample_permissions():
+    assertpy.assert_that(_describe(load_permissions(SAMPLE_PERMISSIONS))).is_equal_to(
+        _describe(setup_permissions())
+    )
+
+
+@pytest.mark.parametrize("file_name", ["permissions.yaml", "permissions.json"])
+def test_dump_and_load(tmp_path, permissions, file_name):
+    permissions.append(
+        Permission.with_permission_to_read(
+            "read-tagged",
+            roles=["reader"],
+            name_patterns=["a-.*"],
+            required_tags={"team": "a-team"},
+        )
+    )
+    path = str(tmp_path / file_name)
+
+    dump_permissions(permissions, path)
+
+    assertpy.assert_that(_describe(load_permissions(path))).is_equal_to(
+        _describe(permissions)
+    )
+
+
+def test_parse_defaults():
+    [permission] = parse_permissions({"permissions": [{"name": "allow-all"}]})
+
+    assertpy.assert_that(_describe([permission])).is_equal_to(
+        _describe([Permission(name="allow-all")])
+    )
+    assertpy.assert_that(permission.decision_strategy).is_equal_to(
+        DecisionStrategy.UNANIMOUS
+    )
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"permissions": [{"actions": ["read"]}]},
+        {"permissions": [{"name": "p", "actions": ["delete"]}]},
+        {"permissions": [{"name": "p", "resources": [{"type": "C"}]}]},
+        {"permissions": [{"name": "p", "policies": [{"users": ["u"]}]}]},
+        {"permissions": [{"name": "p", "policies": [{"roles": {"admin": 1}}]}]},
+        {"permissions": [{"name": "p", "resources": [{"name_patterns": [1]}]}]},
+        {"permissions": [{"name": "p", "resources": [{"required_tags": {"y": 1}}]}]},
+        {"permissions": [{"name": "p", "resources": [{"required_tags": ["y"]}]}]},
+    ],
+)
+def test_parse_rejects_invalid_documents(document):
+    assertpy.assert_that(parse_permissions).raises(ValueError).when_called_with(
+        document
+    )
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        None,
+        ["p"],
+        {"permissions": {}},
+        {"permissions": ["oops"]},
+        {"permissions": [{"name": ["x"]}]},
+    ],
+)
+def test_parse_rejects_documents_of_other_types(document):
+    assertpy.assert_that(parse_permissions).raises(TypeError).when_called_with(document)
+
+
+def test_parse_single_strings():
+    [permission] = parse_permissions(
+        {
+            "permissions": [
+                {
+                    "name": "p",
+                    "resources": [{"type": "A", "name_patterns": "a-.*"}],
+                    "actions": "read",
+                    "policies": [{"roles": "admin"}],
+                }
+            ]
+        }
+    )
+
+    assertpy.assert_that(permission.resources[0].name_patterns).is_equal_to(["a-.*"])
+    assertpy.assert_that(permission.actions).is_equal_to([AuthzedAction.READ])
+    assertpy.assert_that(permission.policies[0].get_roles()).is_equal_to(["admin"])
+
+
+def test_set_permissions_swaps_the_snapshot(role_manager, permissions):
+    sm = SecurityManager(role_manager, PolicyEnforcer(), permissions)
+    sm.set_current_user("a-reader")
+    a = ResourceA("a", {})
+    sm.assert_permissions(a, AuthzedAction.READ)
+    before = sm.snapshot
+
+    after = sm.set_permissions(
+        [Permission(name="admins", policies=[RoleBasedPolicy(roles=["admin"])])]
+    )
+
+    assertpy.assert_that(after.version).is_equal_to(before.version + 1)
+    assertpy.assert_that(sm.snapshot).is_same_as(after)
+    with pytest.raises(PermissionError):
+        sm.assert_permissions(a, AuthzedAction.READ)
+    # A check in progress keeps using the previous snapshot, which is never modified
+    assertpy.assert_that(before.permissions).is_equal_to(tuple(permissions))
+    # The snapshot is recognized by its index without comparing its permissions
+    assertpy.assert_that(before.permissions).is_same_as(before.index.permissions)
+    assertpy.assert_that(before.index.is_compiled_from(permissions)).is_true()
+    assertpy.assert_that(
+        PolicyEnforcer().enforce_policy(
+            role_manager,
+            before.permissions,
+            "a-reader",
+            a,
+            [AuthzedAction.READ],
+            index=before.index,
+        )
+    ).is_equal_to((True, ""))
+
+
+def test_registry_reloads_the_changed_file(tmp_path, role_manager, permissions):
+    path = str(tmp_path / "permissions.yaml")
+    dump_permissions(permissions, path)
+    sm = SecurityManager(role_manager, PolicyEnforcer(), [])
+    sm.set_current_user("b-manager")
+    b = ResourceB("b", {})
+    registry = PermissionRegistry(path, sm, poll_interval=0.01)
+
+    registry.start()
+    try:
+        sm.assert_permissions(b, AuthzedAction.EDIT)
+        version = sm.snapshot.version
+
+        dump_permissions(permissions[:2], path)
+        _wait_for(lambda: sm.snapshot.version > version)
+
+        with pytest.raises(PermissionError):
+            sm.assert_permissions(b, AuthzedAction.EDIT)
+    finally:
+        registry.stop()
+
+
+def test_registry_keeps_the_snapshot_of_invalid_files(
+    tmp_path, role_manager, permissions
+):
+    path = tmp_path / "permissions.yaml"
+    dump_permissions(permissions, str(path))
+    sm = SecurityManager(role_manager, PolicyEnforcer(), [])
+    registry = PermissionRegistry(str(path), sm)
+    snapshot = registry.reload()
+
+    path.write_text("permissions: [")
+
+    assertpy.assert_that(registry.reload_if_changed).raises(
+        ValueError
+    ).when_called_with()
+    assertpy.assert_that(sm.snapshot).is_same_as(snapshot)
+    assertpy.assert_that(registry.reload_if_changed()).is_none()
+
+
+def test_registry_start_fails_on_invalid_files(tmp_path, role_manager):
+    path = tmp_path / "permissions.json"
+    path.write_text("{}}")
+    registry = PermissionRegistry(
+        str(path), SecurityManager(role_manager, PolicyEnforcer(), [])
+    )
+
+    assertpy.assert_that(registry.start).raises(ValueError).when_called_with()
+
+
+def test_registry_recovers_from_invalid_files(tmp_path, role_manager, permissions):
+    path = str(tmp_path / "permissions.yaml")
+    dump_permissions(permissions, path)
+    sm = SecurityManager(role_manager, PolicyEnforcer(), [])
+    sm.set_current_user("b-manager")
+    b = ResourceB("b", {})
+    registry = PermissionRegistry(path, sm, poll_interval=0.01)
+
+    registry.start()
+    try:
+        snapshot = sm.snapshot
+        with open(path, "w") as f:
+            f.write(
+                "permissions:\n"
+                "- name: invalid\n"
+                "  resources: [{type: A, name_patterns: ['[a-']}]\n"
+            )
+        # The watcher records the stamp of the file before failing to load it
+        _wait_for(lambda: registry._stamp == registry._file_stamp())
+        assertpy.assert_that(sm.snapshot).is_same_as(snapshot)
+        assertpy.assert_that(registry._thread.is_alive()).is_true()
+
+        dump_permissions(permissions[:2], path)
+        _wait_for(lambda: sm.snapshot.version > snapshot.version)
+
+        with pytest.raises(PermissionError):
+            sm.assert_permissions(b, AuthzedAction.EDIT)
+    finally:
+        registry.stop()
@@ -1,6 +1,10 @@
+import pickle
+
 import assertpy
 
 from security.policy import RoleBasedPolicy
+from security.principal import Principal
+from security.role_registry import _get_role_registry
 
 
 def test_has_roles(role_manager):
@@ -14,3 +18,32 @@ def test_has_roles(role_manager):
     assertpy.assert_that(
         policy.validate_user("missing-user", role_manager=rm)[0]
     ).is_false()
+
+
+def test_has_roles_from_principal(role_manager):
+    policy = RoleBasedPolicy(["a-reader", "a-editor"])
+
+    assertpy.assert_that(
+        policy.validate_user(
+            "missing-user",
+            role_manager=role_manager,
+            principal=Principal("missing-user", ["a-editor", "a-reader"]),
+        )[0]
+    ).is_true()
+    assertpy.assert_that(
+        policy.validate_user(
+            "admin",
+            role_manager=role_manager,
+            principal=Principal("admin", ["a-reader"]),
+        )[0]
+    ).is_false()
+
+
+def test_role_mask_is_recomputed_when_unpickled():
+    policy = RoleBasedPolicy(roles=["snapshot-role"])
+    data = pickle.dumps(policy)
+    policy.role_mask = 0
+
+    assertpy.assert_that(pickle.loads(data).role_mask).is_equal_to(
+        _get_role_registry().mask_of(["snapshot-role"])
+    )
@@ -0,0 +1,37 @@
+import assertpy
+
+from security.policy import RoleBasedPolicy
+from security.principal import Principal
+from security.role_registry import RoleRegistry, _get_role_registry
+
+
+def test_masks():
+    registry = RoleRegistry()
+    reader = registry.bit_of("reader")
+    editor = registry.bit_of("editor")
+
+    assertpy.assert_that(reader & editor).is_zero()
+    assertpy.assert_that(registry.bit_of("reader")).is_equal_to(reader)
+    assertpy.assert_that(registry.mask_of(["editor", "reader"])).is_equal_to(
+        reader | editor
+    )
+    assertpy.assert_that(registry.mask_of([])).is_zero()
+    assertpy.assert_that(registry.roles_of(reader | editor)).contains_only(
+        "reader", "editor"
+    )
+    assertpy.assert_that(len(registry)).is_equal_to(2)
+
+
+def test_policy_and_principal_masks():
+    registry = _get_role_registry()
+    roles = [f"client-role-{i}" for i in range(200)]
+    admin = Principal("admin", roles)
+    policy = RoleBasedPolicy(roles=["client-role-7", "client-role-199"])
+
+    assertpy.assert_that(policy.role_mask).is_equal_to(
+        registry.mask_of(["client-role-7", "client-role-199"])
+    )
+    assertpy.assert_that(policy.validate_user("admin", principal=admin)[0]).is_true()
+    assertpy.assert_that(
+        policy.validate_user("user", principal=Principal("user", roles[:100]))[0]
+    ).is_false()
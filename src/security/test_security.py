@@ -1,3 +1,10 @@
+import assertpy
+import pytest
+
+from impl import ResourceA
+from security.authzed_resource import AuthzedResourceType
+from security.permissions import AuthzedAction
+from security.security_manager import require_permissions
 from security.utils import (
     a_reader_reads_from_A,
     b_manager_manages_B,
@@ -22,3 +29,48 @@ def test_unexisting_user_allowed_uprotected(
     security_manager, role_manager, permissions
 ):
     unexisting_user_allowed_uprotected(security_manager, role_manager, permissions)
+
+
+def test_require_permissions_keeps_the_method_metadata():
+    def read_protected(self):
+        """Reads the resource."""
+
+    protected = require_permissions(actions=[AuthzedAction.READ])(read_protected)
+
+    assertpy.assert_that(protected.__name__).is_equal_to("read_protected")
+    assertpy.assert_that(protected.__doc__).is_equal_to("Reads the resource.")
+    assertpy.assert_that(protected.__wrapped__).is_same_as(read_protected)
+
+
+def test_require_permissions_rejects_non_resources(security_manager):
+    security_manager.set_current_user("admin")
+
+    class Unrelated:
+        def get_type(self):
+            return AuthzedResourceType.A
+
+        def get_name(self):
+            return "a"
+
+        def get_tags(self):
+            return {}
+
+    for not_a_resource in [object(), object(), Unrelated(), Unrelated()]:
+        with pytest.raises(NotImplementedError):
+            ResourceA.read_protected(not_a_resource)
+
+
+def test_require_permissions_uses_the_cached_decisions(security_manager):
+    security_manager.set_current_user("a-reader")
+    a = ResourceA(name="a", tags=[])
+    cache = security_manager.decision_cache
+
+    a.read_protected()
+    a.read_protected()
+    with pytest.raises(PermissionError):
+        a.edit_protected()
+
+    assertpy.assert_that((cache.hits, cache.misses)).is_equal_to((1, 2))
+    # The decorator shares the cache keys of assert_permissions
+    security_manager.assert_permissions(a, AuthzedAction.READ)
+    assertpy.assert_that(cache.hits).is_equal_to(2)
@@ -0,0 +1,64 @@
+import logging
+
+import assertpy
+import pytest
+
+from impl import ResourceA
+from logging_config import configure_logging, parse_levels
+from security.security_manager import DefaultSecurityManager, _set_security_manager
+
+
+class CountingName(str):
+    """
+    A resource name counting how many times it is formatted.
+    """
+
+    formatted = 0
+
+    def __str__(self):
+        CountingName.formatted += 1
+        return super().__str__()
+
+    def __repr__(self):
+        CountingName.formatted += 1
+        return super().__repr__()
+
+
+def test_parse_levels():
+    assertpy.assert_that(
+        parse_levels("security.enforcer=debug, auth=INFO,")
+    ).is_equal_to({"security.enforcer": logging.DEBUG, "auth": logging.INFO})
+    for spec in ["auth", "=DEBUG", "auth=LOUD"]:
+        assertpy.assert_that(parse_levels).raises(ValueError).when_called_with(spec)
+
+
+def test_configure_logging(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "error")
+    monkeypatch.setenv("LOG_LEVELS", "security.enforcer=DEBUG")
+    root = logging.getLogger()
+    enforcer = logging.getLogger("security.enforcer")
+    previous = (root.level, enforcer.level)
+    try:
+        configure_logging()
+
+        assertpy.assert_that(root.level).is_equal_to(logging.ERROR)
+        assertpy.assert_that(enforcer.isEnabledFor(logging.DEBUG)).is_true()
+        assertpy.assert_that(
+            logging.getLogger("auth").isEnabledFor(logging.INFO)
+        ).is_false()
+    finally:
+        root.setLevel(previous[0])
+        enforcer.setLevel(previous[1])
+
+
+@pytest.mark.parametrize(
+    "level, formatted", [(logging.INFO, False), (logging.DEBUG, True)]
+)
+def test_disabled_logging_does_not_format(caplog, level, formatted):
+    _set_security_manager(DefaultSecurityManager())
+    caplog.set_level(level)
+    CountingName.formatted = 0
+
+    ResourceA(CountingName("a"), {}).read_protected()
+
+    assertpy.assert_that(CountingName.formatted > 0).is_equal_to(formatted)